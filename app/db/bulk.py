@@ -0,0 +1,49 @@
+"""Raw DB-API bulk inserts shared by the data generator and importer."""
+
+from __future__ import annotations
+
+from itertools import islice
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from datetime import datetime
+
+    from sqlalchemy import Connection, Table
+
+BATCH_SIZE = 50_000
+
+
+def stored_datetime(value: datetime) -> str:
+    """Format a datetime the way SQLAlchemy stores it in SQLite."""
+    return value.isoformat(" ", "microseconds")
+
+
+def insert_many(
+    conn: Connection,
+    table: Table,
+    columns: tuple[str, ...],
+    rows: Iterable[tuple],
+    on_conflict: str | None = None,
+) -> int:
+    """Insert tuples in batches straight through the DB-API cursor.
+
+    This skips SQLAlchemy's per-row parameter processing, so values must
+    already be in their stored form (see `stored_datetime`).
+    `on_conflict` is an SQLite conflict clause such as `"IGNORE"` or
+    `"REPLACE"`.
+
+    Returns:
+        The number of rows written.
+
+    """
+    verb = f"INSERT OR {on_conflict}" if on_conflict else "INSERT"
+    sql = (
+        f"{verb} INTO {table.name} ({', '.join(columns)}) "
+        f"VALUES ({', '.join('?' * len(columns))})"
+    )
+    written = 0
+    rows = iter(rows)
+    while batch := list(islice(rows, BATCH_SIZE)):
+        written += conn.exec_driver_sql(sql, batch).rowcount
+    return written
@@ -0,0 +1,441 @@
+r"""Bulk import of chat exports (JSON, NDJSON or ZIP archives).
+
+Run from the repository root (uses `DBPATH` like the app)::
+
+    PYTHONPATH=./app python -m db.chat_import chats.zip old.json \
+        --policy remap --owner <auid>
+
+Inputs are parsed incrementally, so files of any size are read with
+constant memory: a chat's fields are read first, then its messages are
+streamed and written with DB-API executemany inserts in large batches.
+All inputs are imported in one transaction, and the search index is
+filled once at its end (see `search_index.deferred`).
+
+`--policy` decides what happens to ids that already exist:
+
+- `skip` keeps the existing chat (or message) and drops the imported one.
+- `overwrite` replaces the existing chat with all its messages, if it
+  belongs to the importing user.
+- `remap` imports under a fresh id.
+
+Rows of other chats are never changed: a chat id owned by another user
+is remapped under `overwrite`, and message ids used elsewhere are
+remapped (or skipped under `skip`).
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import re
+import sys
+import time
+import uuid
+import zipfile
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, TextIO
+
+from . import search_index
+from .bulk import BATCH_SIZE, insert_many, stored_datetime
+from .database_manager import DatabaseManager
+from .models import Chat, Message, User
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+    from sqlalchemy import Connection
+    from sqlalchemy.engine import Engine
+
+POLICIES = ("skip", "overwrite", "remap")
+
+_MESSAGE_COLUMNS = (
+    "id",
+    "chat_id",
+    "content",
+    "is_morse",
+    "is_error",
+    "timestamp",
+)
+_WHITESPACE = re.compile(r"\s*")
+_DECODER = json.JSONDecoder()
+
+
+class ImportFormatError(ValueError):
+    """Raised when an input is not a chat export."""
+
+
+class _JsonStream:
+    """Read a sequence of JSON values from a text stream piece by piece."""
+
+    CHUNK_SIZE = 1 << 16
+
+    def __init__(self, stream: TextIO) -> None:
+        self.stream = stream
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size: int = CHUNK_SIZE) -> bool:
+        """Read more input; returns False at the end of the stream."""
+        if self.eof:
+            return False
+        chunk = self.stream.read(size)
+        if not chunk:
+            self.eof = True
+            return False
+        if self.pos > self.CHUNK_SIZE:
+            self.buffer = self.buffer[self.pos :]
+            self.pos = 0
+        self.buffer += chunk
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character ("" at the end)."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        """Consume `char` or raise ImportFormatError."""
+        if self.peek() != char:
+            msg = f"'{char}' erwartet"
+            raise ImportFormatError(msg)
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as exc:
+                # Grow geometrically, so a huge value is decoded O(n) times.
+                if self._fill(max(self.CHUNK_SIZE, len(self.buffer))):
+                    continue
+                msg = f"Ungültiges JSON: {exc.msg}"
+                raise ImportFormatError(msg) from exc
+            # A value ending with the buffer (e.g. a number) may go on.
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def _separated(reader: _JsonStream, close: str) -> Iterator[None]:
+    """Yield once per element of a `,`-separated sequence up to `close`."""
+    first = True
+    while reader.peek() != close:
+        if not first:
+            reader.expect(",")
+        first = False
+        yield
+    reader.pos += 1
+
+
+def iter_records(stream: TextIO) -> Iterator[tuple[str, dict]]:
+    """Yield `("chat", fields)` and `("message", fields)` records.
+
+    Accepts one or more concatenated JSON objects, which covers
+    `Chat.to_dict` / `export_chat_json` output as well as NDJSON
+    exports. A `messages` array is streamed element by element; the
+    chat's own fields must precede it, as they do in every export.
+    """
+    reader = _JsonStream(stream)
+    while char := reader.peek():
+        if char != "{":
+            msg = "Chat-Export muss aus JSON-Objekten bestehen"
+            raise ImportFormatError(msg)
+        reader.pos += 1
+        record: dict = {}
+        streamed = False
+        for _ in _separated(reader, "}"):
+            key = reader.value()
+            reader.expect(":")
+            if key == "messages" and reader.peek() == "[":
+                yield "chat", record
+                streamed = True
+                reader.pos += 1
+                for _ in _separated(reader, "]"):
+                    yield "message", reader.value()
+            else:
+                record[key] = reader.value()
+        if not streamed:
+            # NDJSON: a chat line is followed by one line per message.
+            yield ("message" if "content" in record else "chat"), record
+
+
+def _parse_datetime(value) -> datetime | None:
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError) as exc:
+        msg = f"Ungültiger Zeitstempel: {value!r}"
+        raise ImportFormatError(msg) from exc
+
+
+class ChatImporter:
+    """Write chat records into the database through one connection.
+
+    Messages are buffered and inserted `BATCH_SIZE` at a time; the
+    caller owns the transaction. `counts` reports imported, skipped and
+    remapped rows.
+    """
+
+    def __init__(
+        self,
+        conn: Connection,
+        policy: str = "skip",
+        owner: str | None = None,
+    ) -> None:
+        if policy not in POLICIES:
+            msg = f"Unbekannte Importstrategie: {policy}"
+            raise ValueError(msg)
+        self.conn = conn
+        self.policy = policy
+        self.owner = owner
+        self.counts = dict.fromkeys(
+            ("chats", "messages", "skipped", "remapped"), 0
+        )
+        self._users: set[str] = set()
+        self._chat_id: str | None = None
+        self._skipping = False
+        self._last_timestamp: datetime | None = None
+        self._pending: list[tuple] = []
+
+    def read(self, stream: TextIO) -> None:
+        """Import every chat record in `stream`."""
+        for kind, record in iter_records(stream):
+            if kind == "chat":
+                self.add_chat(record)
+            else:
+                self.add_message(record)
+        self.flush()
+
+    def _chat_owner(self, chat_id: str) -> tuple[str | None] | None:
+        """Return `(user_id,)` of an existing chat, None if it is new."""
+        return self.conn.exec_driver_sql(
+            "SELECT user_id FROM chats WHERE id = ?", (chat_id,)
+        ).first()
+
+    def add_chat(self, record: dict) -> None:
+        """Insert a chat; its messages are expected to follow."""
+        self.flush()
+        if "id" not in record:
+            msg = "Chat ohne id"
+            raise ImportFormatError(msg)
+        chat_id = str(record["id"])
+        self._skipping = False
+        self._last_timestamp = None
+        user_id = self.owner or record.get("user_id")
+        existing = self._chat_owner(chat_id)
+        if existing is not None:
+            if self.policy == "skip":
+                self.counts["skipped"] += 1
+                self._skipping = True
+                return
+            if self.policy == "overwrite" and existing[0] == user_id:
+                # Messages explicitly, in case foreign keys are off.
+                self.conn.exec_driver_sql(
+                    "DELETE FROM messages WHERE chat_id = ?", (chat_id,)
+                )
+                self.conn.exec_driver_sql(
+                    "DELETE FROM chats WHERE id = ?", (chat_id,)
+                )
+            else:
+                chat_id = str(uuid.uuid4())
+                self.counts["remapped"] += 1
+
+        if user_id is not None and user_id not in self._users:
+            insert_many(
+                self.conn,
+                User.__table__,
+                ("id", "created_at"),
+                [(user_id, stored_datetime(datetime.now()))],
+                on_conflict="IGNORE",
+            )
+            self._users.add(user_id)
+
+        created_at = _parse_datetime(record.get("created_at"))
+        created_at = created_at or datetime.now()
+        updated_at = _parse_datetime(record.get("updated_at")) or created_at
+        unpinned_at = _parse_datetime(record.get("unpinned_at"))
+        insert_many(
+            self.conn,
+            Chat.__table__,
+            (
+                "id",
+                "user_id",
+                "title",
+                "pinned",
+                "created_at",
+                "updated_at",
+                "unpinned_at",
+            ),
+            [
+                (
+                    chat_id,
+                    user_id,
+                    str(record.get("title") or "Neuer Chat"),
+                    bool(record.get("pinned", False)),
+                    stored_datetime(created_at),
+                    stored_datetime(updated_at),
+                    unpinned_at and stored_datetime(unpinned_at),
+                )
+            ],
+        )
+        self.counts["chats"] += 1
+        self._chat_id = chat_id
+
+    def add_message(self, record: dict) -> None:
+        """Buffer a message of the current chat."""
+        if self._skipping:
+            self.counts["skipped"] += 1
+            return
+        if self._chat_id is None or not isinstance(record, dict):
+            msg = "Nachricht ohne zugehörigen Chat"
+            raise ImportFormatError(msg)
+        timestamp = _parse_datetime(record.get("timestamp")) or datetime.now()
+        last = self._last_timestamp
+        # Exports keep whole seconds; keep the file order within one.
+        if (
+            last is not None
+            and timestamp <= last
+            and timestamp.replace(microsecond=0) == last.replace(microsecond=0)
+        ):
+            timestamp = last + timedelta(microseconds=1)
+        self._last_timestamp = timestamp
+        self._pending.append(
+            (
+                str(record.get("id") or uuid.uuid4()),
+                self._chat_id,
+                str(record.get("content", "")),
+                bool(record.get("is_morse", False)),
+                bool(record.get("is_error", False)),
+                stored_datetime(timestamp),
+            )
+        )
+        if len(self._pending) >= BATCH_SIZE:
+            self.flush()
+
+    def _remap_taken_ids(self, rows: list[tuple]) -> list[tuple]:
+        """Give messages whose id is already used a fresh one."""
+        taken = set(
+            self.conn.exec_driver_sql(
+                "SELECT id FROM messages "
+                "WHERE id IN (SELECT value FROM json_each(?))",
+                (json.dumps([row[0] for row in rows]),),
+            ).scalars()
+        )
+        remapped = []
+        for row in rows:
+            if row[0] in taken:
+                row = (str(uuid.uuid4()), *row[1:])
+                self.counts["remapped"] += 1
+            taken.add(row[0])
+            remapped.append(row)
+        return remapped
+
+    def flush(self) -> None:
+        """Insert the buffered messages."""
+        rows, self._pending = self._pending, []
+        if not rows:
+            return
+        # The overwritten chat's own messages are gone by now, so any
+        # id still taken belongs to another chat and must not be touched.
+        if self.policy != "skip":
+            rows = self._remap_taken_ids(rows)
+        written = insert_many(
+            self.conn,
+            Message.__table__,
+            _MESSAGE_COLUMNS,
+            rows,
+            on_conflict="IGNORE" if self.policy == "skip" else None,
+        )
+        self.counts["messages"] += written
+        self.counts["skipped"] += len(rows) - written
+
+
+def _open_inputs(path: Path | str) -> Iterator[TextIO]:
+    """Yield a text stream per export in `path` (a file or ZIP archive)."""
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                with archive.open(info) as raw:
+                    yield io.TextIOWrapper(raw, encoding="utf-8")
+    else:
+        with open(path, encoding="utf-8") as stream:
+            yield stream
+
+
+def import_files(
+    engine: Engine,
+    paths: list[Path | str],
+    policy: str = "skip",
+    owner: str | None = None,
+) -> dict[str, int]:
+    """Import chat exports and return the number of affected rows.
+
+    Args:
+        engine: Engine of the target SQLite database.
+        paths: JSON, NDJSON or ZIP files as written by the exports.
+        policy: `skip`, `overwrite` or `remap` for ids already in use.
+        owner: Optional user id to import all chats for, e.g. an `auid`.
+
+    Returns:
+        Counts of imported `chats` and `messages`, of `skipped` chats and
+        messages, and of `remapped` ids.
+
+    Raises:
+        ImportFormatError: If an input is not a chat export; nothing is
+            imported then.
+
+    """
+    with engine.begin() as conn, search_index.deferred(conn):
+        importer = ChatImporter(conn, policy=policy, owner=owner)
+        for path in paths:
+            for stream in _open_inputs(path):
+                importer.read(stream)
+    return importer.counts
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(
+        description="Import exported chats (JSON, NDJSON or ZIP)."
+    )
+    parser.add_argument("paths", nargs="+", help="export files")
+    parser.add_argument("--policy", choices=POLICIES, default="skip")
+    parser.add_argument("--owner", help="user id to import the chats for")
+    args = parser.parse_args(argv)
+
+    DatabaseManager.init_db()
+    started = time.perf_counter()
+    try:
+        counts = import_files(
+            DatabaseManager.engine,
+            args.paths,
+            policy=args.policy,
+            owner=args.owner,
+        )
+    except (ImportFormatError, OSError) as exc:
+        print(f"Import fehlgeschlagen: {exc}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - started
+    print(
+        f"{counts['chats']} chats, {counts['messages']} messages imported, "
+        f"{counts['skipped']} skipped, {counts['remapped']} ids remapped "
+        f"in {elapsed:.1f} s ({DatabaseManager.engine.url.database})"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,11 @@
 import os
 from pathlib import Path
 
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
+from . import soft_delete  # registers the query filter
 from .models.base import Base
+from .sqlite_profile import SQLiteProfile
 
 db_env = os.getenv("DBPATH", "./morse_chat.db")
 DB_PATH = Path(db_env)
@@ -14,7 +15,8 @@ DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
 
 class DatabaseManager:
-    engine = create_engine(f"sqlite:///{DB_PATH}", echo=False, future=True)
+    profile = SQLiteProfile.from_env()
+    engine = profile.create_engine(f"sqlite:///{DB_PATH}")
     SessionLocal = sessionmaker(
         bind=engine, autoflush=False, autocommit=False, future=True
     )
@@ -26,9 +28,45 @@ class DatabaseManager:
 
     @classmethod
     def init_db(cls) -> None:
-        """Initialize database schema and create all tables."""
+        """Create missing tables and apply pending schema migrations."""
         from db.models.chat import Chat  # noqa: F401
         from db.models.message import Message  # noqa: F401
         from db.models.user import User  # noqa: F401
 
+        from .migrations import migrate
+
         Base.metadata.create_all(cls.engine)
+        migrate(cls.engine)
+
+    @classmethod
+    def explain(cls, stmt) -> list[str]:
+        """Return the SQLite query plan of `stmt`, one step per line.
+
+        The soft-delete criteria are added as a session would add them,
+        so the plan is the one of the SQL actually run. Bound values are
+        rendered inline, so `stmt` is not executed.
+        """
+        stmt = soft_delete.hide_deleted(stmt)
+        with cls.engine.connect() as conn:
+            sql = stmt.compile(
+                dialect=conn.dialect, compile_kwargs={"literal_binds": True}
+            )
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")
+            return [row[3] for row in rows]
+
+    @classmethod
+    def settings(cls) -> dict[str, str | int]:
+        """Return the effective connection settings for a startup report.
+
+        The pragmas are read back from a pooled connection as SQLite
+        reports them, so values it rejected or adjusted (e.g. WAL on a
+        file system without shared memory) show up as they really are.
+        """
+        report: dict[str, str | int] = {"database": cls.engine.url.database}
+        with cls.engine.connect() as conn:
+            for name in cls.profile.pragmas():
+                value = conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+                report[name] = value
+        report["pool_size"] = cls.profile.pool_size
+        report["max_overflow"] = cls.profile.max_overflow
+        return report
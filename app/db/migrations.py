@@ -0,0 +1,128 @@
+"""Versioned schema migrations for existing database files.
+
+`Base.metadata.create_all` only creates missing tables, so schema
+changes to existing tables (new indexes, columns) are applied here. The
+schema version of a database is stored in SQLite's `PRAGMA user_version`;
+`migrate` applies every migration above it in order and bumps the
+version after each one.
+
+Every step is idempotent (`IF NOT EXISTS`, existence checks), so a fresh
+database created from the current models simply gets stamped with the
+latest version, and an interrupted run can be repeated safely.
+
+Migrations spell out their DDL instead of reading it from the models:
+the models describe the latest schema, which an old database only
+reaches once the later migrations have run.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from . import search_index
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from sqlalchemy import Connection
+    from sqlalchemy.engine import Engine
+
+
+@dataclass(frozen=True, slots=True)
+class Migration:
+    """One schema change, applied when `user_version < version`."""
+
+    version: int
+    description: str
+    apply: Callable[[Connection], None]
+
+
+def _add_composite_indexes(conn: Connection) -> None:
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_messages_chat_timestamp "
+        "ON messages (chat_id, timestamp, id)"
+    )
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_chats_user_sidebar ON chats ("
+        "user_id, pinned, coalesce(CASE WHEN (pinned IS 1) "
+        "THEN updated_at ELSE unpinned_at END, created_at), created_at, id)"
+    )
+    # Superseded by the leading column of ix_chats_user_sidebar.
+    conn.exec_driver_sql("DROP INDEX IF EXISTS ix_chats_user_id")
+
+
+def _add_soft_delete(conn: Connection) -> None:
+    for table in ("chats", "messages"):
+        columns = {
+            row[1]
+            for row in conn.exec_driver_sql(f"PRAGMA table_info({table})")
+        }
+        if "deleted_at" not in columns:
+            conn.exec_driver_sql(
+                f"ALTER TABLE {table} ADD COLUMN deleted_at DATETIME"
+            )
+        conn.exec_driver_sql(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_deleted_at "
+            f"ON {table} (deleted_at) WHERE deleted_at IS NOT NULL"
+        )
+    # The purge worker returns freed pages with `incremental_vacuum`;
+    # switching an existing file over takes one full VACUUM.
+    if conn.exec_driver_sql("PRAGMA auto_vacuum").scalar_one() != 2:
+        conn.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.exec_driver_sql("VACUUM")
+
+
+def _add_search_index(conn: Connection) -> None:
+    search_index.create(conn)
+    search_index.rebuild(conn)
+
+
+def _cover_deleted_at(conn: Connection) -> None:
+    # Soft-deleted rows are filtered in every query, so the per-chat
+    # counts only stay index-only with `deleted_at` in the index.
+    name = "ix_messages_chat_timestamp"
+    columns = [
+        row[2] for row in conn.exec_driver_sql(f"PRAGMA index_info({name})")
+    ]
+    if "deleted_at" not in columns:
+        conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+        conn.exec_driver_sql(
+            f"CREATE INDEX {name} "
+            "ON messages (chat_id, timestamp, id, deleted_at)"
+        )
+
+
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(1, "composite paging indexes", _add_composite_indexes),
+    Migration(2, "soft delete columns, incremental vacuum", _add_soft_delete),
+    Migration(3, "FTS5 search index", _add_search_index),
+    Migration(4, "deleted_at in the message paging index", _cover_deleted_at),
+)
+
+
+def current_version(conn: Connection) -> int:
+    """Return the schema version stored in the database."""
+    return conn.exec_driver_sql("PRAGMA user_version").scalar_one()
+
+
+def latest_version() -> int:
+    """Return the version the models correspond to."""
+    return max((m.version for m in MIGRATIONS), default=0)
+
+
+def migrate(engine: Engine) -> list[Migration]:
+    """Apply all pending migrations and return the ones applied.
+
+    The schema tables must already exist (see `DatabaseManager.init_db`).
+    """
+    applied: list[Migration] = []
+    with engine.begin() as conn:
+        version = current_version(conn)
+        for migration in MIGRATIONS:
+            if migration.version <= version:
+                continue
+            migration.apply(conn)
+            conn.exec_driver_sql(f"PRAGMA user_version = {migration.version}")
+            applied.append(migration)
+    return applied
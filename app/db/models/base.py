@@ -1,5 +1,19 @@
-from sqlalchemy.orm import DeclarativeBase
+from datetime import datetime
+
+from sqlalchemy import DateTime
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
 class Base(DeclarativeBase):
     pass
+
+
+class SoftDeleteMixin:
+    """Rows are marked with `deleted_at` first and purged later.
+
+    Marked rows are hidden from every ORM query (see `db.soft_delete`).
+    """
+
+    deleted_at: Mapped[datetime | None] = mapped_column(
+        DateTime, nullable=True, default=None
+    )
@@ -2,17 +2,26 @@ import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, String
+from sqlalchemy import (
+    Boolean,
+    DateTime,
+    ForeignKey,
+    Index,
+    String,
+    case,
+    func,
+    text,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from .base import Base
+from .base import Base, SoftDeleteMixin
 
 if TYPE_CHECKING:
     from .message import Message
     from .user import User
 
 
-class Chat(Base):
+class Chat(SoftDeleteMixin, Base):
     __tablename__ = "chats"
 
     id: Mapped[str] = mapped_column(
@@ -22,7 +31,6 @@ class Chat(Base):
         String(64),
         ForeignKey("users.id", ondelete="CASCADE"),
         nullable=True,
-        index=True,
     )
     title: Mapped[str] = mapped_column(String(120), default="Neuer Chat")
     pinned: Mapped[bool] = mapped_column(Boolean, default=False)
@@ -40,18 +48,40 @@ class Chat(Base):
         "Message",
         back_populates="chat",
         cascade="all, delete-orphan",
+        # Rows are removed by ON DELETE CASCADE, not loaded first.
+        passive_deletes=True,
         order_by="Message.timestamp",
     )
     user: Mapped["User"] = relationship("User", back_populates="chats")
 
-    def to_dict(self) -> dict:
+    @classmethod
+    def sort_key(cls):
+        """Recency that orders chats in the sidebar within their pin state.
+
+        Pinned chats sort by their last update, others by the time they
+        were last unpinned or updated; `created_at` fills in for chats
+        that have neither.
+        """
+        return func.coalesce(
+            case(
+                (cls.pinned.is_(True), cls.updated_at),
+                else_=cls.unpinned_at,
+            ),
+            cls.created_at,
+        )
+
+    def to_dict(self, with_messages: bool = True) -> dict:
         """Convert chat to dictionary representation.
 
+        Args:
+            with_messages: Include the `messages` list; requires the
+                messages to be loaded.
+
         Returns:
             Dictionary with chat data including all related messages.
 
         """
-        return {
+        data = {
             "id": self.id,
             "user_id": self.user_id,
             "title": self.title,
@@ -63,5 +93,25 @@ class Chat(Base):
                 else None
             ),
             "updated_at": self.updated_at.isoformat(timespec="seconds"),
-            "messages": [m.to_dict() for m in self.messages],
         }
+        if with_messages:
+            data["messages"] = [m.to_dict() for m in self.messages]
+        return data
+
+
+# Covers `ChatService.list_chat_summaries`: a user's chats are read in
+# sidebar order straight from the index, without a sort step.
+Index(
+    "ix_chats_user_sidebar",
+    Chat.user_id,
+    Chat.pinned,
+    Chat.sort_key(),
+    Chat.created_at,
+    Chat.id,
+)
+# Partial index: finds soft-deleted chats for the purge worker.
+Index(
+    "ix_chats_deleted_at",
+    Chat.deleted_at,
+    sqlite_where=text("deleted_at IS NOT NULL"),
+)
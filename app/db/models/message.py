@@ -2,17 +2,34 @@ import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, String
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, String, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from .base import Base
+from .base import Base, SoftDeleteMixin
 
 if TYPE_CHECKING:
     from .chat import Chat
 
 
-class Message(Base):
+class Message(SoftDeleteMixin, Base):
     __tablename__ = "messages"
+    # Serves paging on (timestamp, id), per-chat counts and the cascade
+    # deletes by chat_id; `deleted_at` keeps it covering for counts of
+    # visible messages. The partial index finds rows to purge.
+    __table_args__ = (
+        Index(
+            "ix_messages_chat_timestamp",
+            "chat_id",
+            "timestamp",
+            "id",
+            "deleted_at",
+        ),
+        Index(
+            "ix_messages_deleted_at",
+            "deleted_at",
+            sqlite_where=text("deleted_at IS NOT NULL"),
+        ),
+    )
 
     id: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=lambda: str(uuid.uuid4())
@@ -22,4 +22,6 @@ class User(Base):
         "Chat",
         back_populates="user",
         cascade="all, delete-orphan",
+        # Rows are removed by ON DELETE CASCADE, not loaded first.
+        passive_deletes=True,
     )
@@ -0,0 +1,169 @@
+"""SQLite FTS5 full-text index over message contents and chat titles.
+
+Two FTS5 tables mirror `messages` and `chats` row by row (same rowid)
+and are kept in sync by triggers, so every writer (ORM, bulk inserts,
+purge worker) updates the index incrementally.
+
+Each entry has three columns:
+
+- `owner`: the user id without dashes (one token), so a search only
+  walks that user's entries.
+- `text`: the content if it is plain text.
+- `morse`: the content if it is Morse code, one token per Morse word:
+  `.` is spelled `d`, `-` is `h` and the letter gap is `z`, e.g.
+  `... --- ... / .-` -> `dddzhhhzddd dh`. The default tokenizer would
+  drop the punctuation, and whole-word tokens are far more selective
+  than single letters.
+
+Bulk loads wrap their inserts in `deferred`, which indexes all new rows
+with one statement at the end instead of one trigger call per row.
+
+The index refers to rowids, which a full `VACUUM` may renumber for
+tables without an INTEGER PRIMARY KEY; run `rebuild` afterwards.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
+from sqlalchemy import column, table
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from sqlalchemy import Connection
+
+# For queries; MATCH and bm25() take the table name itself.
+messages_fts = table("messages_fts", column("rowid"))
+chats_fts = table("chats_fts", column("rowid"))
+
+_SPELLED = (
+    "replace(replace(replace(replace(replace(trim({0}), ' / ', '/'), "
+    "' ', 'z'), '.', 'd'), '-', 'h'), '/', ' ')"
+)
+_IS_MORSE_TITLE = "trim({0}, '.-/ …') = '' AND trim({0}) != ''"
+
+
+def _message_values(row: str) -> str:
+    return (
+        f"{row}.rowid, "
+        "(SELECT replace(user_id, '-', '') FROM chats "
+        f"WHERE id = {row}.chat_id), "
+        f"CASE WHEN {row}.is_morse THEN '' ELSE {row}.content END, "
+        f"CASE WHEN {row}.is_morse THEN "
+        f"{_SPELLED.format(f'{row}.content')} ELSE '' END"
+    )
+
+
+def _chat_values(row: str) -> str:
+    title = f"{row}.title"
+    return (
+        f"{row}.rowid, replace({row}.user_id, '-', ''), {title}, "
+        f"CASE WHEN {_IS_MORSE_TITLE.format(title)} THEN "
+        f"{_SPELLED.format(title)} ELSE '' END"
+    )
+
+
+# source table, index table, indexed columns, values, watched columns
+_MIRRORS = (
+    (
+        "messages",
+        "messages_fts",
+        "owner, text, morse",
+        _message_values,
+        "content, is_morse, chat_id",
+    ),
+    (
+        "chats",
+        "chats_fts",
+        "owner, title, morse",
+        _chat_values,
+        "title, user_id",
+    ),
+)
+
+
+def _ddl() -> list[str]:
+    statements = []
+    for source, index, columns, values, watched in _MIRRORS:
+        insert = f"INSERT INTO {index} (rowid, {columns}) "
+        insert += f"VALUES ({values('new')});"
+        delete = f"DELETE FROM {index} WHERE rowid = old.rowid;"
+        virtual = f"CREATE VIRTUAL TABLE IF NOT EXISTS {index}"
+        trigger = f"CREATE TRIGGER IF NOT EXISTS {index}"
+        update = f"AFTER UPDATE OF {watched} ON {source}"
+        statements += [
+            f"{virtual} USING fts5({columns})",
+            f"{trigger}_insert AFTER INSERT ON {source} BEGIN {insert} END",
+            f"{trigger}_delete AFTER DELETE ON {source} BEGIN {delete} END",
+            f"{trigger}_update {update} BEGIN {delete} {insert} END",
+        ]
+    return statements
+
+
+def create(conn: Connection) -> None:
+    """Create the index tables and triggers unless they exist."""
+    for statement in _ddl():
+        conn.exec_driver_sql(statement)
+
+
+def rebuild(conn: Connection) -> None:
+    """Refill the index from the `messages` and `chats` tables."""
+    for source, index, columns, values, _watched in _MIRRORS:
+        conn.exec_driver_sql(f"DELETE FROM {index}")
+        conn.exec_driver_sql(
+            f"INSERT INTO {index} (rowid, {columns}) "
+            f"SELECT {values(source)} FROM {source}"
+        )
+        conn.exec_driver_sql(
+            f"INSERT INTO {index} ({index}) VALUES ('optimize')"
+        )
+
+
+def _installed(conn: Connection) -> bool:
+    row = conn.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE name = 'messages_fts'"
+    ).first()
+    return row is not None
+
+
+@contextmanager
+def deferred(conn: Connection) -> Iterator[None]:
+    """Index the rows inserted within the block in one go at its end.
+
+    The insert triggers are dropped for the block and recreated after
+    it, so a bulk load does not pay one index update per row. Both run
+    in the caller's transaction (begun here if not yet open), so a load
+    that fails and rolls back keeps the triggers. New rows are found by
+    their rowid, which SQLite hands out in increasing order; the delete
+    and update triggers stay active, so rows changed or deleted
+    meanwhile are still kept in sync. Does nothing if the index is not
+    installed.
+    """
+    if not _installed(conn):
+        yield
+        return
+    # pysqlite only begins a transaction before DML. Without this, the
+    # DROP TRIGGER would commit on its own while a rollback of the load
+    # would also undo the triggers recreated below.
+    if not conn.connection.driver_connection.in_transaction:
+        conn.exec_driver_sql("BEGIN")
+    marks = {}
+    for source, index, *_rest in _MIRRORS:
+        marks[source] = conn.exec_driver_sql(
+            f"SELECT coalesce(max(rowid), 0) FROM {source}"
+        ).scalar_one()
+        conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {index}_insert")
+    try:
+        yield
+        for source, index, columns, values, _watched in _MIRRORS:
+            # Skip new rows the update trigger has already indexed.
+            conn.exec_driver_sql(
+                f"INSERT INTO {index} (rowid, {columns}) "
+                f"SELECT {values(source)} FROM {source} "
+                f"WHERE rowid > {marks[source]} AND rowid NOT IN "
+                f"(SELECT rowid FROM {index} WHERE rowid > {marks[source]})"
+            )
+    finally:
+        create(conn)
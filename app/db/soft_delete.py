@@ -0,0 +1,35 @@
+"""Hide soft-deleted rows from every ORM query.
+
+Importing this module registers a `do_orm_execute` listener on all
+sessions. It adds `deleted_at IS NULL` criteria for every model using
+`SoftDeleteMixin`, wherever the model appears in a SELECT: joins,
+subqueries and relationship loads included. Pass the execution option
+`include_deleted=True` to see marked rows.
+"""
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session, with_loader_criteria
+
+from .models.base import SoftDeleteMixin
+
+
+def hide_deleted(stmt):
+    """Return `stmt` with the `deleted_at IS NULL` criteria applied."""
+    return stmt.options(
+        with_loader_criteria(
+            SoftDeleteMixin,
+            lambda cls: cls.deleted_at.is_(None),
+            include_aliases=True,
+        )
+    )
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _hide_deleted_rows(state: ORMExecuteState) -> None:
+    if (
+        state.is_select
+        and not state.is_column_load
+        and not state.is_relationship_load
+        and not state.execution_options.get("include_deleted", False)
+    ):
+        state.statement = hide_deleted(state.statement)
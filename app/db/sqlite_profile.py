@@ -0,0 +1,97 @@
+"""SQLite performance profile: connection pragmas and pool settings."""
+
+import os
+from dataclasses import asdict, dataclass
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+
+
+@dataclass(frozen=True, slots=True)
+class SQLiteProfile:
+    """Pragmas applied to every new connection, plus the pool size.
+
+    The defaults target the app's workload: many short reads and small
+    writes from concurrent NiceGUI handlers.
+
+    - WAL lets readers proceed while one connection writes; with
+      `synchronous=NORMAL` a commit no longer waits for an fsync (the
+      WAL is synced at checkpoints, so a power loss can drop the last
+      commits but never corrupts the database).
+    - `busy_timeout` makes a connection wait for a lock instead of
+      failing at once with "database is locked".
+    - `cache_size` (KiB), `mmap_size` (MiB) and `temp_store` keep hot
+      pages and temporary sort data in memory.
+    - `foreign_keys` lets the schema's `ON DELETE CASCADE` remove a
+      chat's messages inside SQLite instead of through the ORM.
+
+    Every field can be overridden with an `SQLITE_*` environment
+    variable, see `from_env`.
+    """
+
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    busy_timeout_ms: int = 5000
+    cache_size_kb: int = 16 * 1024
+    mmap_size_mb: int = 128
+    temp_store: str = "MEMORY"
+    foreign_keys: bool = True
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout_s: float = 30.0
+
+    @classmethod
+    def from_env(cls) -> "SQLiteProfile":
+        """Return the default profile with `SQLITE_*` overrides applied.
+
+        For example `SQLITE_JOURNAL_MODE=DELETE` or
+        `SQLITE_BUSY_TIMEOUT_MS=10000`.
+        """
+        values = {}
+        for name, default in asdict(cls()).items():
+            raw = os.getenv(f"SQLITE_{name.upper()}")
+            if raw is None:
+                continue
+            if isinstance(default, bool):
+                values[name] = raw.strip().lower() in {"1", "true", "on"}
+            else:
+                values[name] = type(default)(raw)
+        return cls(**values)
+
+    def pragmas(self) -> dict[str, str | int]:
+        """Return the pragmas in the order they are applied."""
+        return {
+            "journal_mode": self.journal_mode,
+            "synchronous": self.synchronous,
+            "busy_timeout": self.busy_timeout_ms,
+            # Negative values are KiB rather than pages.
+            "cache_size": -self.cache_size_kb,
+            "mmap_size": self.mmap_size_mb << 20,
+            "temp_store": self.temp_store,
+            "foreign_keys": "ON" if self.foreign_keys else "OFF",
+        }
+
+    def apply(self, dbapi_connection) -> None:
+        """Set the pragmas on a raw DB-API connection."""
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in self.pragmas().items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
+
+    def create_engine(self, url: str) -> Engine:
+        """Create an engine whose connections use this profile."""
+        engine = create_engine(
+            url,
+            echo=False,
+            future=True,
+            pool_size=self.pool_size,
+            max_overflow=self.max_overflow,
+            pool_timeout=self.pool_timeout_s,
+            connect_args={"timeout": self.busy_timeout_ms / 1000},
+        )
+        event.listen(
+            engine, "connect", lambda conn, _record: self.apply(conn)
+        )
+        return engine
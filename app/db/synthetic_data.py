@@ -0,0 +1,261 @@
+r"""Fill the database with synthetic users, chats and messages.
+
+Run from the repository root (uses `DBPATH` like the app)::
+
+    PYTHONPATH=./app python -m db.synthetic_data --users 100 \
+        --chats 50 --messages 200
+
+That writes one million messages. Use `--owner` with the `auid` of a
+browser session to give that session the first user's chats.
+
+Rows are written with DB-API executemany bulk inserts in large batches
+inside a single transaction; the ORM unit of work is bypassed entirely,
+and the search index is filled once at the end.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from itertools import count
+from typing import TYPE_CHECKING
+
+from . import search_index
+from .bulk import BATCH_SIZE, insert_many, stored_datetime
+from .database_manager import DatabaseManager
+from .models import Chat, Message, User
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from sqlalchemy.engine import Engine
+
+WORDS = (
+    "hallo welt morse code funk sos test gruss danke bitte wetter heute "
+    "morgen abend station antenne signal frequenz rufzeichen qth name "
+    "alles gut bis bald hello world cq de dl1abc pse k 73 tu rst 599 "
+    "over the quick brown fox jumps lazy dog 2024 10 42 7"
+)
+INVALID = "#*%~^"
+
+
+def _phrases(rng: random.Random, size: int) -> list[tuple]:
+    """Build a pool of `(input, input_is_morse, reply, is_error)` rows."""
+    from services.morse_converter import ConversionError, MorseConverter
+
+    words = WORDS.split()
+    pool: list[tuple] = []
+    for _ in range(size):
+        text = " ".join(rng.choices(words, k=rng.randint(1, 8)))
+        kind = rng.random()
+        if kind < 0.05:
+            # Unsupported characters produce an error reply.
+            text += rng.choice(INVALID)
+        elif kind < 0.35:
+            text = MorseConverter.encode(text)
+        try:
+            reply, reply_is_morse = MorseConverter.convert(text)
+            pool.append((text, not reply_is_morse, reply, False))
+        except ConversionError as exc:
+            pool.append((text, False, str(exc), True))
+    return pool
+
+
+def _ids(rng: random.Random) -> Iterator[str]:
+    """Yield unique UUID-shaped ids: a random prefix and a counter.
+
+    Much cheaper than `uuid.uuid4()` per row and reproducible per seed.
+    """
+    bits = f"{rng.getrandbits(76):019x}"
+    prefix = f"{bits[:8]}-{bits[8:12]}-4{bits[12:15]}-{bits[15:19]}-"
+    return (f"{prefix}{n:012x}" for n in count())
+
+
+def generate(
+    engine: Engine,
+    users: int,
+    chats_per_user: int,
+    messages_per_chat: int,
+    seed: int = 0,
+    owner: str | None = None,
+    days: int = 365,
+) -> dict[str, int]:
+    """Insert synthetic data and return the number of rows per table.
+
+    Every chat alternates user input (text or Morse, about 5 % with
+    unsupported characters) and the converted reply or error message,
+    spread over the last `days` days. About one chat in ten is pinned.
+
+    Args:
+        engine: Engine of the target SQLite database (schema is created).
+        users: Number of users to create.
+        chats_per_user: Chats per user.
+        messages_per_chat: Messages per chat (rounded down to pairs).
+        seed: Seed for reproducible data.
+        owner: Optional id for the first user, e.g. a browser `auid`.
+        days: Time span the messages are spread over.
+
+    """
+    rng = random.Random(seed)
+    pool = _phrases(rng, 2_000)
+    now = datetime.now().replace(microsecond=0)
+    span = days * 86_400.0
+    pairs = max(0, messages_per_chat // 2)
+    created_at = stored_datetime(now)
+    next_id = _ids(rng).__next__
+
+    user_ids = [
+        owner if owner and index == 0 else next_id() for index in range(users)
+    ]
+
+    def chats() -> Iterator[tuple[tuple, list[tuple]]]:
+        """Yield each chat row together with its message rows."""
+        for user_id in user_ids:
+            for _ in range(chats_per_user):
+                chat_id = next_id()
+                offset = -rng.random() * span
+                # Keep the whole chat before "now".
+                step = -offset / max(1, 2 * pairs)
+                created = now + timedelta(seconds=offset)
+                stamp = created
+                title = "Neuer Chat"
+                rows = []
+                for pair in range(pairs):
+                    text, is_morse, reply, is_error = rng.choice(pool)
+                    if pair == 0 and not is_error:
+                        title = (text[:30] + "…") if len(text) > 30 else text
+                    offset += rng.random() * step
+                    stamp = now + timedelta(seconds=offset)
+                    rows.append(
+                        (
+                            next_id(),
+                            chat_id,
+                            text,
+                            is_morse,
+                            False,
+                            stored_datetime(stamp),
+                        )
+                    )
+                    # Replies follow their input by one microsecond.
+                    stamp += timedelta(microseconds=1)
+                    rows.append(
+                        (
+                            next_id(),
+                            chat_id,
+                            reply,
+                            not is_morse and not is_error,
+                            is_error,
+                            stored_datetime(stamp),
+                        )
+                    )
+                chat_row = (
+                    chat_id,
+                    user_id,
+                    title,
+                    rng.random() < 0.1,
+                    stored_datetime(created),
+                    stored_datetime(stamp),
+                    stored_datetime(stamp),
+                )
+                yield chat_row, rows
+
+    Message.metadata.create_all(engine)
+    chat_count = message_count = 0
+    with engine.begin() as conn, search_index.deferred(conn):
+        insert_many(
+            conn,
+            User.__table__,
+            ("id", "created_at"),
+            [(user_id, created_at) for user_id in user_ids],
+            # The `--owner` session may already have its user row.
+            on_conflict="IGNORE",
+        )
+        chat_rows: list[tuple] = []
+        message_rows: list[tuple] = []
+
+        def flush() -> None:
+            # Chats go first, so the messages' foreign keys hold.
+            nonlocal chat_count, message_count
+            chat_count += insert_many(
+                conn,
+                Chat.__table__,
+                (
+                    "id",
+                    "user_id",
+                    "title",
+                    "pinned",
+                    "created_at",
+                    "updated_at",
+                    "unpinned_at",
+                ),
+                chat_rows,
+            )
+            message_count += insert_many(
+                conn,
+                Message.__table__,
+                (
+                    "id",
+                    "chat_id",
+                    "content",
+                    "is_morse",
+                    "is_error",
+                    "timestamp",
+                ),
+                message_rows,
+            )
+            chat_rows.clear()
+            message_rows.clear()
+
+        for chat_row, rows in chats():
+            chat_rows.append(chat_row)
+            message_rows.extend(rows)
+            if len(message_rows) >= BATCH_SIZE:
+                flush()
+        flush()
+    return {
+        "users": len(user_ids),
+        "chats": chat_count,
+        "messages": message_count,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(
+        description="Fill the database with synthetic chats and messages."
+    )
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--chats", type=int, default=20, help="chats per user")
+    parser.add_argument(
+        "--messages", type=int, default=50, help="messages per chat"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--owner", help="user id for the first user")
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args(argv)
+
+    DatabaseManager.init_db()
+    started = time.perf_counter()
+    counts = generate(
+        DatabaseManager.engine,
+        args.users,
+        args.chats,
+        args.messages,
+        seed=args.seed,
+        owner=args.owner,
+        days=args.days,
+    )
+    elapsed = time.perf_counter() - started
+    print(
+        f"{counts['users']} users, {counts['chats']} chats, "
+        f"{counts['messages']} messages in {elapsed:.1f} s "
+        f"({DatabaseManager.engine.url.database})"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
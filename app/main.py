@@ -1,3 +1,4 @@
+import logging
 import os
 
 from dotenv import load_dotenv
@@ -6,17 +7,42 @@ from dotenv import load_dotenv
 load_dotenv(override=True)
 
 from db import DatabaseManager  # noqa: E402
+from services import ChatService  # noqa: E402
 from ui import ViewManager  # noqa: E402
 
+logger = logging.getLogger("morse_chat")
+
 storage_secret = os.getenv(
     "SSECRET",
     "62ca79c467777fd6101172d11b555bf20608291dc0830ef9e2d66b98346372c2",
 )
 
 
+def report_query_plans() -> None:
+    """Log how SQLite runs the paging queries; warn if an index is unused."""
+    for name, plan in ChatService.query_plans().items():
+        indexed = not any(
+            step.startswith("SCAN") or "TEMP B-TREE" in step for step in plan
+        )
+        log = logger.info if indexed else logger.warning
+        log("Query plan %s: %s", name, "; ".join(plan))
+
+
+def report_database_settings() -> None:
+    """Log the effective SQLite pragmas and pool configuration."""
+    settings = DatabaseManager.settings()
+    logger.info(
+        "SQLite settings: %s",
+        ", ".join(f"{name}={value}" for name, value in settings.items()),
+    )
+
+
 def start() -> None:
     """Initialize database and start the UI application."""
+    logging.basicConfig(level=os.getenv("LOGLEVEL", "INFO"))
     DatabaseManager.init_db()
+    report_database_settings()
+    report_query_plans()
     ViewManager(storage_secret=storage_secret, show=False).run()
 
 
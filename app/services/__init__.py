@@ -1,26 +1,65 @@
-from .chat_service import ChatService
+from .audio_decoder import AudioDecodeError, MorseAudioDecoder
+from .batch_converter import BatchConverter, BatchResult
+from .chat_export import ChatExport
+from .chat_service import ChatService, ChatSummary, SearchHit
+from .codebook import Codebook
+from .conversion_cache import ConversionCache
 from .file_upload_service import (
     EmptyFileError,
+    FileTooLargeError,
     FileUploadError,
     FileUploadService,
+    InvalidAudioError,
     InvalidCharactersError,
     InvalidFileFormatError,
     InvalidMorseError,
     MixedContentError,
 )
-from .morse_converter import ConversionError, MorseConverter
+from .incremental_converter import IncrementalConverter
+from .keyer_decoder import KeyerDecoder
+from .known_users import KnownUsers
+from .message_writer import MessageWriter
+from .morse_converter import (
+    ConversionError,
+    ConversionIssue,
+    ConversionResult,
+    MorseConverter,
+)
+from .morse_decoder import MorseDecoder
+from .purge_worker import PurgeWorker
+from .search_query import SearchQuery
 from .user_manager import UserManager
 
 __all__ = [
+    "AudioDecodeError",
+    "BatchConverter",
+    "BatchResult",
+    "ChatExport",
     "ChatService",
+    "ChatSummary",
+    "Codebook",
+    "ConversionCache",
     "FileUploadService",
     "InvalidFileFormatError",
     "EmptyFileError",
+    "FileTooLargeError",
+    "InvalidAudioError",
     "MixedContentError",
     "InvalidCharactersError",
     "InvalidMorseError",
     "FileUploadError",
+    "IncrementalConverter",
+    "KeyerDecoder",
+    "KnownUsers",
+    "MessageWriter",
+    "MorseAudioDecoder",
     "MorseConverter",
+    "MorseDecoder",
+    "PurgeWorker",
+    "SearchHit",
+    "SearchQuery",
     "ConversionError",
+    "ConversionIssue",
+    "ConversionResult",
     "UserManager",
 ]
@@ -0,0 +1,205 @@
+"""Batch conversion of many values across worker processes."""
+
+import os
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import repeat
+
+from .codebook import Codebook
+from .morse_converter import ConversionError, MorseConverter
+
+
+@dataclass(frozen=True, slots=True)
+class BatchResult:
+    """Outcome of converting a single batch item.
+
+    Exactly one of `output` and `error` is set. `is_morse` tells whether
+    `output` is Morse code, like the second value returned by
+    `MorseConverter.convert`.
+    """
+
+    output: str | None
+    is_morse: bool = False
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        """Return True if the item was converted successfully."""
+        return self.error is None
+
+
+def _convert_chunk(
+    values: Sequence[str], codebook: Codebook | str | None = None
+) -> list[BatchResult]:
+    """Convert a slice of the batch (runs inside a worker process)."""
+    results: list[BatchResult] = []
+    for value in values:
+        try:
+            output, is_morse = MorseConverter.convert(value, codebook)
+        except ConversionError as exc:
+            results.append(BatchResult(output=None, error=str(exc)))
+        else:
+            results.append(BatchResult(output=output, is_morse=is_morse))
+    return results
+
+
+def _convert_shard(
+    shard: str, is_morse: bool, codebook: str
+) -> tuple[str | None, str, int]:
+    """Convert one shard of a document (runs inside a worker process).
+
+    Returns:
+        `(output, "", 0)` on success, `(None, message, local_offset)` if
+        the shard contains an invalid symbol.
+
+    """
+    try:
+        if is_morse:
+            output = MorseConverter.decode_stripped(shard.strip(), codebook)
+        else:
+            output = MorseConverter.encode_upper(shard.upper(), codebook)
+        return output, "", 0
+    except ConversionError as exc:
+        return None, str(exc), exc.offset or 0
+
+
+def _split_shards(
+    value: str, separator: str, keep: int, size: int
+) -> list[tuple[int, str]]:
+    """Cut `value` at the first `separator` after every `size` characters.
+
+    `keep` characters of the separator stay at the end of the left shard.
+
+    Returns:
+        `(start_offset, shard)` pairs covering `value` without gaps.
+
+    """
+    shards: list[tuple[int, str]] = []
+    start = 0
+    while start < len(value):
+        cut = value.find(separator, start + size)
+        if cut == -1:
+            shards.append((start, value[start:]))
+            break
+        cut += keep
+        shards.append((start, value[start:cut]))
+        start = cut
+    return shards
+
+
+class BatchConverter:
+    """Convert many values at once, optionally on several CPU cores.
+
+    Small batches are converted in-process because starting a pool costs
+    more than it saves. Larger batches are cut into chunks of
+    `chunk_size` values and spread over a `ProcessPoolExecutor`; results
+    always come back in input order.
+    """
+
+    PARALLEL_THRESHOLD = 5_000
+    MIN_CHUNK_SIZE = 256
+    MAX_CHUNK_SIZE = 20_000
+
+    DOCUMENT_THRESHOLD = 1024 * 1024
+    MIN_SHARD_SIZE = 64 * 1024
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        chunk_size: int | None = None,
+        parallel_threshold: int = PARALLEL_THRESHOLD,
+        shard_size: int | None = None,
+        document_threshold: int = DOCUMENT_THRESHOLD,
+        codebook: Codebook | str | None = None,
+    ) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.parallel_threshold = parallel_threshold
+        self.shard_size = shard_size
+        self.document_threshold = document_threshold
+        # Workers look the compiled codebook up by name in their registry.
+        self.codebook = Codebook.get(codebook).name
+
+    def convert_many(self, values: Iterable[str]) -> list[BatchResult]:
+        """Convert every value, auto-detecting the direction per item.
+
+        Args:
+            values: Text or Morse code strings, in any mix.
+
+        Returns:
+            One `BatchResult` per value, in input order. Conversion errors
+            are reported per item instead of aborting the batch.
+
+        """
+        items = list(values)
+        if self.workers <= 1 or len(items) < self.parallel_threshold:
+            return _convert_chunk(items, self.codebook)
+
+        size = self._chunk_size_for(len(items))
+        chunks = [items[i : i + size] for i in range(0, len(items), size)]
+        results: list[BatchResult] = []
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            for chunk_results in pool.map(
+                _convert_chunk, chunks, repeat(self.codebook)
+            ):
+                results.extend(chunk_results)
+        return results
+
+    def convert_document(self, value: str) -> tuple[str, bool]:
+        """Convert one large document, spreading it over several cores.
+
+        Morse input is cut after `/` word separators and text input at
+        spaces, so every shard converts independently. The stitched result
+        is identical to `MorseConverter.convert(value)`.
+
+        Returns:
+            `(result, result_is_morse)` like `MorseConverter.convert`.
+
+        Raises:
+            ConversionError: Same message as the serial path; `offset` is
+                the global character (text) or token (Morse) index.
+
+        """
+        too_small = len(value) < self.document_threshold
+        if self.workers <= 1 or too_small or not value.strip():
+            return MorseConverter.convert(value, self.codebook)
+        input_is_morse = MorseConverter.is_morse(value, self.codebook)
+
+        size = self.shard_size or max(
+            self.MIN_SHARD_SIZE, -(-len(value) // (self.workers * 4))
+        )
+        if input_is_morse:
+            shards = _split_shards(value.strip(), " / ", 2, size)
+        else:
+            shards = _split_shards(value, " ", 0, size)
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            outputs = list(
+                pool.map(
+                    _convert_shard,
+                    [shard for _, shard in shards],
+                    repeat(input_is_morse),
+                    repeat(self.codebook),
+                )
+            )
+
+        parts: list[str] = []
+        for index, (output, message, offset) in enumerate(outputs):
+            if output is None:
+                if input_is_morse:
+                    offset += sum(len(s.split()) for _, s in shards[:index])
+                else:
+                    offset += shards[index][0]
+                raise ConversionError(message, offset)
+            parts.append(output)
+        if input_is_morse:
+            return "".join(parts), False
+        return " ".join(parts), True
+
+    def _chunk_size_for(self, count: int) -> int:
+        """Pick a chunk size giving each worker a few chunks to balance."""
+        if self.chunk_size is not None:
+            return max(1, self.chunk_size)
+        size = -(-count // (self.workers * 4))
+        return max(self.MIN_CHUNK_SIZE, min(size, self.MAX_CHUNK_SIZE))
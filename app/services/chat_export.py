@@ -0,0 +1,153 @@
+"""Streaming export of chats as JSON, NDJSON or a ZIP archive."""
+
+import json
+import os
+import zipfile
+from collections.abc import Iterable, Iterator
+from typing import ClassVar
+
+from db.models import Chat, Message
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+_dumps = json.JSONEncoder(ensure_ascii=False).encode
+
+# The fields of `Message.to_dict`, read as plain rows: building ORM
+# objects would cost more than encoding them.
+_MESSAGE_COLUMNS = (
+    Message.id,
+    Message.content,
+    Message.is_morse,
+    Message.is_error,
+    Message.timestamp,
+)
+
+
+def _message_dict(row) -> dict:
+    return {
+        "id": row.id,
+        "content": row.content,
+        "is_morse": row.is_morse,
+        "is_error": row.is_error,
+        "timestamp": row.timestamp.isoformat(timespec="seconds"),
+    }
+
+
+class _ChunkSink:
+    """Write-only, non-seekable file object collecting written bytes.
+
+    `zipfile` streams into it (writing data descriptors instead of
+    seeking back), and `drain` hands the bytes on to the response.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._offset = 0
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._offset
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ChatExport:
+    """Encode chats chunk by chunk while reading them from `session`.
+
+    Messages are fetched with `yield_per`, so SQLite steps through the
+    result in batches of `batch_size` rows and at most one batch is held
+    in memory at a time, however long the chat is. Each batch becomes one
+    encoded chunk of the response.
+
+    Formats:
+        json: The chat object with its `messages` array, as produced by
+            `Chat.to_dict`, one message per line.
+        ndjson: One line with the chat (without messages), then one line
+            per message.
+    """
+
+    FORMATS: ClassVar[dict[str, str]] = {
+        "json": "application/json",
+        "ndjson": "application/x-ndjson",
+    }
+    ARCHIVE_MEDIA_TYPE = "application/zip"
+
+    def __init__(
+        self, session: Session, batch_size: int = EXPORT_BATCH_SIZE
+    ) -> None:
+        self.session = session
+        self.batch_size = batch_size
+
+    @classmethod
+    def check_format(cls, fmt: str) -> None:
+        """Raise ValueError for an unsupported export format."""
+        if fmt not in cls.FORMATS:
+            msg = f"Unbekanntes Exportformat: {fmt}"
+            raise ValueError(msg)
+
+    def message_batches(self, chat_id: str) -> Iterator[list[dict]]:
+        """Yield the chat's messages, oldest first, as lists of dicts."""
+        stmt = (
+            select(*_MESSAGE_COLUMNS)
+            .where(Message.chat_id == chat_id)
+            .order_by(Message.timestamp, Message.id)
+        )
+        result = self.session.execute(
+            stmt, execution_options={"yield_per": self.batch_size}
+        )
+        for batch in result.partitions():
+            yield [_message_dict(row) for row in batch]
+
+    def chat_chunks(self, chat: Chat, fmt: str = "json") -> Iterator[bytes]:
+        """Yield `chat` encoded in `fmt`, one chunk per message batch."""
+        self.check_format(fmt)
+        header = chat.to_dict(with_messages=False)
+        if fmt == "ndjson":
+            yield (_dumps(header) + "\n").encode()
+            for batch in self.message_batches(chat.id):
+                yield "".join(_dumps(m) + "\n" for m in batch).encode()
+            return
+
+        # Reopen the header object to append the messages array.
+        yield (_dumps(header)[:-1] + ', "messages": [').encode()
+        separator = "\n"
+        for batch in self.message_batches(chat.id):
+            parts = []
+            for message in batch:
+                parts.append(separator + _dumps(message))
+                separator = ",\n"
+            yield "".join(parts).encode()
+        yield b"\n]}\n"
+
+    def archive_chunks(
+        self, chats: Iterable[Chat], fmt: str = "json"
+    ) -> Iterator[bytes]:
+        """Yield a deflated ZIP archive with one `fmt` file per chat."""
+        self.check_format(fmt)
+        sink = _ChunkSink()
+        with zipfile.ZipFile(
+            sink, "w", compression=zipfile.ZIP_DEFLATED
+        ) as archive:
+            for chat in chats:
+                name = f"{chat.created_at:%Y-%m-%d}_{chat.id}.{fmt}"
+                # Sizes are unknown up front; zip64 headers allow any size.
+                with archive.open(name, "w", force_zip64=True) as entry:
+                    for chunk in self.chat_chunks(chat, fmt):
+                        entry.write(chunk)
+                        if data := sink.drain():
+                            yield data
+                if data := sink.drain():
+                    yield data
+        yield sink.drain()
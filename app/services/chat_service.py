@@ -1,12 +1,69 @@
-import json
-from datetime import datetime
+import uuid
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import ClassVar
 
 from db import DatabaseManager
 from db.models import Chat, Message, User
-from sqlalchemy import case, select
+from db.search_index import chats_fts, messages_fts
+from sqlalchemy import (
+    func,
+    literal_column,
+    null,
+    select,
+    tuple_,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session, joinedload
 
-from .morse_converter import ConversionError, MorseConverter
+from .chat_export import ChatExport
+from .conversion_cache import ConversionCache
+from .known_users import KnownUsers
+from .message_writer import MessageWriter, PendingSend
+from .morse_converter import (
+    ConversionError,
+    ConversionResult,
+    MorseConverter,
+)
+from .purge_worker import PURGE_UNDO_SECONDS
+from .search_query import SEARCH_CANDIDATES, SearchQuery
+
+
+@dataclass(frozen=True, slots=True)
+class ChatSummary:
+    """Lightweight sidebar row for a chat; no `Message` objects attached.
+
+    `sort_at` and `created_at` are part of the sidebar order and let a
+    summary serve as the cursor for the next page.
+    """
+
+    id: str
+    title: str
+    pinned: bool
+    created_at: datetime
+    updated_at: datetime
+    sort_at: datetime
+    message_count: int
+    last_message: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class SearchHit:
+    """One search result: a message, or a chat whose title matched.
+
+    `message_id` is None for a title match; `content` then holds the
+    title. Lower `rank` values are better matches.
+    """
+
+    chat_id: str
+    chat_title: str
+    message_id: str | None
+    content: str
+    timestamp: datetime
+    rank: float
 
 
 class ChatService:
@@ -14,58 +71,319 @@ class ChatService:
 
     Each public method opens its own session so the UI layer doesn't have
     to deal with persistence concerns.
+
+    Conversions go through `conversion_cache` when one is configured
+    (opt-in via `CONVERSION_CACHE_ENTRIES`); it is shared by all sessions.
+    User ids whose row is known to exist are kept in `known_users`, so
+    most calls go straight to their actual query. With write-behind
+    enabled (`MESSAGE_WRITE_BEHIND`), sent messages are committed in
+    batches by the shared `message_writer`.
     """
 
+    conversion_cache: ClassVar[ConversionCache | None] = (
+        ConversionCache.from_env()
+    )
+    known_users: ClassVar[KnownUsers] = KnownUsers()
+    message_writer: ClassVar[MessageWriter | None] = MessageWriter.from_env()
+
     def __init__(self, user_auid: str) -> None:
         self.user_auid = user_auid
+        self._user_resolved = False
 
     @staticmethod
     def _session() -> Session:
         return DatabaseManager.session()
 
     def _get_or_create_user_id(self, session: Session) -> str:
-        stmt = select(User).where(User.id == self.user_auid)
-        user = session.execute(stmt).scalar_one_or_none()
-        if user is None:
-            user = User(id=self.user_auid)
-            session.add(user)
-            session.flush()
-        return user.id
+        """Return the user id, making sure its row exists.
+
+        Resolved once per instance. A user not yet in `known_users` costs
+        one committed upsert (`INSERT ... ON CONFLICT DO NOTHING`), which
+        is atomic, so concurrent first visits cannot collide.
+        """
+        if self._user_resolved:
+            return self.user_auid
+        database = str(DatabaseManager.engine.url)
+        if not self.known_users.contains(database, self.user_auid):
+            session.execute(
+                sqlite_insert(User)
+                .values(id=self.user_auid)
+                .on_conflict_do_nothing()
+            )
+            session.commit()
+            self.known_users.add(database, self.user_auid)
+        self._user_resolved = True
+        return self.user_auid
 
     def list_chats(self) -> list[Chat]:
         """Get all chats for current user, ordered by pin and recency."""
         with self._session() as session:
             user_id = self._get_or_create_user_id(session)
-            sort_key = case(
-                (Chat.pinned.is_(True), Chat.updated_at),
-                else_=Chat.unpinned_at,
-            )
             stmt = (
                 select(Chat)
                 .options(joinedload(Chat.messages))
                 .where(Chat.user_id == user_id)
                 .order_by(
-                    Chat.pinned.desc(), sort_key.desc(), Chat.created_at.desc()
+                    Chat.pinned.desc(),
+                    Chat.sort_key().desc(),
+                    Chat.created_at.desc(),
+                    Chat.id.desc(),
                 )
             )
             chats = session.execute(stmt).unique().scalars().all()
             session.expunge_all()
             return list(chats)
 
-    def get_chat(self, chat_id: str) -> Chat | None:
-        """Retrieve a specific chat by ID if it belongs to the current user."""
+    @staticmethod
+    def _summaries_stmt(
+        user_id: str,
+        limit: int,
+        after: ChatSummary | None,
+        preview_length: int = 80,
+    ):
+        sort_key = Chat.sort_key()
+        message_count = (
+            select(func.count(Message.id))
+            .where(Message.chat_id == Chat.id)
+            .scalar_subquery()
+        )
+        last_message = (
+            select(func.substr(Message.content, 1, preview_length))
+            .where(Message.chat_id == Chat.id)
+            .order_by(Message.timestamp.desc(), Message.id.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+        order = (Chat.pinned, sort_key, Chat.created_at, Chat.id)
+        stmt = (
+            select(
+                Chat.id,
+                Chat.title,
+                Chat.pinned,
+                Chat.created_at,
+                Chat.updated_at,
+                sort_key,
+                message_count,
+                last_message,
+            )
+            .where(Chat.user_id == user_id)
+            .order_by(*(column.desc() for column in order))
+            .limit(limit)
+        )
+        if after is not None:
+            stmt = stmt.where(
+                tuple_(*order)
+                < tuple_(
+                    after.pinned, after.sort_at, after.created_at, after.id
+                )
+            )
+        return stmt
+
+    def list_chat_summaries(
+        self,
+        limit: int = 50,
+        after: ChatSummary | None = None,
+        preview_length: int = 80,
+    ) -> list[ChatSummary]:
+        """Get one page of chat summaries in sidebar order.
+
+        Counts and previews come from correlated subqueries, so no
+        message rows leave the database. Pages use keyset pagination:
+        pass the last summary of a page as `after` to get the next one.
+
+        Args:
+            limit: Maximum number of summaries to return.
+            after: Last summary of the previous page, if any.
+            preview_length: Characters of the last message to include.
+
+        """
         with self._session() as session:
             user_id = self._get_or_create_user_id(session)
-            stmt = (
-                select(Chat)
-                .options(joinedload(Chat.messages))
-                .where(Chat.id == chat_id, Chat.user_id == user_id)
+            stmt = self._summaries_stmt(user_id, limit, after, preview_length)
+            rows = session.execute(stmt).all()
+        return [ChatSummary(*row) for row in rows]
+
+    def get_chat(
+        self, chat_id: str, with_messages: bool = True
+    ) -> Chat | None:
+        """Retrieve a specific chat by ID if it belongs to the current user.
+
+        With `with_messages=False` the messages are not loaded; use
+        `get_messages` to page through them instead.
+        """
+        with self._session() as session:
+            user_id = self._get_or_create_user_id(session)
+            stmt = select(Chat).where(
+                Chat.id == chat_id, Chat.user_id == user_id
             )
+            if with_messages:
+                stmt = stmt.options(joinedload(Chat.messages))
             chat = session.execute(stmt).unique().scalar_one_or_none()
             if chat is not None:
                 session.expunge(chat)
             return chat
 
+    @staticmethod
+    def _messages_stmt(
+        user_id: str, chat_id: str, before: Message | None, limit: int
+    ):
+        stmt = (
+            select(Message)
+            .join(Chat, Chat.id == Message.chat_id)
+            .where(Message.chat_id == chat_id, Chat.user_id == user_id)
+            .order_by(Message.timestamp.desc(), Message.id.desc())
+            .limit(limit)
+        )
+        if before is not None:
+            stmt = stmt.where(
+                tuple_(Message.timestamp, Message.id)
+                < tuple_(before.timestamp, before.id)
+            )
+        return stmt
+
+    @classmethod
+    def query_plans(cls) -> dict[str, list[str]]:
+        """Return the SQLite query plans of the paging queries.
+
+        Meant as a startup check: each page should be served by an index
+        (`SEARCH ... USING INDEX`), without a table scan or a temporary
+        B-tree for sorting.
+        """
+        now = datetime.now()
+        cursor_chat = ChatSummary("", "", False, now, now, now, 0, None)
+        cursor_message = Message(id="", timestamp=now)
+        statements = {
+            "list_chat_summaries": cls._summaries_stmt("", 50, None),
+            "list_chat_summaries[after]": cls._summaries_stmt(
+                "", 50, cursor_chat
+            ),
+            "get_messages": cls._messages_stmt("", "", None, 50),
+            "get_messages[before]": cls._messages_stmt(
+                "", "", cursor_message, 50
+            ),
+        }
+        return {
+            name: DatabaseManager.explain(stmt)
+            for name, stmt in statements.items()
+        }
+
+    def get_messages(
+        self,
+        chat_id: str,
+        before: Message | None = None,
+        limit: int = 50,
+    ) -> list[Message]:
+        """Get one page of a chat's messages, oldest first.
+
+        Returns the newest `limit` messages older than `before` (or the
+        newest overall). Pages use keyset pagination on `(timestamp, id)`,
+        so the cost of a page does not depend on the chat's length: pass
+        the first message of a page as `before` to get the previous one.
+
+        Args:
+            chat_id: Chat to read from; must belong to the current user.
+            before: Oldest message of the page loaded so far, if any.
+            limit: Maximum number of messages to return.
+
+        """
+        with self._session() as session:
+            user_id = self._get_or_create_user_id(session)
+            stmt = self._messages_stmt(user_id, chat_id, before, limit)
+            messages = session.execute(stmt).scalars().all()
+            session.expunge_all()
+            return messages[::-1]
+
+    @staticmethod
+    def _index_hits(index, query: SearchQuery, user_id: str, *columns):
+        """Select the user's newest matching entries of `index`.
+
+        Only the `SEARCH_CANDIDATES` most recently written matches that
+        are not soft-deleted are ranked: FTS5 returns them in rowid
+        order and stops early, while ranking every match of a common
+        word would cost tens of milliseconds. Deleted rows stay in the
+        index until they are purged, so they are filtered here (the
+        session adds `deleted_at IS NULL`) rather than after the limit.
+        Materialized, so SQLite runs the full-text match first instead
+        of probing the index once per chat of the user.
+        """
+        name = literal_column(index.name)
+        text_column = "text" if index is messages_fts else "title"
+        hits = select(
+            *columns,
+            # Weights per column: owner, text or title, morse.
+            func.bm25(name, 0, 1, 1).label("rank"),
+        ).select_from(index)
+        if index is messages_fts:
+            hits = hits.join(
+                Message, literal_column("messages.rowid") == index.c.rowid
+            ).join(Chat, Chat.id == Message.chat_id)
+        else:
+            hits = hits.join(
+                Chat, literal_column("chats.rowid") == index.c.rowid
+            )
+        return (
+            hits.where(
+                name.op("MATCH")(query.match(text_column, user_id)),
+                Chat.user_id == user_id,
+            )
+            .order_by(index.c.rowid.desc())
+            .limit(SEARCH_CANDIDATES)
+            .cte(f"{index.name}_hits")
+            .prefix_with("MATERIALIZED")
+        )
+
+    @classmethod
+    def _search_stmt(cls, query: SearchQuery, user_id: str):
+        """Union of matching messages and chat titles, best match first."""
+        messages = cls._index_hits(
+            messages_fts,
+            query,
+            user_id,
+            Chat.id,
+            Chat.title,
+            Message.id,
+            Message.content,
+            Message.timestamp,
+        )
+        titles = cls._index_hits(
+            chats_fts,
+            query,
+            user_id,
+            Chat.id,
+            Chat.title,
+            null(),
+            Chat.title,
+            Chat.updated_at,
+        )
+        hits = union_all(select(messages), select(titles)).subquery()
+        rank, message_id, chat_id = hits.c[5], hits.c[2], hits.c[0]
+        return select(hits).order_by(rank, message_id, chat_id)
+
+    def search(
+        self, query: str, limit: int = 20, offset: int = 0
+    ) -> list[SearchHit]:
+        """Find messages and chat titles matching `query`, best first.
+
+        Text and Morse input both match either form of a conversion (see
+        `SearchQuery`). Results are ranked with bm25 and paged with
+        `limit` and `offset`; the full-text index keeps a page at a few
+        milliseconds even with millions of messages.
+
+        Only the newest `SEARCH_CANDIDATES` matching messages (and as
+        many titles) are found. Once that many results have been paged
+        through, later pages are empty even if older messages match;
+        callers should say so (the sidebar asks to narrow the search).
+        """
+        terms = SearchQuery(query)
+        if not terms:
+            return []
+        with self._session() as session:
+            user_id = self._get_or_create_user_id(session)
+            stmt = (
+                self._search_stmt(terms, user_id).limit(limit).offset(offset)
+            )
+            return [SearchHit(*row) for row in session.execute(stmt)]
+
     def create_chat(self, title: str = "Neuer Chat") -> Chat:
         """Create a new chat for the current user."""
         with self._session() as session:
@@ -85,16 +403,46 @@ class ChatService:
             return chat
 
     def delete_chat(self, chat_id: str) -> None:
-        """Delete a chat and all its messages."""
+        """Mark a chat as deleted; its messages disappear with it.
+
+        Only the chat row is updated, so this returns at once regardless
+        of the chat's size. The rows are purged by `PurgeWorker` once the
+        undo window (see `restore_chat`) has passed.
+        """
         with self._session() as session:
             user_id = self._get_or_create_user_id(session)
-            stmt = select(Chat).where(
-                Chat.id == chat_id, Chat.user_id == user_id
+            session.execute(
+                update(Chat)
+                .where(
+                    Chat.id == chat_id,
+                    Chat.user_id == user_id,
+                    Chat.deleted_at.is_(None),
+                )
+                .values(deleted_at=datetime.now()),
+                execution_options={"synchronize_session": False},
             )
-            chat = session.execute(stmt).scalar_one_or_none()
-            if chat is not None:
-                session.delete(chat)
-                session.commit()
+            session.commit()
+
+    def restore_chat(self, chat_id: str) -> bool:
+        """Undo `delete_chat` within the undo window; True if restored."""
+        with self._session() as session:
+            user_id = self._get_or_create_user_id(session)
+            result = session.execute(
+                update(Chat)
+                .where(
+                    Chat.id == chat_id,
+                    Chat.user_id == user_id,
+                    Chat.deleted_at > self._undo_cutoff(),
+                )
+                .values(deleted_at=None),
+                execution_options={"synchronize_session": False},
+            )
+            session.commit()
+            return result.rowcount > 0
+
+    @staticmethod
+    def _undo_cutoff() -> datetime:
+        return datetime.now() - timedelta(seconds=PURGE_UNDO_SECONDS)
 
     def toggle_pin(self, chat_id: str) -> bool:
         """Toggle the pinned state of a chat and return the new state."""
@@ -125,90 +473,195 @@ class ChatService:
                 session.commit()
 
     def clear_messages(self, chat_id: str) -> None:
-        """Delete all messages in a chat."""
+        """Mark all messages in a chat as deleted with a single `UPDATE`.
+
+        `restore_messages` brings them back within the undo window.
+        """
         with self._session() as session:
             user_id = self._get_or_create_user_id(session)
-            stmt = select(Chat).where(
+            owned = select(Chat.id).where(
                 Chat.id == chat_id, Chat.user_id == user_id
             )
-            chat = session.execute(stmt).scalar_one_or_none()
-            if chat is None:
-                return
-            for message in list(chat.messages):
-                session.delete(message)
+            session.execute(
+                update(Message)
+                .where(
+                    Message.chat_id == chat_id,
+                    Message.chat_id.in_(owned),
+                    Message.deleted_at.is_(None),
+                )
+                .values(deleted_at=datetime.now()),
+                execution_options={"synchronize_session": False},
+            )
             session.commit()
 
+    def restore_messages(self, chat_id: str) -> int:
+        """Restore messages deleted within the undo window; returns count."""
+        with self._session() as session:
+            user_id = self._get_or_create_user_id(session)
+            owned = select(Chat.id).where(
+                Chat.id == chat_id, Chat.user_id == user_id
+            )
+            result = session.execute(
+                update(Message)
+                .where(
+                    Message.chat_id == chat_id,
+                    Message.chat_id.in_(owned),
+                    Message.deleted_at > self._undo_cutoff(),
+                )
+                .values(deleted_at=None),
+                execution_options={"synchronize_session": False},
+            )
+            session.commit()
+            return result.rowcount
+
     def delete_message(self, message_id: str) -> None:
-        """Delete a specific message."""
+        """Mark a specific message as deleted."""
         with self._session() as session:
             user_id = self._get_or_create_user_id(session)
-            stmt = (
-                select(Message)
-                .join(Chat, Chat.id == Message.chat_id)
-                .where(Message.id == message_id, Chat.user_id == user_id)
+            owned = select(Chat.id).where(Chat.user_id == user_id)
+            session.execute(
+                update(Message)
+                .where(
+                    Message.id == message_id,
+                    Message.chat_id.in_(owned),
+                    Message.deleted_at.is_(None),
+                )
+                .values(deleted_at=datetime.now()),
+                execution_options={"synchronize_session": False},
             )
-            msg = session.execute(stmt).scalar_one_or_none()
-            if msg is not None:
-                session.delete(msg)
-                session.commit()
+            session.commit()
+
+    @classmethod
+    def analyze(cls, value: str) -> ConversionResult:
+        """Analyze `value`, through the conversion cache if enabled."""
+        if cls.conversion_cache is not None:
+            return cls.conversion_cache.analyze(value)
+        return MorseConverter.analyze(value)
 
-    def send_message(self, chat_id: str, raw_input: str) -> list[Message]:
-        """Persist the user's input + the converted response (or an error)."""
+    def send_message(
+        self,
+        chat_id: str,
+        raw_input: str,
+        analysis: ConversionResult | None = None,
+    ) -> list[Message]:
+        """Persist the user's input + the converted response (or an error).
+
+        `analysis` may carry a result already computed for the cleaned
+        input (e.g. by upload validation) so it is not converted twice.
+        """
         cleaned = raw_input.strip()
         if not cleaned:
             raise ConversionError("Bitte etwas eingeben.")
 
-        input_is_morse = MorseConverter.is_morse(cleaned)
-        try:
-            output, output_is_morse = MorseConverter.convert(cleaned)
-            error = False
-        except ConversionError as exc:
-            output = str(exc)
-            output_is_morse = False
-            error = True
+        if analysis is None or analysis.source != cleaned:
+            analysis = self.analyze(cleaned)
+        input_is_morse = analysis.input_is_morse
+        error = not analysis.ok
+        output = analysis.error if error else analysis.output
+        output_is_morse = analysis.output_is_morse
+
+        # The reply is stamped right after the input, so the pair keeps
+        # its order when paging on (timestamp, id). Ids and values are
+        # set here, so the rows need no refresh after the commit.
+        now = datetime.now()
+        user_msg = Message(
+            id=str(uuid.uuid4()),
+            chat_id=chat_id,
+            content=cleaned,
+            is_morse=input_is_morse,
+            is_error=False,
+            timestamp=now,
+        )
+        bot_msg = Message(
+            id=str(uuid.uuid4()),
+            chat_id=chat_id,
+            content=output,
+            is_morse=output_is_morse and not error,
+            is_error=error,
+            timestamp=now + timedelta(microseconds=1),
+        )
+        title = None
+        if not error:
+            title = (cleaned[:30] + "…") if len(cleaned) > 30 else cleaned
+        send = PendingSend(chat_id, title, (user_msg, bot_msg), now)
 
         with self._session() as session:
             user_id = self._get_or_create_user_id(session)
-            stmt = select(Chat).where(
+            stmt = select(Chat.id).where(
                 Chat.id == chat_id, Chat.user_id == user_id
             )
-            chat = session.execute(stmt).scalar_one_or_none()
-            if chat is None:
+            if session.execute(stmt).first() is None:
                 raise ValueError(f"Chat {chat_id} not found")
+            if self.message_writer is None:
+                MessageWriter.write(session.connection(), [send])
+                session.commit()
+                return [user_msg, bot_msg]
+        self.message_writer.submit(send)
+        return [user_msg, bot_msg]
 
-            user_msg = Message(
-                chat_id=chat_id,
-                content=cleaned,
-                is_morse=input_is_morse,
-            )
-            bot_msg = Message(
-                chat_id=chat_id,
-                content=output,
-                is_morse=output_is_morse and not error,
-                is_error=error,
-            )
-            session.add_all([user_msg, bot_msg])
-
-            if not chat.messages and not error:
-                chat.title = (
-                    (cleaned[:30] + "…") if len(cleaned) > 30 else cleaned
-                )
-            now = datetime.now()
-            chat.updated_at = now
-            chat.unpinned_at = now
-
-            session.commit()
-            session.refresh(user_msg)
-            session.refresh(bot_msg)
-            session.expunge_all()
-            return [user_msg, bot_msg]
+    @classmethod
+    def flush_messages(cls) -> None:
+        """Wait until queued messages are committed (see `MessageWriter`)."""
+        if cls.message_writer is not None:
+            cls.message_writer.flush()
 
     def export_chat_json(self, chat_id: str) -> str | None:
         """Export a chat as JSON."""
-        chat = self.get_chat(chat_id)
+        chunks = self.export_chat(chat_id)
+        if chunks is None:
+            return None
+        return b"".join(chunks).decode("utf-8")
+
+    def export_chat(
+        self, chat_id: str, fmt: str = "json"
+    ) -> Iterator[bytes] | None:
+        """Stream a chat as encoded `fmt` chunks (see `ChatExport`).
+
+        Returns None if the chat does not exist; otherwise the messages
+        are only read while the returned iterator is consumed.
+
+        Raises:
+            ValueError: If `fmt` is not a supported export format.
+
+        """
+        ChatExport.check_format(fmt)
+        chat = self.get_chat(chat_id, with_messages=False)
         if chat is None:
             return None
-        return json.dumps(chat.to_dict(), indent=2, ensure_ascii=False)
+        return self._stream_chat(chat, fmt)
+
+    def _stream_chat(self, chat: Chat, fmt: str) -> Iterator[bytes]:
+        with self._session() as session:
+            yield from ChatExport(session).chat_chunks(chat, fmt)
+
+    def export_all_chats(self, fmt: str = "json") -> Iterator[bytes]:
+        """Stream all chats of the user as a ZIP archive, oldest first.
+
+        Everything is read in one transaction, so the archive is a
+        consistent snapshot even while the user keeps chatting.
+
+        Raises:
+            ValueError: If `fmt` is not a supported export format.
+
+        """
+        ChatExport.check_format(fmt)
+        return self._stream_archive(fmt)
+
+    def _stream_archive(self, fmt: str) -> Iterator[bytes]:
+        with self._session() as session:
+            user_id = self._get_or_create_user_id(session)
+            # pysqlite sends no BEGIN before a SELECT, so every query
+            # would see the latest commit. An explicit read transaction
+            # pins one WAL snapshot until the session closes.
+            session.connection().exec_driver_sql("BEGIN")
+            export = ChatExport(session)
+            chats = session.execute(
+                select(Chat)
+                .where(Chat.user_id == user_id)
+                .order_by(Chat.created_at, Chat.id),
+                execution_options={"yield_per": export.batch_size},
+            ).scalars()
+            yield from export.archive_chunks(chats, fmt)
 
     def import_text_file(self, chat_id: str, content: str) -> list[Message]:
         """Send a message to a chat (alias for send_message)."""
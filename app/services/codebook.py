@@ -0,0 +1,277 @@
+"""Morse alphabets compiled into lookup structures, plus their registry."""
+
+import re
+from array import array
+from typing import ClassVar
+
+ITU_ALPHABET: dict[str, str] = {
+    "A": ".-",
+    "B": "-...",
+    "C": "-.-.",
+    "D": "-..",
+    "E": ".",
+    "F": "..-.",
+    "G": "--.",
+    "H": "....",
+    "I": "..",
+    "J": ".---",
+    "K": "-.-",
+    "L": ".-..",
+    "M": "--",
+    "N": "-.",
+    "O": "---",
+    "P": ".--.",
+    "Q": "--.-",
+    "R": ".-.",
+    "S": "...",
+    "T": "-",
+    "U": "..-",
+    "V": "...-",
+    "W": ".--",
+    "X": "-..-",
+    "Y": "-.--",
+    "Z": "--..",
+    "0": "-----",
+    "1": ".----",
+    "2": "..---",
+    "3": "...--",
+    "4": "....-",
+    "5": ".....",
+    "6": "-....",
+    "7": "--...",
+    "8": "---..",
+    "9": "----.",
+    ".": ".-.-.-",
+    ",": "--..--",
+    "?": "..--..",
+    "/": "-..-.",
+    "-": "-....-",
+    "(": "-.--.",
+    ")": "-.--.-",
+    " ": "/",
+}
+
+ITU_EXTENSIONS: dict[str, str] = {
+    "Ä": ".-.-",
+    "Ö": "---.",
+    "Ü": "..--",
+    "É": "..-..",
+    "È": ".-..-",
+    "À": ".--.-",
+    "Ñ": "--.--",
+    "@": ".--.-.",
+    "=": "-...-",
+    "+": ".-.-.",
+    "!": "-.-.--",
+    "'": ".----.",
+    '"': ".-..-.",
+    ":": "---...",
+    ";": "-.-.-.",
+    "_": "..--.-",
+    "&": ".-...",
+    "$": "...-..-",
+}
+
+# Prosigns sharing a code with a character (e.g. <AR> and "+") still
+# encode, but decode to the character.
+PROSIGNS: dict[str, str] = {
+    "<AR>": ".-.-.",
+    "<AS>": ".-...",
+    "<BT>": "-...-",
+    "<CT>": "-.-.-",
+    "<HH>": "........",
+    "<KN>": "-.--.",
+    "<SK>": "...-.-",
+    "<SN>": "...-.",
+    "<SOS>": "...---...",
+}
+
+CYRILLIC_ALPHABET: dict[str, str] = {
+    "А": ".-",
+    "Б": "-...",
+    "В": ".--",
+    "Г": "--.",
+    "Д": "-..",
+    "Е": ".",
+    "Ж": "...-",
+    "З": "--..",
+    "И": "..",
+    "Й": ".---",
+    "К": "-.-",
+    "Л": ".-..",
+    "М": "--",
+    "Н": "-.",
+    "О": "---",
+    "П": ".--.",
+    "Р": ".-.",
+    "С": "...",
+    "Т": "-",
+    "У": "..-",
+    "Ф": "..-.",
+    "Х": "....",
+    "Ц": "-.-.",
+    "Ч": "---.",
+    "Ш": "----",
+    "Щ": "--.-",
+    "Ъ": "--.--",
+    "Ы": "-.--",
+    "Ь": "-..-",
+    "Э": "..-..",
+    "Ю": "..--",
+    "Я": ".-.-",
+    "Ё": ".",
+}
+
+
+class Codebook:
+    """A Morse alphabet compiled once into its lookup structures.
+
+    Codebooks are immutable after construction and registered by name in a
+    process-wide registry, so every request (and every worker process)
+    reuses the same compiled tables:
+
+    - `encode_table`: character -> code, used with a single `map` call
+    - `decode_table`: code -> character, with `""` absorbing repeated
+      spaces
+    - `morse_chars`: the character mask used by `is_morse`
+    - `trie_dit`/`trie_dah`/`trie_symbol`: an array-backed dit/dah trie
+      for symbol-at-a-time decoding (node 0 is the root, -1 means "no
+      such code")
+
+    Multi-character prosigns such as `<SK>` are encoded through a
+    private-use placeholder character, so they stay a single table lookup.
+    """
+
+    DEFAULT = "itu"
+    MORSE_CHARS: ClassVar[frozenset[str]] = frozenset(".-/ ")
+
+    _registry: ClassVar[dict[str, "Codebook"]] = {}
+
+    def __init__(
+        self,
+        name: str,
+        alphabet: dict[str, str],
+        prosigns: dict[str, str] | None = None,
+    ) -> None:
+        self.name = name
+        self.alphabet = dict(alphabet)
+        self.prosigns = dict(prosigns or {})
+        self.morse_chars = self.MORSE_CHARS
+
+        # Characters win over prosigns when both share a code.
+        to_text: dict[str, str] = {}
+        for symbol, code in (*self.alphabet.items(), *self.prosigns.items()):
+            to_text.setdefault(code, symbol)
+        self.to_text = to_text
+        self.decode_table = {**to_text, "": ""}
+        self.max_code_length = max(map(len, to_text))
+
+        self._compile_trie()
+
+        self.encode_table = dict(self.alphabet)
+        self._placeholders: dict[str, str] = {}
+        for index, (prosign, code) in enumerate(self.prosigns.items()):
+            placeholder = chr(0xE000 + index)
+            self._placeholders[prosign] = placeholder
+            self.encode_table[placeholder] = code
+        self._prosign_pattern = (
+            re.compile("|".join(map(re.escape, self.prosigns)))
+            if self.prosigns
+            else None
+        )
+
+    def __repr__(self) -> str:  # noqa: D105
+        return f"Codebook({self.name!r})"
+
+    def __reduce__(self):  # noqa: D105
+        # Workers resolve the compiled codebook from their own registry.
+        return Codebook.get, (self.name,)
+
+    def _compile_trie(self) -> None:
+        """Build the dit/dah trie used by `MorseDecoder`."""
+        self.trie_dit = array("i", [-1])
+        self.trie_dah = array("i", [-1])
+        self.trie_symbol: list[str | None] = [None]
+        self.trie_code: list[str] = [""]
+        for code, symbol in self.to_text.items():
+            if code == "/":
+                continue
+            node = 0
+            for mark in code:
+                branch = self.trie_dit if mark == "." else self.trie_dah
+                if branch[node] < 0:
+                    branch[node] = len(self.trie_symbol)
+                    self.trie_dit.append(-1)
+                    self.trie_dah.append(-1)
+                    self.trie_symbol.append(None)
+                    self.trie_code.append(self.trie_code[node] + mark)
+                node = branch[node]
+            self.trie_symbol[node] = symbol
+
+    def prepare_text(self, upper: str) -> str:
+        """Replace prosigns in upper-cased text by their placeholders."""
+        if self._prosign_pattern is None or "<" not in upper:
+            return upper
+        return self._prosign_pattern.sub(
+            lambda match: self._placeholders[match.group()], upper
+        )
+
+    def source_offset(self, upper: str, offset: int) -> int:
+        """Map an index into `prepare_text(upper)` back into `upper`."""
+        if self._prosign_pattern is None or "<" not in upper:
+            return offset
+        shift = 0
+        for match in self._prosign_pattern.finditer(upper):
+            if match.start() - shift >= offset:
+                break
+            # The prosign became a single placeholder character.
+            shift += len(match.group()) - 1
+        return offset + shift
+
+    def reference_table(self) -> list[tuple[str, str]]:
+        """Return all characters and prosigns with their codes."""
+        return [
+            ("SPACE" if ch == " " else ch, code)
+            for ch, code in (*self.alphabet.items(), *self.prosigns.items())
+        ]
+
+    @classmethod
+    def register(cls, codebook: "Codebook") -> "Codebook":
+        """Add a compiled codebook to the registry and return it."""
+        cls._registry[codebook.name] = codebook
+        return codebook
+
+    @classmethod
+    def get(cls, codebook: "Codebook | str | None" = None) -> "Codebook":
+        """Resolve a codebook instance, registry name or the default."""
+        if isinstance(codebook, Codebook):
+            return codebook
+        name = codebook or cls.DEFAULT
+        try:
+            return cls._registry[name]
+        except KeyError:
+            raise ValueError(f"Unknown codebook: {name!r}") from None
+
+    @classmethod
+    def names(cls) -> list[str]:
+        """Return the names of all registered codebooks."""
+        return list(cls._registry)
+
+
+ITU = Codebook.register(Codebook("itu", ITU_ALPHABET))
+ITU_EXTENDED = Codebook.register(
+    Codebook("itu-extended", {**ITU_ALPHABET, **ITU_EXTENSIONS}, PROSIGNS)
+)
+CYRILLIC = Codebook.register(
+    Codebook(
+        "cyrillic",
+        {
+            **CYRILLIC_ALPHABET,
+            **{
+                ch: code
+                for ch, code in ITU_ALPHABET.items()
+                if not ch.isalpha()
+            },
+        },
+    )
+)
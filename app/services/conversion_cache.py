@@ -0,0 +1,142 @@
+"""Bounded, thread-safe LRU memoization of Morse conversions."""
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+from .codebook import Codebook
+from .morse_converter import (
+    ConversionError,
+    ConversionResult,
+    MorseConverter,
+)
+
+# 0 entries disables the cache (the default); it is opt-in.
+CONVERSION_CACHE_ENTRIES = int(os.getenv("CONVERSION_CACHE_ENTRIES", "0"))
+CONVERSION_CACHE_MAX_BYTES = (
+    int(os.getenv("CONVERSION_CACHE_MAX_KB", "4096")) << 10
+)
+CONVERSION_CACHE_MAX_INPUT = int(
+    os.getenv("CONVERSION_CACHE_MAX_INPUT", "256")
+)
+
+
+class ConversionCache:
+    """LRU cache in front of `MorseConverter.analyze`.
+
+    Users convert the same short strings over and over (SOS, call signs,
+    greetings), so results are kept per codebook and input. The cache is
+    bounded by entry count and by the approximate memory of the cached
+    strings; inputs longer than `max_input_length` bypass it, since long
+    inputs rarely repeat and would only push out useful entries.
+
+    `ConversionResult` is immutable, so one instance can be handed to any
+    number of sessions. All bookkeeping happens under a lock, while the
+    conversion itself runs outside of it: two threads missing the same
+    key at once both convert and the later store wins, which is harmless.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 4096,
+        max_bytes: int = CONVERSION_CACHE_MAX_BYTES,
+        max_input_length: int = CONVERSION_CACHE_MAX_INPUT,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_input_length = max_input_length
+        self.hits = 0
+        self.misses = 0
+        # (codebook, input) -> (result, approximate bytes)
+        self._entries: OrderedDict[
+            tuple[str, str], tuple[ConversionResult, int]
+        ] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ConversionCache | None":
+        """Return a cache configured from the environment, if enabled."""
+        if CONVERSION_CACHE_ENTRIES <= 0:
+            return None
+        return cls(max_entries=CONVERSION_CACHE_ENTRIES)
+
+    @staticmethod
+    def _cost(result: ConversionResult) -> int:
+        """Approximate memory held by a cached result."""
+        return (
+            sys.getsizeof(result.source)
+            + sys.getsizeof(result.output)
+            + sys.getsizeof(result.error or "")
+            + 64 * len(result.issues)
+        )
+
+    def analyze(
+        self, value: str, codebook: Codebook | str | None = None
+    ) -> ConversionResult:
+        """Return `MorseConverter.analyze(value)`, memoized when short."""
+        if len(value) > self.max_input_length:
+            with self._lock:
+                self.misses += 1
+            return MorseConverter.analyze(value, codebook)
+
+        key = (Codebook.get(codebook).name, value)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        result = MorseConverter.analyze(value, codebook)
+        cost = self._cost(result)
+        if cost > self.max_bytes:
+            return result
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous[1]
+            self._entries[key] = (result, cost)
+            self._size += cost
+            while (
+                len(self._entries) > self.max_entries
+                or self._size > self.max_bytes
+            ):
+                self._size -= self._entries.popitem(last=False)[1][1]
+        return result
+
+    def convert(
+        self, value: str, codebook: Codebook | str | None = None
+    ) -> tuple[str, bool]:
+        """Memoized counterpart of `MorseConverter.convert`.
+
+        Raises:
+            ConversionError: If the input cannot be converted.
+
+        """
+        result = self.analyze(value, codebook)
+        if result.error is not None:
+            offset = result.issues[0].offset if result.issues else None
+            raise ConversionError(result.error, offset)
+        return result.output, result.output_is_morse
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict[str, float]:
+        """Return hit/miss counters and current size for monitoring."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._size,
+            }
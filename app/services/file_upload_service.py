@@ -1,8 +1,10 @@
 """File upload handling and validation service."""
 
 import re
+from pathlib import Path
 
-from services.morse_converter import ConversionError, MorseConverter
+from services.audio_decoder import AudioDecodeError, MorseAudioDecoder
+from services.morse_converter import ConversionResult, MorseConverter
 
 
 class FileUploadError(Exception):
@@ -12,7 +14,13 @@ class FileUploadError(Exception):
 
 
 class InvalidFileFormatError(FileUploadError):
-    """Raised when file format is not .txt."""
+    """Raised when file format is not .txt or .wav."""
+
+    pass
+
+
+class FileTooLargeError(FileUploadError):
+    """Raised when file exceeds the size limit for its type."""
 
     pass
 
@@ -41,11 +49,48 @@ class InvalidMorseError(FileUploadError):
     pass
 
 
+class InvalidAudioError(FileUploadError):
+    """Raised when no Morse code can be decoded from an audio file."""
+
+    pass
+
+
 class FileUploadService:
     """Service for handling file uploads with validation."""
 
     MAX_FILE_SIZE_KILOBYTES = 5
     MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_KILOBYTES * 1024
+    AUDIO_MAX_FILE_SIZE_MEGABYTES = 20
+    AUDIO_MAX_FILE_SIZE_BYTES = AUDIO_MAX_FILE_SIZE_MEGABYTES * 1024 * 1024
+
+    @staticmethod
+    def is_audio(filename: str, content_type: str) -> bool:
+        """Return whether the upload is a WAV recording."""
+        name = (filename or "").strip().lower()
+        mime = (content_type or "").strip().lower()
+        return name.endswith(".wav") or mime in ("audio/wav", "audio/x-wav")
+
+    @staticmethod
+    def validate_size(filename: str, content_type: str, size: int) -> None:
+        """
+        Validate the upload size against the limit for its file type.
+
+        Raises:
+            FileTooLargeError: If the file is too large.
+
+        """
+        if FileUploadService.is_audio(filename, content_type):
+            if size > FileUploadService.AUDIO_MAX_FILE_SIZE_BYTES:
+                raise FileTooLargeError(
+                    "Datei ist zu groß. Maximal "
+                    f"{FileUploadService.AUDIO_MAX_FILE_SIZE_MEGABYTES} MB "
+                    "erlaubt."
+                )
+        elif size > FileUploadService.MAX_FILE_SIZE_BYTES:
+            raise FileTooLargeError(
+                "Datei ist zu groß. Maximal "
+                f"{FileUploadService.MAX_FILE_SIZE_KILOBYTES} KB erlaubt."
+            )
 
     @staticmethod
     def process_upload(filename: str, content_type: str, raw_text: str) -> str:
@@ -73,6 +118,40 @@ class FileUploadService:
         FileUploadService._validate_empty(content)
         return content
 
+    @staticmethod
+    def process_audio_upload(
+        filename: str, content_type: str, path: str | Path
+    ) -> ConversionResult:
+        """
+        Decode a saved WAV upload and analyze the Morse code it contains.
+
+        Decoding is CPU-bound; the UI runs this in a worker process.
+
+        Args:
+            filename: Original filename from the upload.
+            content_type: MIME type from the upload.
+            path: Location the upload was saved to.
+
+        Returns:
+            The `ConversionResult` of the decoded Morse code.
+
+        Raises:
+            InvalidFileFormatError: If file is not .wav.
+            InvalidAudioError: If no Morse code can be decoded.
+            InvalidMorseError: If the decoded Morse code is invalid.
+
+        """
+        if not FileUploadService.is_audio(filename, content_type):
+            raise InvalidFileFormatError(
+                "Dateiformat nicht erlaubt. Nur .txt- oder .wav-Dateien "
+                "möglich."
+            )
+        try:
+            morse = MorseAudioDecoder().decode_file(path)
+        except AudioDecodeError as exc:
+            raise InvalidAudioError(str(exc)) from None
+        return FileUploadService.analyze_content(morse)
+
     @staticmethod
     def _validate_file_format(filename: str, content_type: str) -> None:
         """Validate that uploaded file is a .txt file."""
@@ -84,7 +163,8 @@ class FileUploadService:
 
         if not is_txt_by_name and not (not name and is_txt_by_mime):
             raise InvalidFileFormatError(
-                "Dateiformat nicht erlaubt. Nur .txt-Dateien möglich."
+                "Dateiformat nicht erlaubt. Nur .txt- oder .wav-Dateien "
+                "möglich."
             )
 
     @staticmethod
@@ -110,23 +190,42 @@ class FileUploadService:
             InvalidMorseError: If Morse code is invalid.
 
         """
-        # Decide whether content is Morse-only or Text-only
-        is_morse_only = MorseConverter.is_morse(content)
+        return FileUploadService.analyze_content(content).source
+
+    @staticmethod
+    def analyze_content(content: str) -> ConversionResult:
+        """
+        Validate content and return its conversion in a single analysis.
+
+        The returned result can be handed to `ChatService.send_message`, so
+        the upload is classified and converted only once.
+
+        Args:
+            content: Normalized content string.
+
+        Returns:
+            The `ConversionResult` of the content.
+
+        Raises:
+            MixedContentError: If content mixes text and Morse.
+            InvalidCharactersError: If text contains unsupported characters.
+            InvalidMorseError: If Morse code is invalid.
+
+        """
+        result = MorseConverter.analyze(content)
 
-        if is_morse_only:
+        if result.input_is_morse:
             # Validate Morse tokens
-            try:
-                MorseConverter.decode(content)
-            except ConversionError as exc:
-                raise InvalidMorseError(str(exc))
-            return content
+            if not result.ok:
+                raise InvalidMorseError(result.error)
+            return result
 
         # Reject mixed files: letters + standalone morse tokens
-        has_letter = any(ch.isalpha() for ch in content)
         has_morse_token = (
             re.search(r"(^|\s)[.-]{1,6}(?=\s|/|$)", content) is not None
         )
-        if has_letter and has_morse_token:
+        has_letter = has_morse_token and re.search(r"[^\W\d_]", content)
+        if has_letter:
             msg = (
                 "Datei enthält gemischten Inhalt (Text und Morse-Code). "
                 "Bitte nur eines davon."
@@ -134,9 +233,7 @@ class FileUploadService:
             raise MixedContentError(msg)
 
         # Validate allowed characters for text
-        invalid = sorted(
-            {ch for ch in content.upper() if ch not in MorseConverter.TO_MORSE}
-        )
+        invalid = sorted({issue.symbol for issue in result.issues})
         if invalid:
             preview = ", ".join(invalid[:8])
             more = " …" if len(invalid) > 8 else ""
@@ -144,4 +241,4 @@ class FileUploadService:
                 f"Ungültige Zeichen in Datei: {preview}{more}"
             )
 
-        return content
+        return result
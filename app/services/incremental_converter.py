@@ -0,0 +1,172 @@
+"""Incremental conversion of an input that is being edited."""
+
+from bisect import bisect_right
+
+from .codebook import Codebook
+from .morse_converter import ConversionResult, MorseConverter
+
+
+class IncrementalConverter:
+    """Keep the conversion of an edited input up to date.
+
+    The input is split into units (characters or prosigns for text,
+    tokens for Morse code), and the end offset of every unit in the
+    input and in the output is remembered. On `update` only the units
+    from the first changed character on are converted again; the output
+    of the unchanged prefix is reused. Typing or deleting at the end of
+    the input therefore costs Python work proportional to the edit, not
+    to the input length (only C-level string slicing touches the rest).
+
+    The results equal `MorseConverter.analyze` exactly. Inputs that are
+    blank, contain invalid units or unusual whitespace fall back to it,
+    so error messages and issues are always complete.
+
+    Example:
+        >>> preview = IncrementalConverter()
+        >>> preview.update("SO").output
+        '... ---'
+        >>> preview.update("SOS").output
+        '... --- ...'
+
+    """
+
+    def __init__(self, codebook: Codebook | str | None = None) -> None:
+        self.codebook = Codebook.get(codebook)
+        self._max_prosign = max(map(len, self.codebook.prosigns), default=1)
+        self._value = ""
+        # Counts of non-Morse characters, of whitespace other than " " and
+        # of non-whitespace characters in the current input.
+        self._non_morse = 0
+        self._odd_space = 0
+        self._solid = 0
+        self._input_is_morse: bool | None = None
+        self._unit_ends: list[int] = []
+        self._output_ends: list[int] = []
+        self._valid: list[bool] = []
+        self._invalid = 0
+        self._output = ""
+
+    def update(self, value: str) -> ConversionResult:
+        """Return the analysis of `value`, reusing the previous one."""
+        old = self._value
+        prefix = self._common_prefix(old, value)
+        self._count(old[prefix:], -1)
+        self._count(value[prefix:], 1)
+        self._value = value
+
+        if self._odd_space or not self._solid:
+            self._truncate(0)
+            self._input_is_morse = None
+            return MorseConverter.analyze(value, self.codebook)
+
+        input_is_morse = not self._non_morse
+        if input_is_morse != self._input_is_morse:
+            self._input_is_morse = input_is_morse
+            keep = 0
+        elif input_is_morse:
+            # The token containing the change starts after its space.
+            keep = bisect_right(self._unit_ends, value.rfind(" ", 0, prefix))
+        else:
+            # A prosign may start up to its length before the change.
+            restart = max(0, prefix - self._max_prosign + 1)
+            keep = bisect_right(self._unit_ends, restart)
+        self._truncate(keep)
+        if input_is_morse:
+            self._decode_from(keep)
+        else:
+            self._encode_from(keep)
+
+        if self._invalid:
+            return MorseConverter.analyze(value, self.codebook)
+        return ConversionResult(
+            source=value, input_is_morse=input_is_morse, output=self._output
+        )
+
+    @staticmethod
+    def _common_prefix(old: str, new: str) -> int:
+        """Return the length of the common prefix of `old` and `new`."""
+        if new.startswith(old):
+            return len(old)
+        if old.startswith(new):
+            return len(new)
+        # Binary search on C-level slice comparisons.
+        low, high = 0, min(len(old), len(new))
+        while low < high:
+            mid = (low + high + 1) // 2
+            if old[:mid] == new[:mid]:
+                low = mid
+            else:
+                high = mid - 1
+        return low
+
+    def _count(self, chars: str, sign: int) -> None:
+        """Update the character class counters for added/removed text."""
+        morse_chars = self.codebook.morse_chars
+        for ch in chars:
+            if ch not in morse_chars and not ch.isspace():
+                self._non_morse += sign
+            if ch.isspace():
+                if ch != " ":
+                    self._odd_space += sign
+            else:
+                self._solid += sign
+
+    def _truncate(self, keep: int) -> None:
+        """Drop all units from index `keep` on."""
+        self._invalid -= self._valid[keep:].count(False)
+        del self._unit_ends[keep:]
+        del self._output_ends[keep:]
+        del self._valid[keep:]
+        self._output = self._output[: self._output_ends[-1] if keep else 0]
+
+    def _append(
+        self, parts: list[str], end: int, piece: str | None, separator: str
+    ) -> None:
+        """Add one converted unit ending at input offset `end`."""
+        length = self._output_ends[-1] if self._output_ends else 0
+        if self._unit_ends:
+            parts.append(separator)
+            length += len(separator)
+        if piece is None:
+            self._invalid += 1
+        else:
+            parts.append(piece)
+            length += len(piece)
+        self._unit_ends.append(end)
+        self._output_ends.append(length)
+        self._valid.append(piece is not None)
+
+    def _decode_from(self, keep: int) -> None:
+        """Decode the tokens after the first `keep` ones."""
+        table = self.codebook.decode_table
+        parts: list[str] = []
+        start = self._unit_ends[-1] + 1 if keep else 0
+        for token in self._value[start:].split(" "):
+            start += len(token)
+            self._append(parts, start, table.get(token), "")
+            start += 1
+        self._output += "".join(parts)
+
+    def _encode_from(self, keep: int) -> None:
+        """Encode the characters after the first `keep` units."""
+        book = self.codebook
+        table = book.encode_table
+        value = self._value
+        parts: list[str] = []
+        index = self._unit_ends[-1] if keep else 0
+        while index < len(value):
+            upper = value[index].upper()
+            end = index + 1
+            if upper == "<":
+                # Same leftmost-first matching as `Codebook.prepare_text`.
+                for prosign in book.prosigns:
+                    candidate = value[index : index + len(prosign)]
+                    if candidate.upper() == prosign:
+                        upper = book.prepare_text(prosign)
+                        end = index + len(prosign)
+                        break
+            codes = [table.get(ch) for ch in upper]
+            piece = None if None in codes else " ".join(codes)
+            self._append(parts, end, piece, " ")
+            index = end
+        self._output += "".join(parts)
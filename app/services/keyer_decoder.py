@@ -0,0 +1,165 @@
+"""Timing-based decoder for straight-key (hand keyed) Morse input."""
+
+import math
+from collections.abc import Iterable
+
+from .codebook import Codebook
+from .morse_decoder import MorseDecoder
+
+
+class KeyerDecoder:
+    """Decode key-down/key-up durations (in milliseconds) to text.
+
+    The sender's speed is tracked with two running averages, one for dit
+    and one for dah presses. The presses of a letter are kept until its
+    letter gap and classified together: if the letter contains both
+    lengths (the longest press at least twice the shortest), it is split
+    between those two, which tolerates a speed far from the current
+    estimate; otherwise the running averages decide. Each press then
+    pulls its average towards it.
+
+    Pauses are measured in dit lengths: below 2 dits they separate marks,
+    below 5 dits letters, anything longer separates words. The classified
+    symbols drive a `MorseDecoder`. A letter holds at most `MAX_MARKS`
+    presses, so every event costs O(1) regardless of how long the keyer
+    has been sending.
+
+    Example:
+        >>> keyer = KeyerDecoder(wpm=20)
+        >>> dit, dah = 60, 180
+        >>> keyer.feed_timings([dit, dit, dit, dit, dit, dah, dah])
+        'S'
+        >>> keyer.flush()
+        'T'
+
+    """
+
+    SMOOTHING = 0.3
+    MIN_WPM = 5
+    MAX_WPM = 60
+    MAX_MARKS = 12
+
+    def __init__(
+        self, wpm: float = 20, codebook: Codebook | str | None = None
+    ) -> None:
+        self.initial_wpm = wpm
+        self._decoder = MorseDecoder(codebook)
+        self.reset()
+
+    @property
+    def dit_ms(self) -> float:
+        """Current estimate of the sender's dit length (the time unit)."""
+        return (self._dit + self._dah / 3) / 2
+
+    @property
+    def wpm(self) -> float:
+        """Current estimate of the sender's speed (PARIS words/minute)."""
+        return 1200 / self.dit_ms
+
+    def reset(self) -> None:
+        """Forget the current letter and the speed estimate."""
+        self._decoder.reset()
+        self._dit = 1200 / self.initial_wpm
+        self._dah = 3 * self._dit
+        self._marks: list[float] = []
+        self._sending = False
+
+    def classify_marks(self, marks: list[float]) -> str:
+        """Return the dits/dahs of one letter's presses; adapt the speed."""
+        if not marks:
+            return ""
+        short, long_ = min(marks), max(marks)
+        # Splitting at the geometric mean weighs relative timing errors
+        # of dits and dahs equally.
+        if long_ >= 2 * short:
+            split = math.sqrt(short * long_)
+        else:
+            split = math.sqrt(self._dit * self._dah)
+        symbols: list[str] = []
+        for ms in marks:
+            if ms < split:
+                self._dit += (ms - self._dit) * self.SMOOTHING
+                symbols.append(".")
+            else:
+                self._dah += (ms - self._dah) * self.SMOOTHING
+                symbols.append("-")
+        # Keep both averages in a plausible range and ratio.
+        fastest, slowest = 1200 / self.MAX_WPM, 1200 / self.MIN_WPM
+        self._dit = min(max(self._dit, fastest), slowest)
+        self._dah = max(self._dah, 2 * self._dit)
+        self._dit = min(self._dit, self._dah / 2)
+        return "".join(symbols)
+
+    def classify_pause(self, ms: float) -> str:
+        """Return `""`, `" "` or `"/"` for a key-up of `ms`."""
+        unit = self.dit_ms
+        marks = self._marks
+        if marks and max(marks) >= 2 * min(marks):
+            # The letter in progress already shows the sender's speed.
+            unit = math.sqrt(min(marks) * max(marks) / 3)
+        if ms < 2 * unit:
+            return ""
+        if ms < 5 * unit:
+            return " "
+        return "/"
+
+    def press(self, ms: float) -> str:
+        """Feed a key-down duration; returns the text it completed."""
+        self._sending = True
+        self._marks.append(ms)
+        if len(self._marks) < self.MAX_MARKS:
+            return ""
+        # No letter is this long; pass the marks on so the decoder
+        # reports the invalid letter at its end.
+        return self._decoder.feed_all(self._take_marks())
+
+    def pause(self, ms: float) -> str:
+        """Feed a key-up duration; returns the text it completed.
+
+        Pauses before the first press are ignored.
+
+        Raises:
+            ConversionError: If the completed letter is not in the codebook.
+
+        """
+        if not self._sending:
+            return ""
+        symbol = self.classify_pause(ms)
+        if not symbol:
+            return ""
+        if symbol == "/":
+            self._sending = False
+        letter = self._decoder.feed_all(self._take_marks())
+        return letter + self._decoder.feed(symbol)
+
+    def _take_marks(self) -> str:
+        marks, self._marks = self._marks, []
+        return self.classify_marks(marks)
+
+    def feed_timings(self, durations: Iterable[float]) -> str:
+        """Feed alternating press/pause durations, starting with a press.
+
+        Returns:
+            The text completed by these events.
+
+        Raises:
+            ConversionError: If a keyed letter is not in the codebook.
+
+        """
+        parts: list[str] = []
+        down = True
+        for ms in durations:
+            parts.append(self.press(ms) if down else self.pause(ms))
+            down = not down
+        return "".join(parts)
+
+    def flush(self) -> str:
+        """Finish the letter in progress (if any) and return it.
+
+        Raises:
+            ConversionError: If the letter is not in the codebook.
+
+        """
+        self._sending = False
+        self._decoder.feed_all(self._take_marks())
+        return self._decoder.flush()
@@ -0,0 +1,60 @@
+"""Bounded, thread-safe set of user ids known to exist in the database."""
+
+import os
+import threading
+from collections import OrderedDict
+
+KNOWN_USERS_CACHE_ENTRIES = int(
+    os.getenv("KNOWN_USERS_CACHE_ENTRIES", "10000")
+)
+
+
+class KnownUsers:
+    """LRU set of `(database, user id)` pairs with a committed user row.
+
+    `ChatService` consults it before touching the `users` table, so a
+    returning visitor costs no user query at all. Entries are keyed by
+    the database URL as well, since an engine may be swapped (tests,
+    benchmarks). The set is bounded; an evicted or invalidated id only
+    costs one idempotent upsert the next time it is seen. Call
+    `discard` (or `clear`) whenever user rows are deleted.
+    """
+
+    def __init__(self, max_entries: int = KNOWN_USERS_CACHE_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str], None] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of remembered users."""
+        return len(self._entries)
+
+    def contains(self, database: str, user_id: str) -> bool:
+        """Return True if the user is known; marks it as recently used."""
+        key = (database, user_id)
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._entries.move_to_end(key)
+            return True
+
+    def add(self, database: str, user_id: str) -> None:
+        """Remember a user whose row has been committed."""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[(database, user_id)] = None
+            self._entries.move_to_end((database, user_id))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, user_id: str) -> None:
+        """Forget a user in every database, e.g. after deleting its row."""
+        with self._lock:
+            for key in [key for key in self._entries if key[1] == user_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """Forget all users."""
+        with self._lock:
+            self._entries.clear()
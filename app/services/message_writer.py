@@ -0,0 +1,258 @@
+"""Write-behind queue that batches message inserts into few commits."""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from datetime import datetime
+
+from db import DatabaseManager
+from db.models import Chat, Message
+from sqlalchemy import Connection, bindparam, exists, insert, update
+from sqlalchemy.exc import SQLAlchemyError
+
+logger = logging.getLogger(__name__)
+
+# Off by default: every send commits its own transaction.
+MESSAGE_WRITE_BEHIND = os.getenv("MESSAGE_WRITE_BEHIND", "0").strip().lower()
+MESSAGE_BATCH_ROWS = int(os.getenv("MESSAGE_BATCH_ROWS", "500"))
+MESSAGE_BATCH_DELAY_MS = float(os.getenv("MESSAGE_BATCH_DELAY_MS", "5"))
+# "commit": a send returns once committed; "queued": once queued.
+MESSAGE_DURABILITY = os.getenv("MESSAGE_DURABILITY", "commit")
+
+
+@dataclass(frozen=True, slots=True)
+class PendingSend:
+    """The rows one `ChatService.send_message` call writes.
+
+    `title` names the chat if it has no messages yet when the rows are
+    written, `None` keeps the current title.
+    """
+
+    chat_id: str
+    title: str | None
+    messages: tuple[Message, ...]
+    updated_at: datetime
+
+
+def _message_row(message: Message) -> dict:
+    return {
+        "id": message.id,
+        "chat_id": message.chat_id,
+        "content": message.content,
+        "is_morse": message.is_morse,
+        "is_error": message.is_error,
+        "timestamp": message.timestamp,
+    }
+
+
+class MessageWriter:
+    """Coalesce pending sends of all users into one transaction each.
+
+    A background thread takes sends from a queue and commits them
+    together once `max_rows` messages are pending or `max_delay_ms` has
+    passed since the first one, so a burst of sends costs one commit (and
+    with `synchronous=FULL` one fsync) instead of one per message.
+
+    Durability:
+        commit: `submit` blocks until the batch holding the send is
+            committed and re-raises its error. Callers wait at most
+            `max_delay_ms` longer than for a commit of their own.
+        queued: `submit` returns at once. Reads may miss sends for up to
+            `max_delay_ms` (see `flush`), and sends still queued when the
+            process dies are lost.
+
+    Pending sends are flushed by `close`, which runs at interpreter exit
+    and should be called on application shutdown.
+    """
+
+    DURABILITY = ("commit", "queued")
+
+    def __init__(
+        self,
+        max_rows: int = MESSAGE_BATCH_ROWS,
+        max_delay_ms: float = MESSAGE_BATCH_DELAY_MS,
+        durability: str = MESSAGE_DURABILITY,
+    ) -> None:
+        if durability not in self.DURABILITY:
+            msg = f"Unbekannte Durability-Einstellung: {durability}"
+            raise ValueError(msg)
+        self.max_rows = max_rows
+        self.max_delay_ms = max_delay_ms
+        self.durability = durability
+        self.batches = 0
+        self._queue: queue.Queue[tuple[PendingSend | None, Future]] = (
+            queue.Queue()
+        )
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._exit_hook = False
+
+    @classmethod
+    def from_env(cls) -> "MessageWriter | None":
+        """Return a writer configured from the environment, if enabled."""
+        if MESSAGE_WRITE_BEHIND not in {"1", "true", "on"}:
+            return None
+        return cls()
+
+    @staticmethod
+    def write(conn: Connection, sends: list[PendingSend]) -> None:
+        """Write `sends` within the transaction of `conn`.
+
+        Chats are titled after their first message and stamped with the
+        time of their latest send. Each statement runs once for the whole
+        batch, with one parameter set per chat or message.
+        """
+        firsts, stamps, rows = {}, {}, []
+        for send in sends:
+            firsts.setdefault(send.chat_id, send)
+            stamps[send.chat_id] = send.updated_at
+            rows += [_message_row(message) for message in send.messages]
+        # Only the chat's first send may name it: a later one must not if
+        # the first has no title (e.g. it failed to convert).
+        titles = {
+            chat_id: send.title
+            for chat_id, send in firsts.items()
+            if send.title is not None
+        }
+
+        if titles:
+            has_messages = exists().where(
+                Message.chat_id == bindparam("b_id"),
+                Message.deleted_at.is_(None),
+            )
+            conn.execute(
+                update(Chat)
+                .where(Chat.id == bindparam("b_id"), ~has_messages)
+                .values(title=bindparam("b_title")),
+                [{"b_id": k, "b_title": v} for k, v in titles.items()],
+            )
+        conn.execute(
+            update(Chat)
+            .where(Chat.id == bindparam("b_id"))
+            .values(
+                updated_at=bindparam("b_stamp"),
+                unpinned_at=bindparam("b_stamp"),
+            ),
+            [{"b_id": k, "b_stamp": v} for k, v in stamps.items()],
+        )
+        conn.execute(insert(Message), rows)
+
+    def submit(self, send: PendingSend) -> None:
+        """Queue `send`; with `commit` durability, wait until written."""
+        future: Future = Future()
+        with self._lock:
+            self._ensure_thread()
+            self._queue.put((send, future))
+        if self.durability == "commit":
+            future.result()
+
+    def flush(self) -> None:
+        """Block until every send queued so far is committed."""
+        marker: Future = Future()
+        with self._lock:
+            if self._thread is None:
+                return
+            self._queue.put((None, marker))
+        marker.result()
+
+    def close(self) -> None:
+        """Flush pending sends and stop the background thread."""
+        # Held until the thread is gone, so a submit meanwhile starts a
+        # new one only after it and never adds to a stopped queue.
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is None:
+                return
+            # Sends queued before the stop marker are still written.
+            self._queue.put((None, None))
+            thread.join()
+
+    def _ensure_thread(self) -> None:
+        """Start the background thread unless it runs; hold `_lock`."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="message-writer", daemon=True
+        )
+        self._thread.start()
+        # The thread restarts after `close`; flush at exit only once.
+        if not self._exit_hook:
+            atexit.register(self.close)
+            self._exit_hook = True
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item[1] is None:
+                return
+            batch = [item]
+            rows = len(item[0].messages) if item[0] else 0
+            deadline = time.monotonic() + self.max_delay_ms / 1000
+            # A flush marker ends the batch: everything before it is due.
+            while item[0] is not None and rows < self.max_rows:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                if item[0] is not None:
+                    rows += len(item[0].messages)
+                elif item[1] is None:
+                    self._queue.put(item)
+                    break
+            self._commit(batch)
+
+    def _commit(self, batch: list[tuple[PendingSend | None, Future]]) -> None:
+        sends = [send for send, _future in batch if send is not None]
+        futures = [future for _send, future in batch if future is not None]
+        try:
+            if sends:
+                with DatabaseManager.engine.begin() as conn:
+                    self.write(conn, sends)
+                self.batches += 1
+        except SQLAlchemyError:
+            # One bad send (e.g. its chat was purged meanwhile) must not
+            # take the others down: retry them one by one.
+            self._commit_each(batch)
+            return
+        except Exception as exc:
+            # Anything else is a bug; fail the batch but keep the thread
+            # running, or every later send would wait forever.
+            logger.exception("Lost a batch of %d sends", len(sends))
+            for send, future in batch:
+                if future is None:
+                    continue
+                if send is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(exc)
+            return
+        for future in futures:
+            future.set_result(None)
+
+    def _commit_each(
+        self, batch: list[tuple[PendingSend | None, Future]]
+    ) -> None:
+        for send, future in batch:
+            try:
+                if send is not None:
+                    with DatabaseManager.engine.begin() as conn:
+                        self.write(conn, [send])
+            except Exception as exc:
+                if self.durability == "queued" or not isinstance(
+                    exc, SQLAlchemyError
+                ):
+                    logger.exception("Lost a send to chat %s", send.chat_id)
+                if future is not None:
+                    future.set_exception(exc)
+                continue
+            if future is not None:
+                future.set_result(None)
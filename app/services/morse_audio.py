@@ -0,0 +1,238 @@
+"""Morse code audio synthesis with an on-disk WAV cache."""
+
+import hashlib
+import io
+import math
+import os
+import sys
+import threading
+import wave
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+
+from .morse_converter import ConversionError
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the stdlib path is used instead.
+    np = None
+
+AUDIO_CACHE_DIR = Path(os.getenv("AUDIO_CACHE_DIR", "./data/audio_cache"))
+AUDIO_CACHE_MAX_BYTES = int(os.getenv("AUDIO_CACHE_MAX_MB", "64")) << 20
+
+
+class AudioCache:
+    """Size-bounded directory of rendered WAV files with LRU eviction.
+
+    Files are named after the content hash of what was rendered. Hits
+    update the file's mtime, so the recency order survives restarts.
+    """
+
+    def __init__(
+        self,
+        directory: Path = AUDIO_CACHE_DIR,
+        max_bytes: int = AUDIO_CACHE_MAX_BYTES,
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, int] | None = None
+        self._size = 0
+
+    def _load(self) -> OrderedDict[str, int]:
+        """Index existing files (oldest first) on first use."""
+        if self._entries is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            files = sorted(
+                self.directory.glob("*.wav"), key=lambda p: p.stat().st_mtime
+            )
+            self._entries = OrderedDict(
+                (path.name, path.stat().st_size) for path in files
+            )
+            self._size = sum(self._entries.values())
+        return self._entries
+
+    def get(self, name: str) -> Path | None:
+        """Return the cached file for `name`, marking it recently used."""
+        with self._lock:
+            entries = self._load()
+            if name not in entries:
+                return None
+            path = self.directory / name
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                self._size -= entries.pop(name)
+                return None
+            entries.move_to_end(name)
+            return path
+
+    def put(self, name: str, data: bytes) -> Path:
+        """Store `data` under `name` and evict least recently used files."""
+        with self._lock:
+            entries = self._load()
+            path = self.directory / name
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+            self._size += len(data) - entries.pop(name, 0)
+            entries[name] = len(data)
+            while self._size > self.max_bytes and len(entries) > 1:
+                old_name, old_size = entries.popitem(last=False)
+                (self.directory / old_name).unlink(missing_ok=True)
+                self._size -= old_size
+            return path
+
+
+class MorseAudio:
+    """Render Morse code to 16-bit mono PCM WAV.
+
+    Tone and silence buffers for dit, dah and the three gap lengths are
+    synthesized once per instance (raised-cosine ramps avoid clicks); a
+    message is rendered by concatenating those buffers. NumPy is used to
+    synthesize the buffers when installed, the stdlib `array` module
+    otherwise.
+
+    Timing follows the PARIS standard: one dit lasts `1.2 / wpm` seconds.
+    With `farnsworth_wpm` below `wpm`, characters keep their speed while
+    letter and word gaps are stretched to the slower overall speed.
+    """
+
+    _shared: "MorseAudio | None" = None
+
+    def __init__(
+        self,
+        wpm: float = 20,
+        tone_hz: float = 600,
+        farnsworth_wpm: float | None = None,
+        sample_rate: int = 8000,
+        volume: float = 0.5,
+        ramp_ms: float = 5,
+        cache: AudioCache | None = None,
+    ) -> None:
+        self.wpm = wpm
+        self.tone_hz = tone_hz
+        self.farnsworth_wpm = min(farnsworth_wpm or wpm, wpm)
+        self.sample_rate = sample_rate
+        self.volume = volume
+        self.ramp_ms = ramp_ms
+        self.cache = cache
+
+        unit = 1.2 / wpm
+        letter_gap, word_gap = 3 * unit, 7 * unit
+        if self.farnsworth_wpm < wpm:
+            # ARRL Farnsworth formula for the total delay per PARIS word.
+            delay = (60 * wpm - 37.2 * self.farnsworth_wpm) / (
+                wpm * self.farnsworth_wpm
+            )
+            letter_gap, word_gap = 3 * delay / 19, 7 * delay / 19
+
+        self._dit = self._tone(unit)
+        self._dah = self._tone(3 * unit)
+        self._mark_gap = self._silence(unit)
+        self._letter_gap = self._silence(letter_gap)
+        self._word_gap = self._silence(word_gap)
+
+    @classmethod
+    def shared(cls) -> "MorseAudio":
+        """Return the app-wide renderer backed by the default disk cache."""
+        if cls._shared is None:
+            cls._shared = cls(cache=AudioCache())
+        return cls._shared
+
+    def _samples(self, seconds: float) -> int:
+        return max(1, round(seconds * self.sample_rate))
+
+    def _silence(self, seconds: float) -> bytes:
+        return bytes(2 * self._samples(seconds))
+
+    def _tone(self, seconds: float) -> bytes:
+        """Synthesize one sine burst with raised-cosine on/off ramps."""
+        count = self._samples(seconds)
+        ramp = min(self._samples(self.ramp_ms / 1000), count // 2)
+        amplitude = 32767 * self.volume
+        step = 2 * math.pi * self.tone_hz / self.sample_rate
+
+        if np is not None:
+            envelope = np.ones(count)
+            if ramp:
+                edge = 0.5 - 0.5 * np.cos(np.pi * np.arange(ramp) / ramp)
+                envelope[:ramp] = edge
+                envelope[count - ramp :] = edge[::-1]
+            signal = np.sin(step * np.arange(count)) * envelope * amplitude
+            return signal.astype("<i2").tobytes()
+
+        def gain(i: int) -> float:
+            if i < ramp:
+                return 0.5 - 0.5 * math.cos(math.pi * i / ramp)
+            if i >= count - ramp:
+                return 0.5 - 0.5 * math.cos(math.pi * (count - 1 - i) / ramp)
+            return 1.0
+
+        samples = array(
+            "h",
+            (
+                round(math.sin(step * i) * gain(i) * amplitude)
+                for i in range(count)
+            ),
+        )
+        if sys.byteorder == "big":
+            samples.byteswap()
+        return samples.tobytes()
+
+    def pcm(self, morse: str) -> bytes:
+        """Return raw little-endian PCM frames for `morse`."""
+        marks = {".": self._dit, "-": self._dah}
+        parts: list[bytes] = []
+        gap = b""
+        for token in morse.split():
+            if token == "/":
+                gap = self._word_gap
+                continue
+            if parts:
+                parts.append(gap)
+            for index, mark in enumerate(token):
+                if mark not in marks:
+                    raise ConversionError(
+                        f"'{token}' ist kein gültiger Morse-Buchstabe."
+                    )
+                if index:
+                    parts.append(self._mark_gap)
+                parts.append(marks[mark])
+            gap = self._letter_gap
+        return b"".join(parts)
+
+    def render(self, morse: str) -> bytes:
+        """Render `morse` (as produced by `MorseConverter.encode`) to WAV."""
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self.sample_rate)
+            wav.writeframes(self.pcm(morse))
+        return buffer.getvalue()
+
+    def cache_key(self, morse: str) -> str:
+        """Return the cache file name for `morse` with these settings."""
+        settings = (
+            f"{self.wpm}|{self.farnsworth_wpm}|{self.tone_hz}|"
+            f"{self.sample_rate}|{self.volume}|{self.ramp_ms}|"
+        )
+        digest = hashlib.sha256((settings + " ".join(morse.split())).encode())
+        return f"{digest.hexdigest()[:32]}.wav"
+
+    def cached_file(self, morse: str) -> Path:
+        """Return a WAV file for `morse`, rendering it only on a cache miss.
+
+        Raises:
+            RuntimeError: If this renderer has no cache configured.
+
+        """
+        if self.cache is None:
+            raise RuntimeError("MorseAudio has no cache configured.")
+        name = self.cache_key(morse)
+        path = self.cache.get(name)
+        if path is None:
+            path = self.cache.put(name, self.render(morse))
+        return path
@@ -1,108 +1,396 @@
+import codecs
+import re
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+
+from .codebook import Codebook
+
+
 class ConversionError(Exception):
-    pass
+    """Raised when a value cannot be converted.
+
+    `offset` locates the offending symbol: the character index for text
+    input, or the index of the Morse token (ignoring empty tokens).
+    """
+
+    def __init__(self, message: str, offset: int | None = None) -> None:
+        super().__init__(message)
+        self.offset = offset
+
+
+@dataclass(frozen=True, slots=True)
+class ConversionIssue:
+    """An invalid character (text) or token (Morse) in the input.
+
+    `offset` follows `ConversionError.offset`: character index for text,
+    token index for Morse code.
+    """
+
+    offset: int
+    symbol: str
+
+
+@dataclass(frozen=True, slots=True)
+class ConversionResult:
+    """Everything known about one input after a single analysis."""
+
+    source: str
+    input_is_morse: bool
+    output: str | None
+    error: str | None = None
+    issues: tuple[ConversionIssue, ...] = ()
+
+    @property
+    def ok(self) -> bool:
+        """Return True if the input was converted successfully."""
+        return self.error is None
+
+    @property
+    def output_is_morse(self) -> bool:
+        """Return True if `output` is Morse code."""
+        return self.ok and not self.input_is_morse
 
 
 class MorseConverter:
-    TO_MORSE: dict[str, str] = {
-        "A": ".-",
-        "B": "-...",
-        "C": "-.-.",
-        "D": "-..",
-        "E": ".",
-        "F": "..-.",
-        "G": "--.",
-        "H": "....",
-        "I": "..",
-        "J": ".---",
-        "K": "-.-",
-        "L": ".-..",
-        "M": "--",
-        "N": "-.",
-        "O": "---",
-        "P": ".--.",
-        "Q": "--.-",
-        "R": ".-.",
-        "S": "...",
-        "T": "-",
-        "U": "..-",
-        "V": "...-",
-        "W": ".--",
-        "X": "-..-",
-        "Y": "-.--",
-        "Z": "--..",
-        "0": "-----",
-        "1": ".----",
-        "2": "..---",
-        "3": "...--",
-        "4": "....-",
-        "5": ".....",
-        "6": "-....",
-        "7": "--...",
-        "8": "---..",
-        "9": "----.",
-        ".": ".-.-.-",
-        ",": "--..--",
-        "?": "..--..",
-        "/": "-..-.",
-        "-": "-....-",
-        "(": "-.--.",
-        ")": "-.--.-",
-        " ": "/",
-    }
-
-    TO_TEXT: dict[str, str] = {v: k for k, v in TO_MORSE.items()}
-
-    MORSE_CHARS: set[str] = set(".-/ ")
-
-    @classmethod
-    def is_morse(cls, value: str) -> bool:
+    """Text <-> Morse conversion on top of compiled `Codebook`s.
+
+    Every method takes an optional `codebook` (instance or registry name);
+    the ITU alphabet is used by default. `TO_MORSE`/`TO_TEXT` expose the
+    default tables for callers that only need a lookup.
+    """
+
+    TO_MORSE: dict[str, str] = Codebook.get().alphabet
+    TO_TEXT: dict[str, str] = Codebook.get().to_text
+
+    MORSE_CHARS: frozenset[str] = Codebook.MORSE_CHARS
+
+    @classmethod
+    def is_morse(
+        cls, value: str, codebook: Codebook | str | None = None
+    ) -> bool:
         """Check if a string contains only Morse code characters."""
         stripped = value.strip()
         if not stripped:
             return False
-        return all(ch in cls.MORSE_CHARS for ch in stripped)
+        return Codebook.get(codebook).morse_chars.issuperset(stripped)
 
     @classmethod
-    def encode(cls, text: str) -> str:
+    def encode(
+        cls, text: str, codebook: Codebook | str | None = None
+    ) -> str:
         """Convert text to Morse code."""
         if not text.strip():
             raise ConversionError("Bitte Text eingeben.")
+        return cls.encode_upper(text.upper(), codebook)
+
+    @classmethod
+    def decode(
+        cls, morse: str, codebook: Codebook | str | None = None
+    ) -> str:
+        """Convert Morse code to text."""
+        stripped = morse.strip()
+        if not stripped:
+            raise ConversionError("Bitte Morse-Code eingeben.")
+        return cls.decode_stripped(stripped, codebook)
+
+    @classmethod
+    def encode_upper(
+        cls, upper: str, codebook: Codebook | str | None = None
+    ) -> str:
+        """Convert upper-cased text to Morse code, even if it is blank.
+
+        Unlike `encode`, whitespace-only input is encoded (as word gaps)
+        instead of rejected, so pieces of a larger text, such as the
+        shards of `BatchConverter.convert_document`, convert on their own.
+        """
+        book = Codebook.get(codebook)
+        prepared = book.prepare_text(upper)
+        try:
+            return " ".join(map(book.encode_table.__getitem__, prepared))
+        except KeyError:
+            # Slow path only to report the first offending character.
+            return cls._encode_per_char(upper, book)
+
+    @classmethod
+    def decode_stripped(
+        cls, stripped: str, codebook: Codebook | str | None = None
+    ) -> str:
+        """Convert Morse code without surrounding whitespace to text.
+
+        Like `decode` without its emptiness check and strip, for callers
+        that have already done both.
+        """
+        book = Codebook.get(codebook)
+        try:
+            return "".join(
+                map(book.decode_table.__getitem__, stripped.split(" "))
+            )
+        except KeyError:
+            # Slow path only to report the first offending token.
+            return cls._decode_per_token(stripped, book)
+
+    @classmethod
+    def iter_encode(
+        cls,
+        chunks: Iterable[str | bytes],
+        codebook: Codebook | str | None = None,
+    ) -> Iterator[str]:
+        """Convert a stream of text chunks to Morse code incrementally.
+
+        Accepts any iterable of `str` or UTF-8 `bytes` chunks (file
+        objects, socket readers, generators). Whitespace is normalized the
+        way uploads are: runs of whitespace become one word separator and
+        leading/trailing whitespace is dropped, so line breaks never end
+        up as unsupported characters. Memory use does not depend on the
+        input size.
+
+        Yields:
+            Pieces of Morse code which, joined, form the encoded text.
+
+        Raises:
+            ConversionError: On the first unsupported character, or if the
+                stream contains no text at all. `offset` is the character
+                index in the whole stream.
+
+        """
+        book = Codebook.get(codebook)
+        started = False
+        pending_space = False
+        position = 0
+        for chunk in cls._iter_text(chunks):
+            words = chunk.split()
+            position += len(chunk)
+            if not words:
+                pending_space = pending_space or started
+                continue
+            try:
+                encoded = cls.encode(" ".join(words), book)
+            except ConversionError as exc:
+                offset = position - len(chunk)
+                offset += cls._chunk_offset(chunk, exc.offset or 0)
+                raise ConversionError(str(exc), offset) from None
+            if started:
+                pending_space = pending_space or chunk[0].isspace()
+                yield (" / " if pending_space else " ") + encoded
+            else:
+                yield encoded
+            started = True
+            pending_space = chunk[-1].isspace()
+        if not started:
+            raise ConversionError("Bitte Text eingeben.")
+
+    @classmethod
+    def iter_decode(
+        cls,
+        chunks: Iterable[str | bytes],
+        codebook: Codebook | str | None = None,
+    ) -> Iterator[str]:
+        """Convert a stream of Morse code chunks to text incrementally.
+
+        Tokens may be split across chunk boundaries; the unfinished tail of
+        each chunk is carried over to the next one. Any whitespace
+        separates tokens, so multi-line input can be streamed directly.
+        The carried tail is bounded by the longest code, which keeps
+        memory use constant.
+
+        Yields:
+            Pieces of decoded text which, joined, form the decoded text.
+
+        Raises:
+            ConversionError: On the first invalid token, or if the stream
+                contains no Morse code at all. `offset` is the token index
+                in the whole stream.
+
+        """
+        book = Codebook.get(codebook)
+        started = False
+        carry = ""
+        done = 0
+        for chunk in cls._iter_text(chunks):
+            buffer = carry + chunk
+            tokens = buffer.split()
+            carry = tokens.pop() if tokens and not buffer[-1].isspace() else ""
+            if tokens:
+                yield cls._decode_from(" ".join(tokens), book, done)
+                done += len(tokens)
+                started = True
+            if len(carry) > book.max_code_length:
+                cls._decode_from(carry, book, done)
+        if carry:
+            yield cls._decode_from(carry, book, done)
+        elif not started:
+            raise ConversionError("Bitte Morse-Code eingeben.")
+
+    @classmethod
+    def decode_symbols(
+        cls, symbols: Iterable[str], codebook: Codebook | str | None = None
+    ) -> str:
+        """Decode a sequence of single Morse symbols via `MorseDecoder`.
+
+        Use this for sources producing symbols one at a time (keyer,
+        audio); whole strings decode faster through `decode`.
+        """
+        from .morse_decoder import MorseDecoder
+
+        decoder = MorseDecoder(codebook)
+        return decoder.feed_all(symbols) + decoder.flush()
+
+    @classmethod
+    def decode_timings(
+        cls,
+        durations: Iterable[float],
+        wpm: float = 20,
+        codebook: Codebook | str | None = None,
+    ) -> str:
+        """Decode hand-keyed Morse from its timing via `KeyerDecoder`.
+
+        Args:
+            durations: Alternating key-down/key-up durations in
+                milliseconds, starting with a key-down.
+            wpm: Initial guess of the sender's speed; the decoder adapts.
+            codebook: Codebook instance or registry name.
+
+        Returns:
+            The decoded text.
+
+        Raises:
+            ConversionError: If a keyed letter is not in the codebook.
+
+        """
+        from .keyer_decoder import KeyerDecoder
+
+        keyer = KeyerDecoder(wpm, codebook)
+        return (keyer.feed_timings(durations) + keyer.flush()).strip()
+
+    @staticmethod
+    def _chunk_offset(chunk: str, offset: int) -> int:
+        """Map an index into the space-normalized `chunk` back to it."""
+        for word in re.finditer(r"\S+", chunk):
+            length = word.end() - word.start()
+            if offset < length:
+                return word.start() + offset
+            offset -= length + 1
+        return len(chunk)
+
+    @classmethod
+    def _decode_from(cls, morse: str, book: Codebook, done: int) -> str:
+        """Decode `morse`, counting error offsets after `done` tokens."""
+        try:
+            return cls.decode(morse, book)
+        except ConversionError as exc:
+            raise ConversionError(str(exc), done + (exc.offset or 0)) from None
+
+    @staticmethod
+    def _iter_text(chunks: Iterable[str | bytes]) -> Iterator[str]:
+        """Yield text chunks, decoding UTF-8 bytes across chunk borders."""
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        for chunk in chunks:
+            if isinstance(chunk, bytes | bytearray | memoryview):
+                chunk = decoder.decode(chunk)
+            if chunk:
+                yield chunk
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+    @classmethod
+    def _encode_per_char(cls, upper: str, book: Codebook) -> str:
+        """Encode character by character (reference path for errors)."""
         encoded: list[str] = []
-        for ch in text.upper():
-            if ch not in cls.TO_MORSE:
+        for offset, ch in enumerate(book.prepare_text(upper)):
+            if ch not in book.encode_table:
                 raise ConversionError(
-                    f"'{ch}' kann nicht in Morse-Code dargestellt werden."
+                    f"'{ch}' kann nicht in Morse-Code dargestellt werden.",
+                    book.source_offset(upper, offset),
                 )
-            encoded.append(cls.TO_MORSE[ch])
+            encoded.append(book.encode_table[ch])
         return " ".join(encoded)
 
     @classmethod
-    def decode(cls, morse: str) -> str:
-        """Convert Morse code to text."""
-        if not morse.strip():
-            raise ConversionError("Bitte Morse-Code eingeben.")
+    def _decode_per_token(cls, morse: str, book: Codebook) -> str:
+        """Decode token by token (reference path for errors)."""
         decoded: list[str] = []
-        for code in morse.strip().split(" "):
-            if code == "":
-                continue
-            if code not in cls.TO_TEXT:
+        codes = (code for code in morse.split(" ") if code != "")
+        for offset, code in enumerate(codes):
+            if code not in book.to_text:
                 raise ConversionError(
-                    f"'{code}' ist kein gültiger Morse-Buchstabe."
+                    f"'{code}' ist kein gültiger Morse-Buchstabe.", offset
                 )
-            decoded.append(cls.TO_TEXT[code])
+            decoded.append(book.to_text[code])
         return "".join(decoded)
 
     @classmethod
-    def convert(cls, value: str) -> tuple[str, bool]:
+    def convert(
+        cls, value: str, codebook: Codebook | str | None = None
+    ) -> tuple[str, bool]:
         """Auto-detect direction. Returns (result, result_is_morse)."""
-        if cls.is_morse(value):
-            return cls.decode(value), False
-        return cls.encode(value), True
+        result = cls.analyze(value, codebook)
+        if result.error is not None:
+            offset = result.issues[0].offset if result.issues else None
+            raise ConversionError(result.error, offset)
+        return result.output, result.output_is_morse
+
+    @classmethod
+    def analyze(
+        cls, value: str, codebook: Codebook | str | None = None
+    ) -> ConversionResult:
+        """Classify and convert `value` in one go.
+
+        The direction is detected once and the input is converted once
+        through the fast path. Only if that fails is the input scanned
+        again to collect every invalid character or token.
+
+        Returns:
+            A `ConversionResult` carrying the direction, the output (or the
+            error message `convert` would raise) and all issues found.
+
+        """
+        book = Codebook.get(codebook)
+        stripped = value.strip()
+        input_is_morse = bool(stripped) and book.morse_chars.issuperset(
+            stripped
+        )
+        try:
+            if input_is_morse:
+                output = cls.decode_stripped(stripped, book)
+            elif not stripped:
+                raise ConversionError("Bitte Text eingeben.")
+            else:
+                output = cls.encode_upper(value.upper(), book)
+        except ConversionError as exc:
+            return ConversionResult(
+                source=value,
+                input_is_morse=input_is_morse,
+                output=None,
+                error=str(exc),
+                issues=cls._find_issues(stripped, value, input_is_morse, book),
+            )
+        return ConversionResult(
+            source=value, input_is_morse=input_is_morse, output=output
+        )
+
+    @classmethod
+    def _find_issues(
+        cls, stripped: str, value: str, input_is_morse: bool, book: Codebook
+    ) -> tuple[ConversionIssue, ...]:
+        """Collect every invalid token (Morse) or character (text)."""
+        if input_is_morse:
+            codes = (code for code in stripped.split(" ") if code != "")
+            return tuple(
+                ConversionIssue(offset, code)
+                for offset, code in enumerate(codes)
+                if code not in book.to_text
+            )
+        upper = value.upper()
+        return tuple(
+            ConversionIssue(book.source_offset(upper, offset), ch)
+            for offset, ch in enumerate(book.prepare_text(upper))
+            if ch not in book.encode_table
+        )
 
     @classmethod
-    def reference_table(cls) -> list[tuple[str, str]]:
+    def reference_table(
+        cls, codebook: Codebook | str | None = None
+    ) -> list[tuple[str, str]]:
         """Return all supported character to Morse code mappings."""
-        return [
-            ("SPACE" if ch == " " else ch, code)
-            for ch, code in cls.TO_MORSE.items()
-        ]
+        return Codebook.get(codebook).reference_table()
@@ -0,0 +1,95 @@
+"""Incremental dit/dah state machine for symbol-at-a-time decoding."""
+
+from collections.abc import Iterable
+
+from .codebook import Codebook
+from .morse_converter import ConversionError
+
+
+class MorseDecoder:
+    """Decode Morse code one symbol at a time.
+
+    Every dit (`.`) or dah (`-`) advances a node index in the codebook's
+    array-backed trie, so no substring is built per letter. A letter gap
+    (` `) emits the letter of the current node, a word gap (`/`) also
+    emits a space. This is the common decoder core for sources that
+    produce symbols rather than finished tokens: keyed timing input,
+    audio input and other incremental feeds.
+
+    Example:
+        >>> decoder = MorseDecoder()
+        >>> "".join(map(decoder.feed, "... --- ...")) + decoder.flush()
+        'SOS'
+
+    """
+
+    def __init__(self, codebook: Codebook | str | None = None) -> None:
+        self.codebook = Codebook.get(codebook)
+        self._dit = self.codebook.trie_dit
+        self._dah = self.codebook.trie_dah
+        self._symbol = self.codebook.trie_symbol
+        self._node = 0
+        # Only set once the current letter has left the trie.
+        self._invalid: str | None = None
+        self._tokens = 0
+
+    def reset(self) -> None:
+        """Discard the current letter and start over."""
+        self._node = 0
+        self._invalid = None
+        self._tokens = 0
+
+    def feed(self, symbol: str) -> str:
+        """Advance the state machine by one symbol.
+
+        Args:
+            symbol: `.`, `-`, ` ` (letter gap) or `/` (word gap).
+
+        Returns:
+            The text completed by this symbol (usually empty).
+
+        Raises:
+            ConversionError: If a completed letter is not in the codebook;
+                `offset` is the token index like in `MorseConverter`.
+
+        """
+        if symbol == "." or symbol == "-":
+            if self._invalid is not None:
+                self._invalid += symbol
+                return ""
+            branch = self._dit if symbol == "." else self._dah
+            node = branch[self._node]
+            if node < 0:
+                self._invalid = self.codebook.trie_code[self._node] + symbol
+            self._node = node
+            return ""
+        if symbol == " ":
+            return self.flush()
+        if symbol == "/":
+            letter = self.flush()
+            self._tokens += 1
+            return letter + " "
+        raise ConversionError(
+            f"'{symbol}' ist kein gültiges Morse-Symbol.", self._tokens
+        )
+
+    def feed_all(self, symbols: Iterable[str]) -> str:
+        """Feed several symbols and return the text they completed."""
+        return "".join(map(self.feed, symbols))
+
+    def flush(self) -> str:
+        """Finish the current letter (if any) and return it."""
+        node = self._node
+        if node == 0:
+            return ""
+        invalid = self._invalid
+        self._node = 0
+        self._invalid = None
+        symbol = None if invalid is not None else self._symbol[node]
+        if symbol is None:
+            code = invalid or self.codebook.trie_code[node]
+            raise ConversionError(
+                f"'{code}' ist kein gültiger Morse-Buchstabe.", self._tokens
+            )
+        self._tokens += 1
+        return symbol
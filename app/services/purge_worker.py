@@ -0,0 +1,89 @@
+"""Background purge of soft-deleted chats and messages."""
+
+import os
+from datetime import datetime, timedelta
+
+from db import DatabaseManager
+from db.models import Chat, Message
+from sqlalchemy import delete, exists, select
+
+# Deleted rows can be restored for this long before they are purged.
+PURGE_UNDO_SECONDS = int(os.getenv("PURGE_UNDO_SECONDS", "30"))
+PURGE_INTERVAL_SECONDS = int(os.getenv("PURGE_INTERVAL_SECONDS", "60"))
+PURGE_BATCH_SIZE = int(os.getenv("PURGE_BATCH_SIZE", "2000"))
+PURGE_VACUUM_PAGES = int(os.getenv("PURGE_VACUUM_PAGES", "2000"))
+
+
+class PurgeWorker:
+    """Permanently delete rows marked longer ago than the undo window.
+
+    Work is split into batches of at most `batch_size` rows, each in its
+    own short transaction, so concurrent writers only ever wait for one
+    batch. Messages go first (both the ones marked individually and the
+    ones of marked chats), then the emptied chats. Afterwards up to
+    `vacuum_pages` free pages are handed back to the file system with
+    `PRAGMA incremental_vacuum`.
+    """
+
+    def __init__(
+        self,
+        undo_seconds: float = PURGE_UNDO_SECONDS,
+        batch_size: int = PURGE_BATCH_SIZE,
+        vacuum_pages: int = PURGE_VACUUM_PAGES,
+    ) -> None:
+        self.undo_seconds = undo_seconds
+        self.batch_size = batch_size
+        self.vacuum_pages = vacuum_pages
+
+    def purge(self, now: datetime | None = None) -> int:
+        """Purge everything past the undo window; returns rows deleted."""
+        cutoff = (now or datetime.now()) - timedelta(
+            seconds=self.undo_seconds
+        )
+        total = 0
+        while deleted := self.purge_batch(cutoff):
+            total += deleted
+        if total:
+            self.vacuum()
+        return total
+
+    def purge_batch(self, cutoff: datetime) -> int:
+        """Delete up to `batch_size` rows marked before `cutoff`."""
+        expired_chats = select(Chat.id).where(Chat.deleted_at <= cutoff)
+        batches = (
+            select(Message.id)
+            .where(Message.deleted_at <= cutoff)
+            .limit(self.batch_size),
+            select(Message.id)
+            .where(Message.chat_id.in_(expired_chats))
+            .limit(self.batch_size),
+        )
+        with DatabaseManager.engine.begin() as conn:
+            for ids in batches:
+                result = conn.execute(
+                    delete(Message).where(Message.id.in_(ids))
+                )
+                if result.rowcount:
+                    return result.rowcount
+            empty_chats = (
+                select(Chat.id)
+                .where(
+                    Chat.deleted_at <= cutoff,
+                    ~exists().where(Message.chat_id == Chat.id),
+                )
+                .limit(self.batch_size)
+            )
+            result = conn.execute(delete(Chat).where(Chat.id.in_(empty_chats)))
+            return result.rowcount
+
+    def vacuum(self) -> None:
+        """Return up to `vacuum_pages` free pages to the file system."""
+        with DatabaseManager.engine.connect() as conn:
+            cursor = conn.connection.cursor()
+            try:
+                # Each result row frees one page; read them all.
+                cursor.execute(
+                    f"PRAGMA incremental_vacuum({self.vacuum_pages})"
+                ).fetchall()
+            finally:
+                cursor.close()
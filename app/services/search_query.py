@@ -0,0 +1,82 @@
+"""Translate search input into SQLite FTS5 match expressions."""
+
+import os
+import re
+
+from .morse_converter import ConversionError, MorseConverter
+
+# Matches ranked per search, newest first; older ones are not returned.
+SEARCH_CANDIDATES = int(os.getenv("SEARCH_CANDIDATES", "1000"))
+_WORD = re.compile(r"\w+")
+
+
+def _quote(token: str) -> str:
+    """Quote a token as an FTS5 string, so no input is read as syntax."""
+    return '"' + token.replace('"', '""') + '"'
+
+
+def _spelled(morse_word: str) -> str:
+    """Return one Morse word as the token the search index holds."""
+    token = "z".join(morse_word.split())
+    return _quote(token.replace(".", "d").replace("-", "h"))
+
+
+class SearchQuery:
+    """Search input as the terms of both representations.
+
+    Text input is searched as typed (its last word as a prefix, so
+    results appear while typing) and encoded as Morse; Morse input as
+    typed and decoded. A conversion is thus found from either side,
+    whichever form the user remembers. See `db.search_index` for how
+    the two forms are indexed.
+    """
+
+    def __init__(self, raw: str) -> None:
+        self.raw = raw
+        stripped = raw.strip()
+        self.prefix = False
+        if MorseConverter.is_morse(stripped):
+            self.morse_words = self._morse_words(stripped)
+            try:
+                text = MorseConverter.decode(stripped)
+            except ConversionError:
+                text = ""
+            self.words = _WORD.findall(text.lower())
+        else:
+            self.words = _WORD.findall(stripped.lower())
+            # Still typing the last word: match it as a prefix.
+            self.prefix = bool(self.words) and bool(_WORD.match(raw[-1:]))
+            try:
+                encoded = MorseConverter.encode(" ".join(self.words))
+            except ConversionError:
+                encoded = ""
+            self.morse_words = self._morse_words(encoded)
+
+    @staticmethod
+    def _morse_words(morse: str) -> list[str]:
+        return [word for word in morse.split("/") if word.strip()]
+
+    def __bool__(self) -> bool:
+        """Return True if the input contains anything to search for."""
+        return bool(self.words or self.morse_words)
+
+    def match(self, text_column: str, owner: str) -> str:
+        """Return the MATCH expression for one user's index entries.
+
+        Args:
+            text_column: Name of the plain-text column of the index.
+            owner: User id whose entries are searched.
+
+        """
+        suffix = "*" if self.prefix else ""
+        alternatives = []
+        if self.words:
+            terms = [_quote(word) for word in self.words]
+            terms[-1] += suffix
+            alternatives.append(f"{text_column} : ({' AND '.join(terms)})")
+        if self.morse_words:
+            terms = [_spelled(word) for word in self.morse_words]
+            terms[-1] += suffix
+            alternatives.append(f"morse : ({' AND '.join(terms)})")
+        owner_token = _quote(owner.replace("-", ""))
+        return f"owner : {owner_token} AND ({' OR '.join(alternatives)})"
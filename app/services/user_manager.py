@@ -7,6 +7,7 @@ class UserManager:
     """Handles anonymous user id (auid) persistence."""
 
     SESSION_AUID_KEY = "auid"
+    DELETED_CHAT_KEY = "deleted_chat"
 
     @staticmethod
     def anonymous_session_user() -> str:
@@ -18,3 +19,13 @@ class UserManager:
                 uuid.uuid4()
             )
         return str(nicegui_app.storage.user[UserManager.SESSION_AUID_KEY])
+
+    @staticmethod
+    def remember_deleted_chat(chat_id: str) -> None:
+        """Remember the last deleted chat so it can be offered for undo."""
+        nicegui_app.storage.user[UserManager.DELETED_CHAT_KEY] = chat_id
+
+    @staticmethod
+    def pop_deleted_chat() -> str | None:
+        """Return and forget the last deleted chat, if any."""
+        return nicegui_app.storage.user.pop(UserManager.DELETED_CHAT_KEY, None)
@@ -12,7 +12,11 @@ def render_layout(chat_id: str | None) -> None:
     auid = UserManager.anonymous_session_user()
     service = ChatService(auid)
 
-    chat = service.get_chat(chat_id) if chat_id is not None else None
+    chat = (
+        service.get_chat(chat_id, with_messages=False)
+        if chat_id is not None
+        else None
+    )
     active_id = chat.id if chat is not None else None
 
     if chat_id is not None and chat is None:
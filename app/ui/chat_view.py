@@ -1,30 +1,141 @@
 """Chat view component for message display and input."""
 
-from datetime import datetime
+import tempfile
+import time
+from pathlib import Path
 
-from db.models import Chat
-from nicegui import ui
-from services import ChatService, MorseConverter
+from db.models import Chat, Message
+from nicegui import run, ui
+from services import (
+    ChatService,
+    ConversionError,
+    ConversionResult,
+    IncrementalConverter,
+    KeyerDecoder,
+    MorseConverter,
+)
 from services.file_upload_service import (
     EmptyFileError,
+    FileTooLargeError,
     FileUploadService,
+    InvalidAudioError,
     InvalidCharactersError,
     InvalidFileFormatError,
     InvalidMorseError,
     MixedContentError,
 )
 
+from .export_routes import EXPORT_ROUTE
 from .message_bubble import MessageBubble
 
+# Straight-key timing is measured in the browser, where it is precise, and
+# sent as batched [key-down ms, key-up ms] pairs. A pair is only complete
+# once the next press starts or the key has been idle long enough to end a
+# word, so a batch never splits a press from its pause.
+STRAIGHT_KEY_JS = """
+(() => {
+    const key = window.morseStraightKey || (window.morseStraightKey = {});
+    if (key.stop) key.stop();
+    if (!%(enable)s) return;
+    let downAt = null, upAt = null, pressed = null, batch = [];
+    const skip = (e) => e.code !== 'Space' || e.target.closest('input');
+    const down = (e) => {
+        if (skip(e)) return;
+        e.preventDefault(); e.stopPropagation();
+        if (e.repeat || downAt !== null) return;
+        downAt = performance.now();
+        if (pressed !== null) batch.push([pressed, downAt - upAt]);
+        pressed = null;
+        document.body.classList.add('key-down');
+    };
+    const up = (e) => {
+        if (skip(e)) return;
+        e.preventDefault(); e.stopPropagation();
+        if (downAt === null) return;
+        upAt = performance.now();
+        pressed = upAt - downAt;
+        downAt = null;
+        document.body.classList.remove('key-down');
+    };
+    const tick = setInterval(() => {
+        const idle = upAt === null ? 0 : performance.now() - upAt;
+        if (pressed !== null && idle > %(idle_ms)d) {
+            batch.push([pressed, idle]);
+            pressed = null;
+        }
+        if (batch.length) {
+            emitEvent('%(event)s', batch);
+            batch = [];
+        }
+    }, %(batch_ms)d);
+    document.addEventListener('keydown', down, true);
+    document.addEventListener('keyup', up, true);
+    key.stop = () => {
+        clearInterval(tick);
+        document.removeEventListener('keydown', down, true);
+        document.removeEventListener('keyup', up, true);
+        document.body.classList.remove('key-down');
+        key.stop = null;
+    };
+})();
+"""
+
+
+# Emit a scroll event only when the messages are scrolled near the top,
+# remembering the distance to the bottom so the view can stay in place
+# when older messages are inserted above.
+NEAR_TOP_JS = """(e) => {
+    const t = e.target;
+    if (t.scrollTop > 200) return;
+    t.dataset.fromBottom = t.scrollHeight - t.scrollTop;
+    emit();
+}"""
+
+SCROLL_TO_BOTTOM_JS = """requestAnimationFrame(() => {
+    const el = getHtmlElement(%(id)d);
+    if (el) el.scrollTop = el.scrollHeight;
+});"""
+
+KEEP_POSITION_JS = """requestAnimationFrame(() => {
+    const el = getHtmlElement(%(id)d);
+    if (el) el.scrollTop = el.scrollHeight - (el.dataset.fromBottom || 0);
+});"""
+
 
 class ChatView:
-    """Main chat area: header, messages, input bar."""
+    """Main chat area: header, messages, input bar.
+
+    Messages are shown newest page first; older pages are fetched with
+    `ChatService.get_messages` when the user scrolls to the top.
+    """
+
+    MESSAGE_PAGE_SIZE = 50
+    KEY_EVENT = "straight_key"
+    KEY_IDLE_MS = 1500
+    KEY_BATCH_MS = 250
+    PREVIEW_DEBOUNCE_S = 0.15
+    PREVIEW_MAX_CHARS = 240
 
     def __init__(self, service: ChatService, chat: Chat | None) -> None:
         self.service = service
         self.chat = chat
         self.input_value = ""
+        self.keyer = KeyerDecoder()
+        self.key_mode = False
+        self.converter = IncrementalConverter()
+        self._preview_due = 0.0
+        self._oldest: Message | None = None
+        self._loaded = 0
+        self._all_loaded = self.chat is None
+        self._first_page = (
+            self.service.get_messages(
+                self.chat.id, limit=self.MESSAGE_PAGE_SIZE
+            )
+            if self.chat is not None
+            else []
+        )
         self._render()
+        ui.on(self.KEY_EVENT, self._on_key_events)
 
     def _render(self) -> None:
         with ui.element("section").classes("main-content"):
@@ -46,19 +157,64 @@ class ChatView:
                     icon="grid_on",
                     on_click=self._show_reference,
                 ).props("flat no-caps").classes("toolbar-btn")
-                if self.chat is not None and self.chat.messages:
-                    ui.button(
-                        "Export", icon="download", on_click=self._export_chat
-                    ).props("flat no-caps").classes("toolbar-btn")
+                with (
+                    ui.dropdown_button("Export", icon="download")
+                    .props("flat no-caps")
+                    .classes("toolbar-btn")
+                ):
+                    if self._first_page:
+                        ui.item(
+                            "Chat als JSON",
+                            on_click=lambda: self._export_chat("json"),
+                        )
+                        ui.item(
+                            "Chat als NDJSON",
+                            on_click=lambda: self._export_chat("ndjson"),
+                        )
+                    ui.item("Alle Chats (ZIP)", on_click=self._export_all)
 
     def _render_messages(self) -> None:
-        with ui.element("div").classes("messages-area"):
-            if self.chat is None or not self.chat.messages:
+        with ui.element("div").classes("messages-area") as area:
+            if not self._first_page:
                 self._render_welcome()
                 return
-            with ui.element("div").classes("messages-inner"):
-                for i, msg in enumerate(self.chat.messages):
-                    MessageBubble(msg, is_user=(i % 2 == 0))
+            area.on(
+                "scroll",
+                self._load_older,
+                js_handler=NEAR_TOP_JS,
+                throttle=0.2,
+            )
+            self.messages_area = area
+            self.messages_inner = ui.element("div").classes("messages-inner")
+        self._prepend_messages(self._first_page)
+        ui.run_javascript(SCROLL_TO_BOTTOM_JS % {"id": area.id})
+
+    def _prepend_messages(self, messages: list[Message]) -> None:
+        """Insert a page of older messages above the loaded ones."""
+        self._all_loaded = len(messages) < self.MESSAGE_PAGE_SIZE
+        if not messages:
+            return
+        with self.messages_inner:
+            page = ui.element("div").classes("messages-page")
+        page.move(target_index=0)
+        # Inputs and replies alternate, counted from the newest message.
+        newest = self._loaded + len(messages) - 1
+        with page:
+            for i, msg in enumerate(messages):
+                MessageBubble(msg, is_user=(newest - i) % 2 == 1)
+        self._loaded += len(messages)
+        self._oldest = messages[0]
+
+    def _load_older(self) -> None:
+        if self._all_loaded or self.chat is None:
+            return
+        older = self.service.get_messages(
+            self.chat.id, before=self._oldest, limit=self.MESSAGE_PAGE_SIZE
+        )
+        self._prepend_messages(older)
+        self.messages_area.client.run_javascript(
+            KEEP_POSITION_JS % {"id": self.messages_area.id}
+        )
 
     def _render_welcome(self) -> None:
         with (
@@ -85,32 +241,109 @@ class ChatView:
             )
 
     def _render_input_bar(self) -> None:
-        with (
-            ui.element("div").classes("input-bar"),
-            ui.element("div").classes("input-inner"),
-        ):
-            ui.upload(
-                label="",
-                auto_upload=True,
-                max_file_size=FileUploadService.MAX_FILE_SIZE_BYTES,
-                on_upload=self._handle_upload,
-                on_rejected=self._handle_upload_rejected,
-            ).props('accept=".txt" flat dense').classes("attach-btn").tooltip(
-                "Textdatei hochladen (.txt, max. "
-                f"{FileUploadService.MAX_FILE_SIZE_KILOBYTES} KB)"
-            )
+        with ui.element("div").classes("input-bar"):
+            with ui.element("div").classes("input-inner"):
+                ui.upload(
+                    label="",
+                    auto_upload=True,
+                    max_file_size=FileUploadService.AUDIO_MAX_FILE_SIZE_BYTES,
+                    on_upload=self._handle_upload,
+                    on_rejected=self._handle_upload_rejected,
+                ).props('accept=".txt,.wav" flat dense').classes(
+                    "attach-btn"
+                ).tooltip(
+                    "Datei hochladen (.txt, max. "
+                    f"{FileUploadService.MAX_FILE_SIZE_KILOBYTES} KB; "
+                    "Morse-Audio .wav, max. "
+                    f"{FileUploadService.AUDIO_MAX_FILE_SIZE_MEGABYTES} MB)"
+                )
+
+                self.input_box = (
+                    ui.input(placeholder="Text oder Morse-Code eingeben…")
+                    .props("borderless dense")
+                    .classes("chat-input flex-1")
+                    .on("keydown.enter", self._on_send)
+                )
+                self.input_box.bind_value(self, "input_value")
+
+                self.key_button = (
+                    ui.button(
+                        icon="radio_button_checked", on_click=self._toggle_key
+                    )
+                    .props("flat round dense")
+                    .classes("key-btn")
+                    .tooltip("Handtaste: Leertaste als Morsetaste verwenden")
+                )
 
-            self.input_box = (
-                ui.input(placeholder="Text oder Morse-Code eingeben…")
-                .props("borderless dense")
-                .classes("chat-input flex-1")
-                .on("keydown.enter", self._on_send)
+                ui.button("Senden", icon="send", on_click=self._on_send).props(
+                    "unelevated no-caps"
+                ).classes("send-btn")
+
+            self.preview = ui.label().classes("input-preview")
+            self.preview.set_visibility(False)
+            self._preview_timer = ui.timer(
+                self.PREVIEW_DEBOUNCE_S / 2,
+                self._refresh_preview,
+                active=False,
             )
-            self.input_box.bind_value(self, "input_value")
+            self.input_box.on_value_change(self._on_input_change)
+
+    def _toggle_key(self) -> None:
+        self.key_mode = not self.key_mode
+        self.key_button.classes(toggle="active")
+        if self.key_mode:
+            self.keyer.flush()
+            ui.notify("Handtaste aktiv: mit der Leertaste morsen.")
+        self.input_box.run_method("blur")
+        ui.run_javascript(
+            STRAIGHT_KEY_JS
+            % {
+                "enable": "true" if self.key_mode else "false",
+                "event": self.KEY_EVENT,
+                "idle_ms": self.KEY_IDLE_MS,
+                "batch_ms": self.KEY_BATCH_MS,
+            }
+        )
 
-            ui.button("Senden", icon="send", on_click=self._on_send).props(
-                "unelevated no-caps"
-            ).classes("send-btn")
+    def _on_key_events(self, event) -> None:
+        """Decode a batch of `[key-down ms, key-up ms]` pairs."""
+        if not self.key_mode:
+            return
+        text: list[str] = []
+        for down_ms, up_ms in event.args or ():
+            try:
+                text.append(self.keyer.press(float(down_ms)))
+                text.append(self.keyer.pause(float(up_ms)))
+            except ConversionError as exc:
+                ui.notify(str(exc), type="warning")
+        if any(text):
+            self.input_value = (self.input_value or "") + "".join(text)
+
+    def _on_input_change(self) -> None:
+        # Debounce on the server: the timer fires until the input has
+        # been quiet for PREVIEW_DEBOUNCE_S, then converts once.
+        self._preview_due = time.monotonic() + self.PREVIEW_DEBOUNCE_S
+        self._preview_timer.activate()
+
+    def _refresh_preview(self) -> None:
+        if time.monotonic() < self._preview_due:
+            return
+        self._preview_timer.deactivate()
+        value = self.input_value or ""
+        result = self.converter.update(value)
+        if not value.strip():
+            self.preview.set_visibility(False)
+            return
+        if result.ok:
+            output = result.output
+            if len(output) > self.PREVIEW_MAX_CHARS:
+                output = "…" + output[-self.PREVIEW_MAX_CHARS :]
+            self.preview.set_text(f"→ {output}")
+            self.preview.classes(remove="error")
+        else:
+            self.preview.set_text(result.error)
+            self.preview.classes(add="error")
+        self.preview.set_visibility(True)
 
     def _on_send(self) -> None:
         value = (self.input_value or "").strip()
@@ -118,36 +351,38 @@ class ChatView:
             return
         self._send(value)
 
-    def _send(self, value: str) -> None:
+    def _send(
+        self, value: str, analysis: ConversionResult | None = None
+    ) -> None:
         chat_id = self.chat.id if self.chat is not None else None
         if chat_id is None:
             new_chat = self.service.create_chat()
             chat_id = new_chat.id
 
         try:
-            self.service.send_message(chat_id, value)
+            self.service.send_message(chat_id, value, analysis)
+            # The page reloads the chat, so queued messages must be in.
+            self.service.flush_messages()
         except Exception as exc:
             ui.notify(f"Fehler: {exc}", type="negative")
             return
 
         ui.navigate.to(f"/chat/{chat_id}")
 
-    def _export_chat(self) -> None:
+    def _export_chat(self, fmt: str) -> None:
         if self.chat is None:
-            return
-        payload = self.service.export_chat_json(self.chat.id)
-        if payload is None:
             ui.notify("Kein Inhalt zum Exportieren", type="warning")
             return
-        filename = (
-            f"chat_{self.chat.id}_{datetime.now().strftime('%Y-%m-%d')}.json"
-        )
-        ui.download(payload.encode("utf-8"), filename)
+        # Streamed by the export route instead of built in memory here.
+        ui.download.from_url(f"{EXPORT_ROUTE}/chat/{self.chat.id}?fmt={fmt}")
+
+    def _export_all(self) -> None:
+        ui.download.from_url(f"{EXPORT_ROUTE}/all")
 
     def _handle_upload_rejected(self, event) -> None:
         ui.notify(
             "Datei ist zu groß. Maximal "
-            f"{FileUploadService.MAX_FILE_SIZE_KILOBYTES} KB erlaubt.",
+            f"{FileUploadService.AUDIO_MAX_FILE_SIZE_MEGABYTES} MB erlaubt.",
             type="warning",
         )
 
@@ -157,6 +392,18 @@ class ChatView:
             ui.notify("Datei konnte nicht gelesen werden.", type="negative")
             return
 
+        try:
+            FileUploadService.validate_size(
+                upload.name, upload.content_type, upload.size()
+            )
+        except FileTooLargeError as exc:
+            ui.notify(str(exc), type="warning")
+            return
+
+        if FileUploadService.is_audio(upload.name, upload.content_type):
+            await self._handle_audio_upload(upload)
+            return
+
         try:
             raw_text = await upload.text(encoding="utf-8")
         except UnicodeDecodeError:
@@ -171,8 +418,8 @@ class ChatView:
             content = FileUploadService.process_upload(
                 upload.name, upload.content_type, raw_text
             )
-            content = FileUploadService.validate_content(content)
-            self._send(content)
+            analysis = FileUploadService.analyze_content(content)
+            self._send(content, analysis)
 
         except InvalidFileFormatError as exc:
             ui.notify(str(exc), type="warning")
@@ -185,6 +432,38 @@ class ChatView:
         except InvalidMorseError as exc:
             ui.notify(str(exc), type="negative")
 
+    async def _handle_audio_upload(self, upload) -> None:
+        # The recording is spooled to disk and decoded in a worker process,
+        # so neither memory nor the event loop is tied up by long files.
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "upload.wav"
+            try:
+                await upload.save(path)
+            except OSError:
+                # Saving only does file I/O (the spooled upload may
+                # already be gone); anything else is a bug and surfaces.
+                ui.notify(
+                    "Datei konnte nicht gelesen werden.", type="negative"
+                )
+                return
+
+            ui.notify("Morse-Audio wird dekodiert…")
+            try:
+                analysis = await run.cpu_bound(
+                    FileUploadService.process_audio_upload,
+                    upload.name,
+                    upload.content_type,
+                    path,
+                )
+            except (InvalidFileFormatError, InvalidAudioError) as exc:
+                ui.notify(str(exc), type="warning")
+                return
+            except InvalidMorseError as exc:
+                ui.notify(str(exc), type="negative")
+                return
+
+        self._send(analysis.source, analysis)
+
     def _show_reference(self) -> None:
         with (
             ui.dialog().props("maximized") as dialog,
@@ -0,0 +1,52 @@
+"""Download routes streaming chat exports to the browser."""
+
+from datetime import datetime
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from nicegui import app
+from services import ChatExport, ChatService, UserManager
+
+EXPORT_ROUTE = "/export"
+
+
+def _attachment(filename: str) -> dict[str, str]:
+    return {"Content-Disposition": f'attachment; filename="{filename}"'}
+
+
+def register_export_routes() -> None:
+    """Register the export download routes.
+
+    The responses are streamed while the chats are read, so neither the
+    server nor the browser ever holds a whole export in memory.
+    """
+
+    @app.get(EXPORT_ROUTE + "/chat/{chat_id}")
+    def export_chat(chat_id: str, fmt: str = "json") -> StreamingResponse:
+        service = ChatService(UserManager.anonymous_session_user())
+        try:
+            chunks = service.export_chat(chat_id, fmt)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        if chunks is None:
+            raise HTTPException(status_code=404, detail="Chat nicht gefunden")
+        filename = f"chat_{chat_id}_{datetime.now():%Y-%m-%d}.{fmt}"
+        return StreamingResponse(
+            chunks,
+            media_type=ChatExport.FORMATS[fmt],
+            headers=_attachment(filename),
+        )
+
+    @app.get(EXPORT_ROUTE + "/all")
+    def export_all_chats(fmt: str = "json") -> StreamingResponse:
+        service = ChatService(UserManager.anonymous_session_user())
+        try:
+            chunks = service.export_all_chats(fmt)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        filename = f"chats_{datetime.now():%Y-%m-%d}.zip"
+        return StreamingResponse(
+            chunks,
+            media_type=ChatExport.ARCHIVE_MEDIA_TYPE,
+            headers=_attachment(filename),
+        )
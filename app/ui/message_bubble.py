@@ -1,5 +1,10 @@
 from db.models import Message
-from nicegui import ui
+from nicegui import run, ui
+from services import ConversionError
+from services.morse_audio import MorseAudio
+
+# URL prefix under which the audio cache directory is served.
+AUDIO_ROUTE = "/audio"
 
 
 class MessageBubble:
@@ -29,8 +34,24 @@ class MessageBubble:
                 if msg.is_error
                 else ("Morse-Code" if msg.is_morse else "Text")
             )
-            ui.label(label).classes("bubble-label")
+            with ui.element("div").classes("bubble-header"):
+                ui.label(label).classes("bubble-label")
+                if msg.is_morse and not msg.is_error:
+                    ui.button(icon="play_arrow", on_click=self._play).props(
+                        "flat dense round"
+                    ).classes("bubble-play").tooltip("Abspielen")
             content_class = (
                 "bubble-content morse" if msg.is_morse else "bubble-content"
             )
             ui.label(msg.content).classes(content_class)
+
+    async def _play(self) -> None:
+        # Rendering happens at most once per message thanks to the cache.
+        try:
+            path = await run.io_bound(
+                MorseAudio.shared().cached_file, self.message.content
+            )
+        except ConversionError as exc:
+            ui.notify(f"Fehler: {exc}", type="negative")
+            return
+        ui.run_javascript(f"new Audio('{AUDIO_ROUTE}/{path.name}').play()")
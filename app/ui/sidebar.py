@@ -1,17 +1,39 @@
 """Left navigation sidebar for chat management."""
 
-from nicegui import ui
-from services import ChatService
+from nicegui import events, ui
+from services import ChatService, ChatSummary, SearchHit, UserManager
+from services.purge_worker import PURGE_UNDO_SECONDS
+from services.search_query import SEARCH_CANDIDATES
+
+# Emit a scroll event only when the list is close to its end.
+NEAR_END_JS = """(e) => {
+    const t = e.target;
+    if (t.scrollTop + t.clientHeight >= t.scrollHeight - 200) emit();
+}"""
 
 
 class Sidebar:
-    """Left navigation sidebar listing all chats."""
+    """Left navigation sidebar listing all chats.
+
+    Chats are loaded as lightweight summaries, one page at a time; the
+    next page is fetched when the list is scrolled near its end. While
+    the search box holds a query, its results replace the chat list and
+    are paged the same way.
+    """
+
+    PAGE_SIZE = 50
+    SEARCH_PAGE_SIZE = 20
 
     def __init__(
         self, service: ChatService, active_chat_id: str | None
     ) -> None:
         self.service = service
         self.active_chat_id = active_chat_id
+        self._last: ChatSummary | None = None
+        self._exhausted = False
+        self._query = ""
+        self._search_offset = 0
+        self._search_exhausted = True
         self._render()
 
     def _render(self) -> None:
@@ -22,20 +44,128 @@ class Sidebar:
                     icon="add_circle_outline",
                     on_click=self._new_chat,
                 ).props("unelevated no-caps").classes("sidebar-new-btn")
+                ui.input(placeholder="Chats durchsuchen …").props(
+                    "dense dark borderless clearable"
+                ).classes("sidebar-search").on(
+                    "update:model-value",
+                    self._search,
+                    throttle=0.3,
+                    leading_events=False,
+                )
 
-            with ui.element("div").classes("sidebar-list"):
-                chats = self.service.list_chats()
-                if not chats:
+            self.chat_list = (
+                ui.element("div")
+                .classes("sidebar-list")
+                .on(
+                    "scroll",
+                    self._load_more,
+                    js_handler=NEAR_END_JS,
+                    throttle=0.2,
+                )
+            )
+            with self.chat_list:
+                self._load_more()
+                if self._last is None:
                     ui.label("Keine Chats vorhanden").classes("sidebar-empty")
-                else:
-                    for chat in chats:
-                        self._render_chat_row(chat)
+
+            self.search_list = (
+                ui.element("div")
+                .classes("sidebar-list")
+                .on(
+                    "scroll",
+                    self._search_more,
+                    js_handler=NEAR_END_JS,
+                    throttle=0.2,
+                )
+            )
+            self.search_list.set_visibility(False)
+
+            self._render_undo()
 
             with ui.element("div").classes("sidebar-footer"):
                 ui.label("Text ↔ Morse-Code")
                 ui.label("Konverter mit Chat-Historie")
 
-    def _render_chat_row(self, chat) -> None:
+    def _render_undo(self) -> None:
+        """Offer to restore a chat deleted on the previous page."""
+        chat_id = UserManager.pop_deleted_chat()
+        if chat_id is None:
+            return
+        with ui.element("div").classes("sidebar-undo") as bar:
+            ui.label("Chat gelöscht")
+            ui.button(
+                "Rückgängig", on_click=lambda: self._undo_delete(chat_id)
+            ).props("flat dense no-caps")
+        # The chat may be purged once the undo window has passed.
+        ui.timer(PURGE_UNDO_SECONDS, bar.delete, once=True)
+
+    def _load_more(self) -> None:
+        """Append the next page of chats to the list."""
+        if self._exhausted:
+            return
+        chats = self.service.list_chat_summaries(
+            limit=self.PAGE_SIZE, after=self._last
+        )
+        self._exhausted = len(chats) < self.PAGE_SIZE
+        with self.chat_list:
+            for chat in chats:
+                self._render_chat_row(chat)
+        if chats:
+            self._last = chats[-1]
+
+    def _search(self, e: events.GenericEventArguments) -> None:
+        """Show the results for the typed query instead of the chats."""
+        self._query = (e.args or "").strip()
+        self.search_list.clear()
+        self._search_offset = 0
+        self._search_exhausted = False
+        self.chat_list.set_visibility(not self._query)
+        self.search_list.set_visibility(bool(self._query))
+        if not self._query:
+            return
+        self._search_more()
+        if not self._search_offset:
+            with self.search_list:
+                ui.label("Keine Treffer").classes("sidebar-empty")
+
+    def _search_more(self) -> None:
+        """Append the next page of search results."""
+        if self._search_exhausted or not self._query:
+            return
+        hits = self.service.search(
+            self._query,
+            limit=self.SEARCH_PAGE_SIZE,
+            offset=self._search_offset,
+        )
+        self._search_exhausted = len(hits) < self.SEARCH_PAGE_SIZE
+        self._search_offset += len(hits)
+        with self.search_list:
+            for hit in hits:
+                self._render_search_hit(hit)
+            # Older matches beyond the ranked candidates are not found.
+            if self._search_exhausted and (
+                self._search_offset >= SEARCH_CANDIDATES
+            ):
+                ui.label(
+                    "Nur die neuesten Treffer werden angezeigt. "
+                    "Suche eingrenzen, um ältere zu finden."
+                ).classes("sidebar-empty")
+
+    def _render_search_hit(self, hit: SearchHit) -> None:
+        with (
+            ui.element("div")
+            .classes("chat-row search-hit")
+            .on("click", lambda: ui.navigate.to(f"/chat/{hit.chat_id}"))
+        ):
+            icon = "title" if hit.message_id is None else "search"
+            ui.icon(icon).style("font-size: 16px;")
+            with ui.element("div").classes("text"):
+                ui.label(hit.chat_title).classes("title")
+                if hit.message_id is not None:
+                    ui.label(hit.content).classes("preview")
+            ui.label(f"{hit.timestamp:%d.%m.%Y}").classes("date")
+
+    def _render_chat_row(self, chat: ChatSummary) -> None:
         is_active = chat.id == self.active_chat_id
         row_class = "chat-row active" if is_active else "chat-row"
         with (
@@ -44,7 +174,10 @@ class Sidebar:
             .on("click", lambda c=chat: ui.navigate.to(f"/chat/{c.id}"))
         ):
             ui.icon("chat_bubble_outline").style("font-size: 16px;")
-            ui.label(chat.title).classes("title")
+            with ui.element("div").classes("text"):
+                ui.label(chat.title).classes("title")
+                if chat.last_message:
+                    ui.label(chat.last_message).classes("preview")
             pin_icon = "push_pin" if chat.pinned else "o_push_pin"
             pin_btn = (
                 ui.button(icon=pin_icon)
@@ -120,9 +253,19 @@ class Sidebar:
 
     def _delete_chat(self, chat_id: str) -> None:
         self.service.delete_chat(chat_id)
+        UserManager.remember_deleted_chat(chat_id)
         if chat_id == self.active_chat_id:
             ui.navigate.to("/")
         else:
             ui.navigate.to(
                 f"/chat/{self.active_chat_id}" if self.active_chat_id else "/"
             )
+
+    def _undo_delete(self, chat_id: str) -> None:
+        if self.service.restore_chat(chat_id):
+            ui.navigate.to(f"/chat/{chat_id}")
+        else:
+            ui.notify(
+                "Zu spät: Chat wurde bereits endgültig gelöscht.",
+                type="warning",
+            )
@@ -39,6 +39,12 @@ html, body {
     text-transform: none !important;
 }
 .sidebar-new-btn:hover { background: #374151 !important; }
+.sidebar-search {
+    margin-top: 12px;
+    padding: 0 12px;
+    border-radius: 8px;
+    background: #1f2937;
+}
 .sidebar-list { flex: 1; overflow-y: auto; padding: 8px; }
 .sidebar-empty {
     color: #6b7280;
@@ -58,8 +64,12 @@ html, body {
 }
 .chat-row:hover { background: #1f2937; }
 .chat-row.active { background: #1f2937; }
-.chat-row .title { flex: 1; font-size: 0.875rem; overflow: hidden;
+.chat-row .text { flex: 1; min-width: 0; }
+.chat-row .title { font-size: 0.875rem; overflow: hidden;
     text-overflow: ellipsis; white-space: nowrap; }
+.chat-row .preview { font-size: 0.75rem; color: #9ca3af; overflow: hidden;
+    text-overflow: ellipsis; white-space: nowrap; }
+.chat-row .date { font-size: 0.7rem; color: #6b7280; flex-shrink: 0; }
 .chat-row .actions { opacity: 0; transition: opacity 0.15s; display: flex; gap: 2px; }
 .chat-row:hover .actions { opacity: 1; }
 .chat-row.active .actions { opacity: 1; }
@@ -77,6 +87,17 @@ html, body {
 .chat-row.active .pin-btn,
 .pin-btn.pinned { opacity: 1; }
 .pin-btn.pinned { color: #f3f4f6 !important; }
+.sidebar-undo {
+    display: flex;
+    align-items: center;
+    justify-content: space-between;
+    margin: 8px;
+    padding: 6px 12px;
+    border-radius: 8px;
+    background: #374151;
+    color: #f3f4f6;
+    font-size: 0.875rem;
+}
 .sidebar-footer {
     padding: 16px;
     border-top: 1px solid #374151;
@@ -111,6 +132,7 @@ html, body {
 }
 .messages-inner { max-width: 768px; margin: 0 auto; display: flex;
     flex-direction: column; gap: 12px; }
+.messages-page { display: contents; }
 
 /* Welcome screen */
 .welcome-wrap {
@@ -145,6 +167,15 @@ html, body {
 .bubble-morse { background: #f3f4f6; color: #111827; }
 .bubble-text { background: #1f2937; color: #ffffff; }
 .bubble-error { background: #fef2f2; color: #b91c1c; border: 1px solid #fecaca; }
+.bubble-header { display: flex; align-items: center; justify-content: space-between; gap: 8px; }
+.bubble-play {
+    color: inherit !important;
+    opacity: 0.6;
+    padding: 0 !important;
+    min-height: 0 !important;
+    margin: -4px -6px 0 0;
+}
+.bubble-play:hover { opacity: 1; }
 .bubble-label { font-size: 0.75rem; opacity: 0.7; margin-bottom: 4px;
     text-transform: uppercase; letter-spacing: 0.05em; }
 .bubble-content { font-family: 'JetBrains Mono', monospace; word-break: break-word; }
@@ -157,6 +188,20 @@ html, body {
     background: #ffffff;
 }
 .input-inner { max-width: 768px; margin: 0 auto; display: flex; gap: 8px; align-items: flex-end; }
+.input-preview {
+    max-width: 768px;
+    margin: 6px auto 0;
+    font-family: 'JetBrains Mono', monospace;
+    font-size: 0.8rem;
+    color: #6b7280;
+    white-space: nowrap;
+    overflow: hidden;
+    text-overflow: ellipsis;
+}
+.input-preview.error { color: #dc2626; }
+.key-btn { color: #6b7280 !important; align-self: center; }
+.key-btn.active { color: #2563eb !important; }
+body.key-down .key-btn.active { color: #dc2626 !important; }
 
 /* Attach (file upload) — collapse q-uploader to a round blue icon button */
 .attach-btn {
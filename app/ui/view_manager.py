@@ -2,9 +2,14 @@
 
 from pathlib import Path
 
-from nicegui import ui
+from nicegui import app, run, ui
+from services import ChatService, PurgeWorker
+from services.morse_audio import MorseAudio
+from services.purge_worker import PURGE_INTERVAL_SECONDS
 
 from .app_layout import register_pages
+from .export_routes import register_export_routes
+from .message_bubble import AUDIO_ROUTE
 from .styles import CUSTOM_CSS
 
 
@@ -34,14 +39,39 @@ class ViewManager:
         """Register global CSS styles (app-wide, once at startup)."""
         ui.add_head_html(CUSTOM_CSS, shared=True)
 
+    def setup_media(self) -> None:
+        """Serve cached Morse audio files (streamed with range support)."""
+        directory = MorseAudio.shared().cache.directory
+        directory.mkdir(parents=True, exist_ok=True)
+        app.add_media_files(AUDIO_ROUTE, directory)
+
     def setup_pages(self) -> None:
-        """Register all page routes."""
+        """Register all page and download routes."""
         register_pages()
+        register_export_routes()
+
+    def setup_purge_worker(self) -> None:
+        """Purge soft-deleted chats and messages in the background."""
+        worker = PurgeWorker()
+
+        async def purge() -> None:
+            await run.io_bound(worker.purge)
+
+        app.timer(PURGE_INTERVAL_SECONDS, purge)
+
+    def setup_message_writer(self) -> None:
+        """Commit queued messages before the application exits."""
+        writer = ChatService.message_writer
+        if writer is not None:
+            app.on_shutdown(writer.close)
 
     def run(self) -> None:
         """Initialize and start the NiceGUI application."""
         self.setup_styles()
+        self.setup_media()
         self.setup_pages()
+        self.setup_purge_worker()
+        self.setup_message_writer()
         ui.run(
             title=self.title,
             host=self.host,
@@ -0,0 +1,89 @@
+"""Micro-benchmark: table-driven vs. per-character Morse conversion.
+
+Run from the repository root::
+
+    python benchmarks/bench_morse_converter.py
+
+Prints the throughput of `MorseConverter.encode`/`decode` and of the
+symbol-at-a-time `MorseDecoder` next to the per-character reference path
+on 1 KB, 100 KB and 10 MB inputs.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parents[1] / "app"
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from services.codebook import Codebook  # noqa: E402
+from services.morse_converter import MorseConverter  # noqa: E402
+from services.morse_decoder import MorseDecoder  # noqa: E402
+
+ITU = Codebook.get("itu")
+
+SIZES = {"1 KB": 1024, "100 KB": 100 * 1024, "10 MB": 10 * 1024 * 1024}
+SAMPLE = "THE QUICK BROWN FOX JUMPS OVER THE LAZY DOG 0123456789. "
+
+
+def _text_of_size(size: int) -> str:
+    return (SAMPLE * (size // len(SAMPLE) + 1))[:size].strip()
+
+
+def _best_of(func, value: str, budget: float = 0.5) -> float:
+    """Return the best wall time of `func(value)` within a time budget."""
+    best = float("inf")
+    deadline = time.perf_counter() + budget
+    while True:
+        start = time.perf_counter()
+        func(value)
+        best = min(best, time.perf_counter() - start)
+        if time.perf_counter() >= deadline:
+            return best
+
+
+def _throughput(size: int, seconds: float) -> str:
+    return f"{size / seconds / 1024 / 1024:9.1f} MB/s"
+
+
+def main() -> None:
+    """Print a throughput comparison table."""
+    print(f"{'input':>8}  {'operation':<8}  {'fast':>14}  {'per-char':>14}")
+    for label, size in SIZES.items():
+        text = _text_of_size(size)
+        morse = MorseConverter.encode(text)
+        cases = [
+            (
+                "encode",
+                text,
+                MorseConverter.encode,
+                lambda v: MorseConverter._encode_per_char(v.upper(), ITU),
+            ),
+            (
+                "decode",
+                morse,
+                MorseConverter.decode,
+                lambda v: MorseConverter._decode_per_token(v, ITU),
+            ),
+            (
+                "trie",
+                morse,
+                lambda v: MorseDecoder(ITU).feed_all(v),
+                lambda v: MorseConverter._decode_per_token(v, ITU),
+            ),
+        ]
+        for name, value, fast, reference in cases:
+            fast_s = _best_of(fast, value)
+            reference_s = _best_of(reference, value)
+            print(
+                f"{label:>8}  {name:<8}  {_throughput(len(value), fast_s)}"
+                f"  {_throughput(len(value), reference_s)}"
+                f"  (x{reference_s / fast_s:.1f})"
+            )
+
+
+if __name__ == "__main__":
+    main()
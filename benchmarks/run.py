@@ -0,0 +1,382 @@
+"""Benchmark suite for the conversion engine and the chat services.
+
+Run from the repository root::
+
+    python benchmarks/run.py                        # print results
+    python benchmarks/run.py --json results.json    # also write JSON
+    python benchmarks/run.py --save-baseline benchmarks/baseline.json
+    python benchmarks/run.py --baseline benchmarks/baseline.json
+
+Everything runs offline on the stdlib (`timeit`, `time.perf_counter`).
+Each benchmark reports the best time per call over several repeats.
+`ChatService` benchmarks run against temporary SQLite databases seeded
+with 10, 1k and 100k messages through bulk inserts. The `bulk.*`
+benchmarks time the data generator and the chat importer loading that
+many messages into a fresh, fully migrated database (search index
+included).
+
+With `--baseline`, every result is compared to the stored one; a result
+slower than `1 + threshold` times its baseline is a regression and makes
+the script exit with status 1. The threshold defaults to `--threshold`
+and can be overridden per benchmark in the baseline file::
+
+    {"results": {...}, "thresholds": {"chat.list_chats[100k]": 0.5}}
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import timeit
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from itertools import count
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+    from sqlalchemy.engine import Engine
+
+APP_DIR = Path(__file__).resolve().parents[1] / "app"
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from db import DatabaseManager, synthetic_data  # noqa: E402
+from db.chat_import import import_files  # noqa: E402
+from db.migrations import migrate  # noqa: E402
+from db.models import Chat, Message, User  # noqa: E402
+from services.chat_service import ChatService  # noqa: E402
+from services.file_upload_service import FileUploadService  # noqa: E402
+from services.morse_converter import MorseConverter  # noqa: E402
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+SAMPLE = "THE QUICK BROWN FOX JUMPS OVER THE LAZY DOG 0123456789. "
+TEXT_SIZES = {"short": 11, "1KB": 1024, "100KB": 100 * 1024}
+DB_SIZES = {"10": 10, "1k": 1_000, "100k": 100_000}
+MESSAGES_PER_CHAT = 100
+BENCH_USER = "bench-user"
+SLOW_CALL_SECONDS = 1.0
+
+
+def _text_of_size(size: int) -> str:
+    return (SAMPLE * (size // len(SAMPLE) + 1))[:size].strip()
+
+
+def converter_cases() -> Iterator[tuple[str, Callable[[], object]]]:
+    """Yield `MorseConverter` and upload validation benchmarks."""
+    for label, size in TEXT_SIZES.items():
+        text = _text_of_size(size)
+        morse = MorseConverter.encode(text)
+        yield (
+            f"convert.encode[{label}]",
+            lambda t=text: MorseConverter.encode(t),
+        )
+        yield (
+            f"convert.decode[{label}]",
+            lambda m=morse: MorseConverter.decode(m),
+        )
+        yield (
+            f"convert.convert[{label}]",
+            lambda t=text: MorseConverter.convert(t),
+        )
+        yield (
+            f"convert.is_morse[{label}]",
+            lambda m=morse: MorseConverter.is_morse(m),
+        )
+
+    # Uploads are capped at MAX_FILE_SIZE_BYTES.
+    size = FileUploadService.MAX_FILE_SIZE_BYTES
+    text = _text_of_size(size // 5)
+    morse = MorseConverter.encode(text)
+    yield (
+        "upload.validate_content[text]",
+        lambda: FileUploadService.validate_content(text),
+    )
+    yield (
+        "upload.validate_content[morse]",
+        lambda: FileUploadService.validate_content(morse),
+    )
+
+
+def seed_database(url: str, messages: int) -> str:
+    """Create a database with `messages` messages for one user.
+
+    Rows are written with executemany bulk inserts, not through the ORM
+    unit of work. Messages are spread over chats of
+    `MESSAGES_PER_CHAT` messages, alternating user input (text) and
+    converted replies (Morse).
+
+    Returns:
+        The id of the first (oldest) chat.
+
+    """
+    engine = create_engine(url)
+    Chat.metadata.create_all(engine)
+    start = datetime(2024, 1, 1)
+    morse = MorseConverter.encode(SAMPLE.strip())
+    chats: list[dict] = []
+    rows: list[dict] = []
+    for index in range(messages):
+        if index % MESSAGES_PER_CHAT == 0:
+            created = start + timedelta(minutes=len(chats))
+            chats.append(
+                {
+                    "id": str(uuid.uuid4()),
+                    "user_id": BENCH_USER,
+                    "title": f"Chat {len(chats) + 1}",
+                    "pinned": len(chats) % 10 == 0,
+                    "created_at": created,
+                    "updated_at": created,
+                    "unpinned_at": created,
+                }
+            )
+        is_reply = index % 2 == 1
+        rows.append(
+            {
+                "id": str(uuid.uuid4()),
+                "chat_id": chats[-1]["id"],
+                "content": morse if is_reply else SAMPLE.strip(),
+                "is_morse": is_reply,
+                "is_error": False,
+                "timestamp": start + timedelta(seconds=index),
+            }
+        )
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"id": BENCH_USER, "created_at": start}])
+        if chats:
+            conn.execute(insert(Chat), chats)
+        if rows:
+            conn.execute(insert(Message), rows)
+    engine.dispose()
+    return chats[0]["id"]
+
+
+def write_export(path: Path, messages: int) -> None:
+    """Write an NDJSON export of `messages` messages to `path`."""
+    start = datetime(2024, 1, 1)
+    morse = MorseConverter.encode(SAMPLE.strip())
+    with path.open("w", encoding="utf-8") as out:
+        for index in range(messages):
+            if index % MESSAGES_PER_CHAT == 0:
+                chat = {"id": str(uuid.uuid4()), "title": f"Chat {index}"}
+                out.write(json.dumps(chat) + "\n")
+            is_reply = index % 2 == 1
+            message = {
+                "id": str(uuid.uuid4()),
+                "content": morse if is_reply else SAMPLE.strip(),
+                "is_morse": is_reply,
+                "timestamp": (start + timedelta(seconds=index)).isoformat(),
+            }
+            out.write(json.dumps(message) + "\n")
+
+
+def bulk_cases(
+    tmp: Path, label: str, messages: int
+) -> Iterator[tuple[str, Callable[[], object]]]:
+    """Yield bulk load benchmarks, each into a new migrated database."""
+    databases = count()
+
+    def fresh_engine() -> Engine:
+        path = tmp / f"bulk_{label}_{next(databases)}.db"
+        engine = create_engine(f"sqlite:///{path}")
+        Chat.metadata.create_all(engine)
+        migrate(engine)
+        return engine
+
+    def generate() -> None:
+        engine = fresh_engine()
+        synthetic_data.generate(
+            engine, 1, messages // MESSAGES_PER_CHAT or 1, MESSAGES_PER_CHAT
+        )
+        engine.dispose()
+
+    export = tmp / f"export_{label}.ndjson"
+    write_export(export, messages)
+
+    def load() -> None:
+        engine = fresh_engine()
+        import_files(engine, [export], owner=BENCH_USER)
+        engine.dispose()
+
+    yield f"bulk.generate[{label}]", generate
+    yield f"bulk.import[{label}]", load
+
+
+@contextmanager
+def use_database(url: str) -> Iterator[None]:
+    """Point `DatabaseManager` (and so `ChatService`) at another DB.
+
+    The engine uses the same SQLite profile as the app.
+    """
+    saved = DatabaseManager.engine, DatabaseManager.SessionLocal
+    engine = DatabaseManager.profile.create_engine(url)
+    DatabaseManager.engine = engine
+    DatabaseManager.SessionLocal = sessionmaker(
+        bind=engine, autoflush=False, autocommit=False, future=True
+    )
+    try:
+        yield
+    finally:
+        engine.dispose()
+        DatabaseManager.engine, DatabaseManager.SessionLocal = saved
+
+
+def measure(func: Callable[[], object], repeat: int) -> dict[str, float]:
+    """Return the best time per call of `func` over `repeat` runs.
+
+    The calibration run counts as the first repeat; calls slower than
+    `SLOW_CALL_SECONDS` are not repeated at all.
+    """
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    samples = [elapsed]
+    if elapsed / number < SLOW_CALL_SECONDS:
+        samples += timer.repeat(repeat=repeat - 1, number=number)
+    best = min(samples) / number
+    return {"seconds": best, "ops_per_sec": 1 / best, "number": number}
+
+
+def run(
+    repeat: int, db_sizes: dict[str, int], pattern: str | None
+) -> dict[str, dict[str, float]]:
+    """Run all benchmarks whose name contains `pattern`."""
+    results: dict[str, dict[str, float]] = {}
+
+    def record(name: str, func: Callable[[], object]) -> None:
+        if pattern and pattern not in name:
+            return
+        results[name] = measure(func, repeat)
+        print(f"{name:<40} {_format_seconds(results[name]['seconds'])}")
+
+    for name, func in converter_cases():
+        record(name, func)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, messages in db_sizes.items():
+            names = [
+                f"chat.{op}[{label}]"
+                for op in (
+                    "send_message",
+                    "list_chats",
+                    "get_chat",
+                    "list_chat_summaries",
+                    "get_messages",
+                )
+            ]
+            bulk = [f"bulk.{op}[{label}]" for op in ("generate", "import")]
+            if not pattern or any(pattern in name for name in bulk):
+                for name, func in bulk_cases(Path(tmp), label, messages):
+                    record(name, func)
+            if pattern and not any(pattern in name for name in names):
+                continue
+            url = f"sqlite:///{Path(tmp) / f'bench_{label}.db'}"
+            chat_id = seed_database(url, messages)
+            with use_database(url):
+                service = ChatService(BENCH_USER)
+                # Read paths first: send_message grows the database.
+                record(names[1], service.list_chats)
+                record(names[3], service.list_chat_summaries)
+                record(names[2], lambda s=service, c=chat_id: s.get_chat(c))
+                record(
+                    names[4], lambda s=service, c=chat_id: s.get_messages(c)
+                )
+                target = service.create_chat("Benchmark").id
+                record(
+                    names[0],
+                    lambda s=service, t=target: s.send_message(t, "SOS"),
+                )
+    return results
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict,
+    threshold: float,
+) -> list[str]:
+    """Print the comparison table and return the regressed benchmarks."""
+    stored = baseline.get("results", {})
+    overrides = baseline.get("thresholds", {})
+    regressions: list[str] = []
+    print(f"\n{'benchmark':<40} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for name, result in results.items():
+        if name not in stored:
+            print(f"{name:<40} {'-':>10} {'':>10} {'new':>7}")
+            continue
+        ratio = result["seconds"] / stored[name]["seconds"]
+        limit = 1 + overrides.get(name, threshold)
+        flag = "  REGRESSION" if ratio > limit else ""
+        if flag:
+            regressions.append(name)
+        print(
+            f"{name:<40} {_format_seconds(stored[name]['seconds']):>10} "
+            f"{_format_seconds(result['seconds']):>10} {ratio:>6.2f}x{flag}"
+        )
+    return regressions
+
+
+def _format_seconds(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:7.2f} {unit}"
+    return f"{seconds / 1e-9:7.2f} ns"
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the suite; returns the process exit status."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--json", type=Path, help="write results here")
+    parser.add_argument("--baseline", type=Path, help="compare to this file")
+    parser.add_argument(
+        "--save-baseline", type=Path, help="store results as new baseline"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="allowed slowdown before a regression (0.2 = 20%%)",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--db-sizes",
+        default=",".join(DB_SIZES),
+        help=f"comma-separated subset of {', '.join(DB_SIZES)}",
+    )
+    parser.add_argument("-k", dest="pattern", help="only names containing")
+    args = parser.parse_args(argv)
+
+    db_sizes = {
+        label: DB_SIZES[label]
+        for label in filter(None, args.db_sizes.split(","))
+    }
+    results = run(args.repeat, db_sizes, args.pattern)
+    report = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    for path in filter(None, (args.json, args.save_baseline)):
+        path.write_text(json.dumps(report, indent=2) + "\n")
+
+    if args.baseline is None:
+        return 0
+    baseline = json.loads(args.baseline.read_text())
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
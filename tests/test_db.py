@@ -85,3 +85,306 @@ def test_delete_chat_deletes_related_messages(fresh_db) -> None:
 
         remaining = session.execute(select(Message)).scalars().all()
         assert remaining == []
+
+
+def test_synthetic_data_is_readable_through_orm(
+    fresh_db, tmp_path, monkeypatch
+) -> None:
+    """TC_026: Generate synthetic data with bulk inserts.
+
+    Fills the database with `db.synthetic_data.generate` and checks the
+    row counts and that the raw inserted values (timestamps, booleans)
+    load through the ORM, with every reply stored after its input. The
+    `--owner` user may exist already, and the command line creates the
+    schema of a new database.
+    """
+    from db.database_manager import DatabaseManager
+    from db.migrations import current_version, latest_version
+    from db.models.chat import Chat
+    from db.models.message import Message
+    from db.models.user import User
+    from db.synthetic_data import generate, main
+    from sqlalchemy import create_engine
+
+    with DatabaseManager.session() as session:
+        session.add(User(id="owner-id"))
+        session.commit()
+    counts = generate(
+        DatabaseManager.engine, 3, 40, 10, seed=1, owner="owner-id"
+    )
+    assert counts == {"users": 3, "chats": 120, "messages": 1200}
+
+    with DatabaseManager.session() as session:
+        chats = session.execute(select(Chat)).scalars().all()
+        assert len(chats) == 120
+        assert sum(chat.user_id == "owner-id" for chat in chats) == 40
+        assert any(chat.pinned for chat in chats)
+
+        chat = chats[0]
+        messages = sorted(chat.messages, key=lambda m: m.timestamp)
+        assert len(messages) == 10
+        assert messages[0].timestamp >= chat.created_at
+        assert messages[-1].timestamp == chat.updated_at
+        assert [m.is_morse for m in messages[1::2]] == [
+            not (m.is_morse or r.is_error)
+            for m, r in zip(messages[::2], messages[1::2], strict=True)
+        ]
+
+        errors = session.execute(
+            select(Message).where(Message.is_error.is_(True))
+        ).scalars()
+        assert next(errors, None) is not None
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'new.db'}")
+    monkeypatch.setattr(DatabaseManager, "engine", engine)
+    assert main(["--users", "1", "--chats", "1", "--messages", "2"]) == 0
+    with engine.connect() as conn:
+        assert current_version(conn) == latest_version()
+
+
+def test_migrations_add_indexes_to_existing_database(
+    fresh_db, tmp_path, monkeypatch
+) -> None:
+    """TC_029: Migrate an existing database to the current schema.
+
+    Builds a database with the schema from before the migrations (no
+    `deleted_at`, only the `user_id` index, `user_version` 0) and checks
+    that `init_db` adds the columns and indexes, keeps the rows, drops
+    the superseded `user_id` index, stamps `user_version` and does
+    nothing on a second run.
+    """
+    from db.database_manager import DatabaseManager
+    from db.migrations import current_version, latest_version, migrate
+    from sqlalchemy import create_engine
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        for ddl in (
+            (
+                "CREATE TABLE users (id VARCHAR(64) NOT NULL, "
+                "created_at DATETIME NOT NULL, PRIMARY KEY (id))"
+            ),
+            (
+                "CREATE TABLE chats (id VARCHAR(36) NOT NULL, "
+                "user_id VARCHAR(64), title VARCHAR(120) NOT NULL, "
+                "pinned BOOLEAN NOT NULL, created_at DATETIME NOT NULL, "
+                "unpinned_at DATETIME, updated_at DATETIME NOT NULL, "
+                "PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES users (id) "
+                "ON DELETE CASCADE)"
+            ),
+            "CREATE INDEX ix_chats_user_id ON chats (user_id)",
+            (
+                "CREATE TABLE messages (id VARCHAR(36) NOT NULL, "
+                "chat_id VARCHAR(36) NOT NULL, content VARCHAR NOT NULL, "
+                "is_morse BOOLEAN NOT NULL, is_error BOOLEAN NOT NULL, "
+                "timestamp DATETIME NOT NULL, PRIMARY KEY (id), "
+                "FOREIGN KEY(chat_id) REFERENCES chats (id) ON DELETE CASCADE)"
+            ),
+            "INSERT INTO users VALUES ('u', '2024-01-01 00:00:00')",
+            (
+                "INSERT INTO chats VALUES ('c', 'u', 'Alt', 0, "
+                "'2024-01-01 00:00:00', NULL, '2024-01-01 00:00:00')"
+            ),
+            (
+                "INSERT INTO messages VALUES ('m', 'c', 'SOS', 0, 0, "
+                "'2024-01-01 00:00:00')"
+            ),
+        ):
+            conn.exec_driver_sql(ddl)
+    monkeypatch.setattr(DatabaseManager, "engine", engine)
+
+    DatabaseManager.init_db()
+    assert migrate(engine) == []
+
+    with engine.connect() as conn:
+        assert current_version(conn) == latest_version()
+        names = set(
+            conn.exec_driver_sql(
+                "SELECT name FROM sqlite_master WHERE type = 'index'"
+            ).scalars()
+        )
+        columns = [
+            row[2]
+            for row in conn.exec_driver_sql(
+                "PRAGMA index_info(ix_messages_chat_timestamp)"
+            )
+        ]
+        deleted = conn.exec_driver_sql(
+            "SELECT deleted_at FROM messages WHERE id = 'm'"
+        ).scalar_one_or_none()
+        found = conn.exec_driver_sql(
+            "SELECT rowid FROM messages_fts WHERE messages_fts MATCH 'sos'"
+        ).all()
+    assert {
+        "ix_messages_chat_timestamp",
+        "ix_chats_user_sidebar",
+        "ix_chats_deleted_at",
+        "ix_messages_deleted_at",
+    } <= names
+    assert "ix_chats_user_id" not in names
+    assert columns == ["chat_id", "timestamp", "id", "deleted_at"]
+    assert deleted is None
+    assert len(found) == 1
+
+
+def test_sqlite_profile_is_applied_to_connections(fresh_db) -> None:
+    """TC_031: SQLite tuning profile on every connection.
+
+    Checks that the connect listener switches the database to WAL with
+    the configured pragmas, and that concurrent writers wait for the
+    lock instead of failing with "database is locked".
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from db.database_manager import DatabaseManager
+    from db.models.chat import Chat
+    from db.models.message import Message
+    from db.models.user import User
+
+    settings = DatabaseManager.settings()
+    profile = DatabaseManager.profile
+    assert settings["journal_mode"] == "wal"
+    assert settings["busy_timeout"] == profile.busy_timeout_ms
+    assert settings["cache_size"] == -profile.cache_size_kb
+
+    def send(index: int) -> None:
+        with DatabaseManager.session() as session:
+            chat = Chat(title="Test", user=User(id=f"user-{index}"))
+            session.add(chat)
+            session.commit()
+            for _ in range(5):
+                session.add(Message(chat_id=chat.id, content="SOS"))
+                session.commit()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(send, range(8)))
+
+    with DatabaseManager.session() as session:
+        messages = session.execute(select(Message)).scalars().all()
+        assert len(messages) == 8 * 5
+
+
+def test_chat_import_round_trip_and_id_policies(fresh_db, tmp_path) -> None:
+    """TC_036: Bulk import of exported chats.
+
+    Imports a `Chat.to_dict` JSON export and an NDJSON export of the
+    same chat, checking that message order survives the whole-second
+    timestamps and that `skip`, `remap` and `overwrite` handle the
+    colliding ids as documented; ids owned by another user are remapped.
+    The search index ends up matching the imported rows, and an import
+    failing halfway leaves it still indexing later messages.
+    """
+    import json
+    from datetime import datetime
+
+    from db.chat_import import ImportFormatError, import_files
+    from db.database_manager import DatabaseManager
+    from db.models.chat import Chat
+    from db.models.message import Message
+
+    now = datetime(2025, 1, 1, 12, 0, 0, 500)
+    with DatabaseManager.session() as session:
+        chat = Chat(id="chat-1", title="Export", created_at=now)
+        chat.messages.extend(
+            Message(id=f"m{i}", content=text, timestamp=now)
+            for i, text in enumerate(("Z", "--..", "A", ".-"))
+        )
+        session.add(chat)
+        session.commit()
+        exported = chat.to_dict()
+        session.delete(chat)
+        session.commit()
+
+    as_json = tmp_path / "chat.json"
+    as_json.write_text(json.dumps(exported, indent=2), encoding="utf-8")
+    as_ndjson = tmp_path / "chat.ndjson"
+    header = {k: v for k, v in exported.items() if k != "messages"}
+    as_ndjson.write_text(
+        "\n".join(json.dumps(r) for r in [header, *exported["messages"]]),
+        encoding="utf-8",
+    )
+
+    engine = DatabaseManager.engine
+    counts = import_files(engine, [as_json], owner="new-owner")
+    assert counts == {"chats": 1, "messages": 4, "skipped": 0, "remapped": 0}
+    assert import_files(engine, [as_ndjson])["skipped"] == 5
+    assert import_files(engine, [as_ndjson], policy="remap") == {
+        "chats": 1,
+        "messages": 4,
+        "skipped": 0,
+        "remapped": 5,
+    }
+
+    exported["messages"][0]["content"] = "E"
+    as_json.write_text(json.dumps(exported), encoding="utf-8")
+    counts = import_files(
+        engine, [as_json], policy="overwrite", owner="new-owner"
+    )
+    assert counts["chats"] == 1
+    assert counts["remapped"] == 0
+    # Another user's import must neither replace the chat nor its rows.
+    exported["messages"][0]["content"] = "I"
+    as_json.write_text(json.dumps(exported), encoding="utf-8")
+    counts = import_files(
+        engine, [as_json], policy="overwrite", owner="intruder"
+    )
+    assert counts["remapped"] == 5
+
+    with DatabaseManager.session() as session:
+        chats = session.execute(select(Chat)).scalars().all()
+        assert len(chats) == 3
+        for chat in chats:
+            contents = [m.content for m in chat.messages]
+            assert contents[1:] == ["--..", "A", ".-"]
+        original = session.get(Chat, "chat-1")
+        assert original.user_id == "new-owner"
+        assert [m.id for m in original.messages] == ["m0", "m1", "m2", "m3"]
+        assert original.messages[0].content == "E"
+
+    # The index was filled once per import and its triggers restored.
+    with engine.connect() as conn:
+        for table in ("messages", "chats"):
+            rows = conn.exec_driver_sql(
+                f"SELECT rowid FROM {table} ORDER BY rowid"
+            ).scalars()
+            indexed = conn.exec_driver_sql(
+                f"SELECT rowid FROM {table}_fts ORDER BY rowid"
+            ).scalars()
+            assert list(indexed) == list(rows)
+        triggers = conn.exec_driver_sql(
+            "SELECT count(*) FROM sqlite_master WHERE type = 'trigger'"
+        )
+        assert triggers.scalar_one() == 6
+
+    broken = tmp_path / "broken.json"
+    broken.write_text('{"id": "x", "messages": [{"content": ', "utf-8")
+    with pytest.raises(ImportFormatError):
+        import_files(engine, [broken])
+    with DatabaseManager.session() as session:
+        assert session.get(Chat, "x") is None
+
+    # A load failing halfway rolls back its rows but keeps the triggers.
+    late = tmp_path / "late.ndjson"
+    late.write_text(
+        "\n".join(
+            json.dumps(r)
+            for r in (
+                {"id": "ok", "title": "Gut"},
+                {"id": "ok-1", "content": "Gut"},
+                {"id": "bad", "created_at": "not-a-date"},
+            )
+        ),
+        encoding="utf-8",
+    )
+    with pytest.raises(ImportFormatError):
+        import_files(engine, [late])
+    with DatabaseManager.session() as session:
+        assert session.get(Chat, "ok") is None
+        session.add(Chat(id="after", messages=[Message(content="Antenne")]))
+        session.commit()
+    with engine.connect() as conn:
+        found = conn.exec_driver_sql(
+            "SELECT count(*) FROM messages_fts WHERE messages_fts MATCH ?",
+            ("antenne",),
+        )
+        assert found.scalar_one() == 1
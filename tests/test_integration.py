@@ -110,3 +110,422 @@ def test_toggle_pin_toggles_state(fresh_db) -> None:
 
     assert service.toggle_pin(chat.id) is True
     assert service.toggle_pin(chat.id) is False
+
+
+def test_upload_analysis_is_reused_by_send_message(
+    fresh_db, monkeypatch
+) -> None:
+    """TC_018: Upload validation and sending share one analysis.
+
+    Ensures that the `ConversionResult` produced while validating an
+    upload is consumed by `send_message` without converting again.
+    """
+    from services.chat_service import ChatService
+    from services.file_upload_service import FileUploadService
+    from services.morse_converter import MorseConverter
+
+    analysis = FileUploadService.analyze_content("... --- ...")
+
+    def fail(value: str):
+        raise AssertionError("input analyzed twice")
+
+    monkeypatch.setattr(MorseConverter, "analyze", fail)
+
+    service = ChatService(user_auid="test-id")
+    chat = service.create_chat()
+    user_msg, bot_msg = service.send_message(
+        chat.id, "... --- ...", analysis
+    )
+    assert user_msg.is_morse is True
+    assert bot_msg.content == "SOS"
+
+
+def test_chat_summaries_page_in_sidebar_order(fresh_db) -> None:
+    """TC_027: Chat summaries with keyset pagination.
+
+    Pages of `list_chat_summaries` must together match `list_chats`
+    in order, with message counts and the last message as preview.
+    """
+    from services.chat_service import ChatService
+
+    service = ChatService(user_auid="test-id")
+    chats = [service.create_chat(title=f"Chat {i}") for i in range(7)]
+    service.send_message(chats[2].id, "SOS")
+    service.send_message(chats[2].id, "HI")
+    service.toggle_pin(chats[5].id)
+
+    pages, after = [], None
+    while page := service.list_chat_summaries(limit=3, after=after):
+        assert len(page) <= 3
+        pages.extend(page)
+        after = page[-1]
+
+    assert [s.id for s in pages] == [c.id for c in service.list_chats()]
+    assert pages[0].id == chats[5].id
+    assert pages[0].pinned is True
+    summary = next(s for s in pages if s.id == chats[2].id)
+    assert summary.title == "SOS"
+    assert summary.message_count == 4
+    assert summary.last_message == ".... .."
+
+
+def test_get_messages_pages_newest_first(fresh_db) -> None:
+    """TC_028: Keyset-paginated message loading.
+
+    `get_messages` returns the newest page first (oldest message first
+    within a page); passing a page's first message as `before` returns
+    the previous page until the whole chat has been read in order.
+    """
+    from services.chat_service import ChatService
+
+    service = ChatService(user_auid="test-id")
+    chat = service.create_chat()
+    for word in ("A", "B", "C", "D", "E"):
+        service.send_message(chat.id, word)
+
+    pages = []
+    page = service.get_messages(chat.id, limit=4)
+    while page:
+        pages.insert(0, page)
+        page = service.get_messages(chat.id, before=page[0], limit=4)
+
+    assert [len(p) for p in pages] == [2, 4, 4]
+    contents = [m.content for p in pages for m in p]
+    assert contents[::2] == ["A", "B", "C", "D", "E"]
+    assert contents[1] == ".-"
+    assert [m.id for p in pages for m in p] == [
+        m.id for m in service.get_chat(chat.id).messages
+    ]
+    assert ChatService(user_auid="other").get_messages(chat.id) == []
+
+
+def test_paging_query_plans_use_indexes(fresh_db) -> None:
+    """TC_030: Paging queries are served by indexes.
+
+    The query plans of the sidebar and message paging queries must
+    search an index instead of scanning a table or sorting.
+    """
+    from services.chat_service import ChatService
+
+    plans = ChatService.query_plans()
+    for plan in plans.values():
+        assert plan
+        assert not any(step.startswith("SCAN") for step in plan)
+        assert not any("TEMP B-TREE" in step for step in plan)
+    assert "ix_messages_chat_timestamp" in " ".join(plans["get_messages"])
+    assert "ix_chats_user_sidebar" in plans["list_chat_summaries"][0]
+    # The message count stays index-only despite the soft-delete filter.
+    covering = "COVERING INDEX ix_messages_chat_timestamp"
+    assert covering in " ".join(plans["list_chat_summaries"])
+
+
+def test_user_row_is_resolved_once(fresh_db) -> None:
+    """TC_032: Cached user resolution.
+
+    The first call for a new user costs one upsert; afterwards neither
+    the same service nor a new service for that user touches `users`,
+    and a read costs a single statement.
+    """
+    from services import chat_service
+    from sqlalchemy import event
+
+    engine = chat_service.DatabaseManager.engine
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, *args) -> None:
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        service = chat_service.ChatService(user_auid="cached-user")
+        service.list_chat_summaries()
+        assert [s.split()[0] for s in statements] == ["INSERT", "SELECT"]
+        assert "ON CONFLICT DO NOTHING" in statements[0]
+
+        statements.clear()
+        service.list_chat_summaries()
+        chat_service.ChatService(user_auid="cached-user").get_messages("x")
+        assert len(statements) == 2
+        assert not any("users" in s.split("FROM")[-1] for s in statements)
+
+        chat_service.ChatService.known_users.discard("cached-user")
+        statements.clear()
+        chat_service.ChatService(user_auid="cached-user").get_messages("x")
+        assert [s.split()[0] for s in statements] == ["INSERT", "SELECT"]
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def test_bulk_deletes_do_not_load_messages(fresh_db) -> None:
+    """TC_033: Set-based deletes for chats and messages.
+
+    `clear_messages` and `delete_chat` must each run one statement (a
+    soft-delete `UPDATE`; the messages of a deleted chat are hidden with
+    it), never select messages, and leave other users' chats untouched.
+    """
+    from services import chat_service
+    from sqlalchemy import event
+
+    service = chat_service.ChatService(user_auid="deleting-user")
+    chat = service.create_chat()
+    other = service.create_chat()
+    for word in ("A", "B", "C"):
+        service.send_message(chat.id, word)
+        service.send_message(other.id, word)
+
+    chat_service.ChatService(user_auid="intruder").delete_chat(chat.id)
+    assert len(service.get_messages(chat.id)) == 6
+
+    engine = chat_service.DatabaseManager.engine
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, *args) -> None:
+        statements.append(statement.split()[0])
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        service.clear_messages(chat.id)
+        service.delete_chat(other.id)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert statements == ["UPDATE", "UPDATE"]
+    assert service.get_chat(chat.id) is not None
+    assert service.get_messages(chat.id) == []
+    assert service.get_chat(other.id) is None
+
+
+def test_soft_delete_undo_and_purge(fresh_db) -> None:
+    """TC_034: Soft delete with undo window and background purge.
+
+    A deleted chat disappears from every read at once and can be
+    restored within the undo window; once the window has passed the
+    purge worker removes the chat and its messages for good.
+    """
+    from datetime import datetime, timedelta
+
+    from services import chat_service
+    from services.purge_worker import PurgeWorker
+
+    service = chat_service.ChatService(user_auid="undo-user")
+    chat = service.create_chat()
+    for word in ("A", "B"):
+        service.send_message(chat.id, word)
+
+    service.delete_chat(chat.id)
+    assert service.get_chat(chat.id) is None
+    assert chat.id not in [s.id for s in service.list_chat_summaries()]
+    assert service.restore_chat(chat.id)
+    assert len(service.get_messages(chat.id)) == 4
+
+    service.clear_messages(chat.id)
+    assert service.get_messages(chat.id) == []
+    assert service.restore_messages(chat.id) == 4
+    assert len(service.get_messages(chat.id)) == 4
+
+    service.delete_chat(chat.id)
+    later = datetime.now() + timedelta(hours=1)
+    assert PurgeWorker(undo_seconds=60).purge(now=later) >= 5
+    assert not service.restore_chat(chat.id)
+    engine = chat_service.DatabaseManager.engine
+    with engine.connect() as conn:
+        remaining = conn.exec_driver_sql(
+            "SELECT COUNT(*) FROM messages WHERE chat_id = ?", (chat.id,)
+        )
+        assert remaining.scalar_one() == 0
+
+
+def test_streaming_export_formats_and_archive(fresh_db) -> None:
+    """TC_035: Streaming chat export.
+
+    Exports a chat in small batches as JSON and NDJSON and all chats as
+    a ZIP archive, and checks that every format holds the same messages
+    in chronological order. The archive is a snapshot: a message sent
+    while it streams is left out.
+    """
+    import io
+    import zipfile
+
+    from services import chat_service
+    from services.chat_export import ChatExport
+
+    service = chat_service.ChatService(user_auid="export-user")
+    chat = service.create_chat()
+    other = service.create_chat()
+    for word in ("A", "B", "C"):
+        service.send_message(chat.id, word)
+    service.send_message(other.id, "D")
+
+    with chat_service.DatabaseManager.session() as session:
+        export = ChatExport(session, batch_size=2)
+        stored = session.get(chat_service.Chat, chat.id)
+        chunks = list(export.chat_chunks(stored, "ndjson"))
+    assert len(chunks) == 1 + 3  # header, then batches of two messages
+    lines = [json.loads(line) for line in b"".join(chunks).splitlines()]
+    assert lines[0]["id"] == chat.id
+    assert [m["content"] for m in lines[1:3]] == ["A", ".-"]
+
+    data = json.loads(b"".join(service.export_chat(chat.id, "json")))
+    assert data["messages"] == lines[1:]
+    assert service.export_chat("missing") is None
+    with pytest.raises(ValueError, match="Exportformat"):
+        service.export_chat(chat.id, "xml")
+
+    stream = service.export_all_chats()
+    first = next(stream)
+    # Sent while the archive is read: not part of its snapshot.
+    service.send_message(other.id, "E")
+    archive = zipfile.ZipFile(io.BytesIO(first + b"".join(stream)))
+    assert archive.testzip() is None
+    names = archive.namelist()
+    assert len(names) == 2
+    assert json.loads(archive.read(names[0]))["messages"] == data["messages"]
+    assert len(json.loads(archive.read(names[1]))["messages"]) == 2
+
+
+def test_full_text_search(fresh_db, monkeypatch) -> None:
+    """TC_037: Full-text search over messages and chat titles.
+
+    Text finds the Morse form of a conversion and Morse the text form,
+    the last word matches as a prefix and chat titles are found too.
+    Chats of other users and deleted chats are not searched, deleted
+    matches do not use up the ranked candidates, and purged messages
+    leave the index.
+    """
+    from datetime import datetime, timedelta
+
+    from services import chat_service
+    from services.purge_worker import PurgeWorker
+
+    service = chat_service.ChatService(user_auid="search-user")
+    chat = service.create_chat()
+    service.send_message(chat.id, "Antenne defekt")
+    service.rename_chat(chat.id, "Funkbetrieb")
+    other = chat_service.ChatService(user_auid="other-user")
+    other.send_message(other.create_chat().id, "Antenne defekt")
+
+    by_text = service.search("antenne")
+    assert sorted(h.content for h in by_text if h.message_id) == [
+        ".- -. - . -. -. . / -.. . ..-. . -.- -",
+        "Antenne defekt",
+    ]
+    assert {h.chat_id for h in by_text} == {chat.id}
+    assert len(service.search("-.. . ..-. . -.- -")) == 2
+    assert len(service.search("ante")) == 2
+    assert service.search("ante ") == []
+    pages = [service.search("ante", limit=1, offset=n) for n in (0, 1, 2)]
+    assert [len(page) for page in pages] == [1, 1, 0]
+    titles = service.search("funkbe")
+    assert [(h.message_id, h.content) for h in titles] == [
+        (None, "Funkbetrieb")
+    ]
+    assert service.search("") == []
+    assert service.search("zzzz") == []
+
+    monkeypatch.setattr(chat_service, "SEARCH_CANDIDATES", 2)
+    newer = service.create_chat()
+    service.send_message(newer.id, "Antenne neu")
+    service.delete_chat(newer.id)
+    assert len(service.search("antenne")) == 2
+
+    service.delete_chat(chat.id)
+    assert service.search("antenne") == []
+    engine = chat_service.DatabaseManager.engine
+    indexed = "SELECT COUNT(*) FROM messages_fts WHERE rowid IN ({})"
+    with engine.connect() as conn:
+        rowids = conn.exec_driver_sql(
+            "SELECT rowid FROM messages WHERE chat_id = ?", (chat.id,)
+        ).scalars()
+        indexed = indexed.format(", ".join(map(str, rowids)))
+        assert conn.exec_driver_sql(indexed).scalar_one() == 2
+    later = datetime.now() + timedelta(hours=1)
+    PurgeWorker(undo_seconds=60).purge(now=later)
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql(indexed).scalar_one() == 0
+
+
+def test_write_behind_batches_sends(fresh_db, monkeypatch) -> None:
+    """TC_038: Write-behind batching of sent messages.
+
+    Queued sends of several users are committed together in one batch
+    once flushed; the chat is titled after its first message, even if a
+    later send in the batch has a title and the first one has none. A
+    send to a chat that vanished before the batch was written fails on
+    its own without losing the others. The writer flushes at exit once,
+    however often its thread restarts, and outlives unexpected errors.
+    """
+    import atexit
+    import threading
+    from concurrent.futures import Future
+
+    from services import chat_service
+    from services.message_writer import MessageWriter
+
+    hooks = []
+    monkeypatch.setattr(atexit, "register", hooks.append)
+    writer = MessageWriter(max_delay_ms=1000, durability="queued")
+    monkeypatch.setattr(chat_service.ChatService, "message_writer", writer)
+    alice = chat_service.ChatService(user_auid="alice")
+    bob = chat_service.ChatService(user_auid="bob")
+    chats = [alice.create_chat(), bob.create_chat()]
+    for word in ("SOS", "HI", "QTH"):
+        for service, chat in zip((alice, bob), chats, strict=True):
+            service.send_message(chat.id, word)
+    writer.flush()
+
+    assert writer.batches == 1
+    assert [m.content for m in alice.get_messages(chats[0].id)][-2:] == [
+        "QTH",
+        "--.- - ....",
+    ]
+    assert len(bob.get_messages(chats[1].id)) == 6
+    assert alice.get_chat(chats[0].id).title == "SOS"
+
+    doomed = alice.create_chat()
+    alice.send_message(doomed.id, "SOS")
+    bob.send_message(chats[1].id, "TEST")
+    engine = chat_service.DatabaseManager.engine
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DELETE FROM chats WHERE id = ?", (doomed.id,))
+    writer.close()
+    assert writer.batches == 1
+    assert len(bob.get_messages(chats[1].id)) == 8
+
+    failed = alice.create_chat()
+    alice.send_message(failed.id, "~~~")
+    alice.send_message(failed.id, "SOS")
+    writer.close()
+    assert alice.get_chat(failed.id).title == "Neuer Chat"
+    assert len(alice.get_messages(failed.id)) == 4
+    assert hooks == [writer.close]
+
+    strict = MessageWriter(max_delay_ms=0, durability="commit")
+    monkeypatch.setattr(chat_service.ChatService, "message_writer", strict)
+    calls = []
+
+    def write_once_broken(conn, sends) -> None:
+        calls.append(sends)
+        if len(calls) == 1:
+            raise RuntimeError("kaputt")
+        MessageWriter.write(conn, sends)
+
+    def send(text: str) -> None:
+        # On a daemon thread, so a send that never returns fails the test
+        # instead of hanging it.
+        done: Future = Future()
+
+        def run() -> None:
+            try:
+                done.set_result(alice.send_message(failed.id, text))
+            except Exception as exc:  # noqa: BLE001
+                done.set_exception(exc)
+
+        threading.Thread(target=run, daemon=True).start()
+        done.result(timeout=10)
+
+    monkeypatch.setattr(strict, "write", write_once_broken)
+    with pytest.raises(RuntimeError):
+        send("HI")
+    send("QTH")
+    strict.close()
+    assert len(alice.get_messages(failed.id)) == 6
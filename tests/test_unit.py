@@ -42,3 +42,455 @@ def test_encode_unsupported_character_raises() -> None:
 
     with pytest.raises(ConversionError):
         MorseConverter.encode("Hello 😊")
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["SOS", "Hello World", "  a  b  ", "(1,2)/3-4?", "Straße 5."],
+)
+def test_fast_encode_decode_match_reference_path(text: str) -> None:
+    """TC_011: Fast path matches the per-character reference path.
+
+    Verifies that the table-driven `encode`/`decode` produce exactly
+    the same output as the per-character reference implementation.
+    """
+    from services.codebook import Codebook
+    from services.morse_converter import MorseConverter
+
+    itu = Codebook.get("itu")
+    morse = MorseConverter.encode(text)
+    assert morse == MorseConverter._encode_per_char(text.upper(), itu)
+    assert MorseConverter.decode(morse) == (
+        MorseConverter._decode_per_token(morse.strip(), itu)
+    )
+
+
+def test_fast_path_reports_first_invalid_symbol() -> None:
+    """TC_012: Fast path reports the exact offending symbol.
+
+    Ensures the fallback still raises a ConversionError naming the
+    first unsupported character or Morse token.
+    """
+    from services.morse_converter import ConversionError, MorseConverter
+
+    with pytest.raises(ConversionError, match="'#' kann nicht"):
+        MorseConverter.encode("AB#C!")
+    with pytest.raises(ConversionError, match="'.-.-.-.-' ist kein"):
+        MorseConverter.decode("...  .-.-.-.- --- ......")
+
+
+def test_streaming_matches_whole_input_conversion() -> None:
+    """TC_013: Streaming conversion across arbitrary chunk borders.
+
+    Verifies that `iter_encode`/`iter_decode` produce the same result as
+    the whole-string conversion, regardless of where chunks are split
+    (including inside Morse tokens and multi-byte UTF-8 characters).
+    """
+    from services.morse_converter import MorseConverter
+
+    text = "  Hello World\n2 times Straße? no -- ok.  "
+    expected_morse = MorseConverter.encode(" ".join(text.split()))
+    expected_text = MorseConverter.decode(expected_morse)
+    for size in (1, 2, 3, 7, 64):
+        data = text.encode("utf-8")
+        chunks = [data[i : i + size] for i in range(0, len(data), size)]
+        morse = "".join(MorseConverter.iter_encode(chunks))
+        assert morse == expected_morse
+
+        raw = (morse.replace(" / ", "\n/\n") + "\n").encode("utf-8")
+        raw_chunks = [raw[i : i + size] for i in range(0, len(raw), size)]
+        assert "".join(MorseConverter.iter_decode(raw_chunks)) == (
+            expected_text
+        )
+
+
+def test_streaming_rejects_empty_and_invalid_input() -> None:
+    """TC_014: Streaming conversion error handling.
+
+    Ensures the generators raise a ConversionError for streams without
+    content and for overlong tokens that never find a separator, and
+    that error offsets count from the start of the whole stream, also
+    after prosigns.
+    """
+    from services.morse_converter import ConversionError, MorseConverter
+
+    with pytest.raises(ConversionError):
+        list(MorseConverter.iter_encode(["  ", "\n"]))
+    with pytest.raises(ConversionError):
+        list(MorseConverter.iter_decode(iter(["." * 50] * 1000)))
+
+    with pytest.raises(ConversionError) as exc:
+        MorseConverter.encode("Hi <SK> #", "itu-extended")
+    assert exc.value.offset == 8
+    chunks = ["Hallo  <SK>\n", "  Welt <SK> #"]
+    with pytest.raises(ConversionError) as exc:
+        list(MorseConverter.iter_encode(chunks, "itu-extended"))
+    assert exc.value.offset == "".join(chunks).index("#")
+
+    for chunks in (
+        [".- -...\n", "-.-. ......"],
+        [".- -... ", "-.-. ...... ."],
+    ):
+        with pytest.raises(ConversionError) as exc:
+            list(MorseConverter.iter_decode(chunks))
+        assert exc.value.offset == 3
+
+
+def test_batch_conversion_keeps_order_and_errors() -> None:
+    """TC_015: Batch conversion across worker processes.
+
+    Verifies that `BatchConverter.convert_many` auto-detects the
+    direction per item, returns results in input order and reports
+    errors per item, matching `MorseConverter.convert`.
+    """
+    from services.batch_converter import BatchConverter
+    from services.morse_converter import ConversionError, MorseConverter
+
+    values = ["SOS", "... --- ...", "Hi 😊", "", ".-.-.-.-", "A B"] * 5
+    converter = BatchConverter(workers=2, chunk_size=4, parallel_threshold=0)
+    results = converter.convert_many(values)
+
+    assert len(results) == len(values)
+    for value, result in zip(values, results, strict=True):
+        try:
+            expected = MorseConverter.convert(value)
+        except ConversionError as exc:
+            assert not result.ok
+            assert result.error == str(exc)
+        else:
+            assert result.ok
+            assert (result.output, result.is_morse) == expected
+
+
+def test_document_sharding_matches_serial_conversion() -> None:
+    """TC_016: Chunk-parallel conversion of a large document.
+
+    Differential test: `BatchConverter.convert_document` must return
+    exactly what `MorseConverter.convert` returns, and report the same
+    error with the global character/token offset.
+    """
+    from services.batch_converter import BatchConverter
+    from services.morse_converter import ConversionError, MorseConverter
+
+    converter = BatchConverter(
+        workers=2, shard_size=500, document_threshold=0
+    )
+    text = "  The quick brown fox, 42 times.  " * 300
+    morse = MorseConverter.encode(text)
+    for value in (text, "  " + morse + "  "):
+        assert converter.convert_document(value) == (
+            MorseConverter.convert(value)
+        )
+
+    for value in (text + "ä" + text, morse + " .-.-.-.- " + morse):
+        with pytest.raises(ConversionError) as serial:
+            MorseConverter.convert(value)
+        with pytest.raises(ConversionError) as sharded:
+            converter.convert_document(value)
+        assert str(sharded.value) == str(serial.value)
+        assert sharded.value.offset == serial.value.offset
+        assert sharded.value.offset > 500
+
+
+def test_analyze_reports_direction_output_and_all_issues() -> None:
+    """TC_017: Single-pass analysis with positional diagnostics.
+
+    Verifies that `MorseConverter.analyze` returns the detected
+    direction, the converted output and every invalid character or
+    token together with its offset.
+    """
+    from services.morse_converter import ConversionIssue, MorseConverter
+
+    ok = MorseConverter.analyze("SOS")
+    assert (ok.input_is_morse, ok.output, ok.output_is_morse) == (
+        False,
+        "... --- ...",
+        True,
+    )
+
+    text = MorseConverter.analyze("A#B!")
+    assert not text.ok
+    assert text.error == "'#' kann nicht in Morse-Code dargestellt werden."
+    assert text.issues == (ConversionIssue(1, "#"), ConversionIssue(3, "!"))
+
+    morse = MorseConverter.analyze(".- ...... -  ---.---")
+    assert morse.input_is_morse
+    assert [i.offset for i in morse.issues] == [1, 3]
+
+
+def test_codebooks_are_selectable_per_call() -> None:
+    """TC_019: Pluggable codebooks.
+
+    Verifies the shipped ITU extensions (umlauts, `@`), prosigns and the
+    Cyrillic alphabet, and that compiled codebooks are shared instead
+    of rebuilt.
+    """
+    import pickle
+
+    from services.codebook import Codebook
+    from services.morse_converter import ConversionError, MorseConverter
+
+    assert MorseConverter.encode("Ä@", "itu-extended") == ".-.- .--.-."
+    assert MorseConverter.encode("hi <SK>", "itu-extended") == (
+        ".... .. / ...-.-"
+    )
+    assert MorseConverter.decode("...-.- ...---...", "itu-extended") == (
+        "<SK><SOS>"
+    )
+    assert MorseConverter.convert("СОС", "cyrillic") == ("... --- ...", True)
+    assert MorseConverter.decode("... --- ...", "cyrillic") == "СОС"
+
+    with pytest.raises(ConversionError):
+        MorseConverter.encode("Ä")
+    with pytest.raises(ValueError):
+        MorseConverter.encode("A", "klingon")
+
+    book = Codebook.get("itu-extended")
+    assert pickle.loads(pickle.dumps(book)) is book
+
+
+def test_state_machine_decoder_feeds_symbol_by_symbol() -> None:
+    """TC_020: Trie-based incremental decoder.
+
+    Verifies that `MorseDecoder.feed`/`flush` decode one symbol at a
+    time exactly like `MorseConverter.decode` and report invalid
+    letters with their token index.
+    """
+    from services.morse_converter import ConversionError, MorseConverter
+    from services.morse_decoder import MorseDecoder
+
+    morse = MorseConverter.encode("Hello World 73")
+    decoder = MorseDecoder()
+    emitted = [decoder.feed(symbol) for symbol in morse]
+    assert emitted[:4] == ["", "", "", ""]
+    assert "".join(emitted) + decoder.flush() == MorseConverter.decode(morse)
+
+    with pytest.raises(ConversionError) as exc:
+        MorseConverter.decode_symbols(".- -..--.-. ...")
+    assert str(exc.value) == "'-..--.-.' ist kein gültiger Morse-Buchstabe."
+    assert exc.value.offset == 1
+
+
+def test_morse_audio_renders_wav_and_caches_by_content(
+    tmp_path, monkeypatch
+) -> None:
+    """TC_021: Morse audio synthesis and on-disk cache.
+
+    Verifies that rendering produces a 16-bit mono WAV of the expected
+    PARIS duration (with and without NumPy), that cached files are
+    reused instead of re-synthesized and that the cache evicts the
+    least recently used file.
+    """
+    import io
+    import wave
+
+    from services import morse_audio
+    from services.morse_audio import AudioCache, MorseAudio
+
+    # "E E" at 12 WPM: dit + 7-unit word gap + dit = 9 units of 0.1 s.
+    wav_bytes = MorseAudio(wpm=12).render(". / .")
+    with wave.open(io.BytesIO(wav_bytes)) as wav:
+        assert (wav.getnchannels(), wav.getsampwidth()) == (1, 2)
+        assert wav.getnframes() == 9 * 800
+
+    monkeypatch.setattr(morse_audio, "np", None)
+    assert len(MorseAudio(wpm=12).render(". / .")) == len(wav_bytes)
+
+    cache = AudioCache(tmp_path, max_bytes=2 * len(wav_bytes))
+    audio = MorseAudio(wpm=12, cache=cache)
+    first = audio.cached_file(". / .")
+    monkeypatch.setattr(audio, "render", lambda morse: wav_bytes)
+    assert audio.cached_file(".  /  .") == first
+
+    audio.cached_file("-")
+    audio.cached_file(". / .")
+    audio.cached_file("--")
+    assert first.exists()
+    assert not (tmp_path / audio.cache_key("-")).exists()
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_wav_upload_is_decoded_to_morse(
+    tmp_path, monkeypatch, use_numpy: bool
+) -> None:
+    """TC_022: Morse decoding from uploaded WAV files.
+
+    Verifies that a rendered recording with added noise and Farnsworth
+    spacing is decoded back to the same Morse code (with and without
+    NumPy), that the sender's speed is estimated, and that silent or
+    non-WAV files are rejected.
+    """
+    import io
+    import random
+    import wave
+    from array import array
+
+    from services import audio_decoder
+    from services.file_upload_service import (
+        FileUploadService,
+        InvalidAudioError,
+    )
+    from services.morse_audio import MorseAudio
+    from services.morse_converter import MorseConverter
+
+    if not use_numpy:
+        monkeypatch.setattr(audio_decoder, "np", None)
+
+    morse = MorseConverter.encode("CQ DE DL1ABC")
+    rendered = MorseAudio(wpm=25, tone_hz=700, farnsworth_wpm=15).render(
+        morse
+    )
+    with wave.open(io.BytesIO(rendered)) as wav:
+        samples = array("h", wav.readframes(wav.getnframes()))
+    rng = random.Random(1)
+    noisy = array(
+        "h",
+        (
+            max(-32768, min(32767, s + round(rng.gauss(0, 2000))))
+            for s in array("h", bytes(8000)) + samples
+        ),
+    )
+    path = tmp_path / "cq.wav"
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(8000)
+        wav.writeframes(noisy.tobytes())
+
+    decoder = audio_decoder.MorseAudioDecoder()
+    assert decoder.decode_file(path) == morse
+    assert decoder.wpm == pytest.approx(25, rel=0.15)
+    assert abs(decoder.tone_hz - 700) < 50
+
+    result = FileUploadService.process_audio_upload("cq.wav", "", path)
+    assert (result.source, result.output) == (morse, "CQ DE DL1ABC")
+
+    silent = tmp_path / "silent.wav"
+    with wave.open(str(silent), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(8000)
+        wav.writeframes(bytes(16000))
+    with pytest.raises(InvalidAudioError):
+        FileUploadService.process_audio_upload("silent.wav", "", silent)
+    (tmp_path / "bad.wav").write_text("kein Audio")
+    with pytest.raises(InvalidAudioError):
+        FileUploadService.process_audio_upload(
+            "bad.wav", "", tmp_path / "bad.wav"
+        )
+
+
+def test_keyer_decoder_tracks_sender_speed() -> None:
+    """TC_023: Timing-based straight-key decoding.
+
+    Verifies that jittered hand-keyed timings are decoded at speeds away
+    from the initial guess, that the speed estimate follows the sender
+    and that pauses before the first press are ignored.
+    """
+    import random
+
+    from services.keyer_decoder import KeyerDecoder
+    from services.morse_converter import MorseConverter
+
+    text = "CQ DE DL1ABC PSE K"
+    rng = random.Random(7)
+    for wpm in (10, 18, 25):
+        dit = 1200 / wpm
+        durations: list[float] = []
+        for token in MorseConverter.encode(text).split(" "):
+            if token == "/":
+                durations[-1] = 7 * dit * rng.uniform(0.9, 1.2)
+                continue
+            for mark in token:
+                length = dit if mark == "." else 3 * dit
+                durations += [
+                    length * rng.uniform(0.85, 1.15),
+                    dit * rng.uniform(0.85, 1.15),
+                ]
+            durations[-1] = 3 * dit * rng.uniform(0.9, 1.2)
+
+        assert MorseConverter.decode_timings(durations, wpm=18) == text
+        keyer = KeyerDecoder(wpm=18)
+        keyer.feed_timings(durations)
+        assert keyer.wpm == pytest.approx(wpm, rel=0.2)
+
+    keyer = KeyerDecoder()
+    assert keyer.pause(5000) == ""
+    assert keyer.press(60) + keyer.pause(1000) == "E "
+
+
+def test_conversion_cache_is_bounded_lru_and_thread_safe() -> None:
+    """TC_024: Shared conversion cache.
+
+    Verifies hits and misses, LRU eviction by entry count and by size,
+    the input-length cutoff, that cached results equal fresh ones and
+    that concurrent lookups keep the counters consistent.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from services.conversion_cache import ConversionCache
+    from services.morse_converter import ConversionError, MorseConverter
+
+    cache = ConversionCache(max_entries=2, max_input_length=10)
+    first = cache.analyze("SOS")
+    assert cache.analyze("SOS") is first
+    assert first == MorseConverter.analyze("SOS")
+    assert cache.convert("... --- ...") == ("SOS", False)
+    cache.analyze("SOS")
+    cache.analyze("CQ")  # evicts "... --- ..." (least recently used)
+    cache.analyze("a very long input")  # bypasses the cache
+    assert cache.stats() == {
+        "hits": 2,
+        "misses": 4,
+        "hit_rate": 2 / 6,
+        "entries": 2,
+        "bytes": cache.stats()["bytes"],
+    }
+    assert cache.analyze("SOS") is first
+    assert cache.analyze("... --- ...") is not None
+    assert cache.stats()["misses"] == 5
+    with pytest.raises(ConversionError):
+        cache.convert("#")
+
+    small = ConversionCache(max_bytes=ConversionCache._cost(first) * 2)
+    for value in ("A", "B", "C"):
+        small.analyze(value)
+    assert small.stats()["entries"] == 2
+
+    shared = ConversionCache(max_entries=8)
+    values = ["SOS", "CQ", "73", "HI", "TEST"] * 200
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(shared.analyze, values))
+    assert [r.source for r in results] == values
+    stats = shared.stats()
+    assert stats["hits"] + stats["misses"] == len(values)
+    assert stats["entries"] == 5
+
+
+@pytest.mark.parametrize("codebook", ["itu", "itu-extended"])
+def test_incremental_converter_matches_full_analysis(codebook: str) -> None:
+    """TC_025: Incremental live-preview conversion.
+
+    Verifies that random typing, deleting and mid-input edits give the
+    same result as converting the whole input, including direction
+    changes, prosigns and invalid input.
+    """
+    import random
+
+    from services.incremental_converter import IncrementalConverter
+    from services.morse_converter import MorseConverter
+
+    rng = random.Random(11)
+    alphabet = "SOS cq 73.-/ <SK>#"
+    preview = IncrementalConverter(codebook)
+    value = ""
+    for _ in range(2000):
+        action = rng.random()
+        if action < 0.6:
+            value += rng.choice(alphabet if rng.random() < 0.3 else ".- /")
+        elif action < 0.8:
+            value = value[:-1]
+        elif value:
+            index = rng.randrange(len(value))
+            value = value[:index] + rng.choice(alphabet) + value[index + 1 :]
+        assert preview.update(value) == MorseConverter.analyze(value, codebook)